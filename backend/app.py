@@ -2,53 +2,61 @@ import eventlet
 eventlet.monkey_patch()
 
 import asyncio
+import concurrent.futures
+import contextvars
 import logging
 import os
-import threading
+import time
 from functools import wraps
-from typing import Callable, Dict, Optional, Tuple
+from typing import Callable, Optional
 
-from flask import Flask, request
+from eventlet.queue import LightQueue
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_socketio import SocketIO
 
-from core import socket_events as se
-from core.validators import (
-    is_valid_crypto_address,
-    is_valid_domain,
-    is_valid_email,
-    is_valid_ip,
-    is_valid_phone,
-    is_valid_url,
-    is_valid_username,
-)
-from domain.subdomains.crtsh_module import crtsh_module
-from domain.whois.whois_module import whois_module
-from domain.dns.dns_module import dns_module
-from network.ip.ip_module import ip_module
-from network.wayback.wayback_module import wayback_module
-from network.crypto.crypto_module import crypto_module
+from core import batch, entities, metrics, socket_events as se, tracing
+from core.admission import AdmissionControl, Decision, Load, process_rss_mb
+from core.async_runtime import AsyncLoopThread, HubBridge, use_native_logging_locks
+from core.batch import BatchError, BatchItem, BatchLimits, LineEmitter, SearchBatch, parse_batch
+from core.coalescer import SearchCoalescer
+from core.emission import ClientBackpressure
+from core.base_module import CancelToken, OsintModule, SearchCancelled, on_cancel, run_cancellable
+from core.http_client import http_client
+from core.job_workers import JobWorkerPool
+from core.pipeline import Investigation, PipelineError, PipelineLimits, parse_investigation
+from core.profiler import profiler, to_speedscope
+from core.registry import registry
+from core.result_cache import result_cache
+from core.serializers import client_config, serializer_from_env, socketio_options
+from core.scheduler import Job, JobScheduler
+from core.task_registry import create_task_registry
+from core.tracing import OtlpExporter, tracer
+from core.validators import is_valid_domain, is_valid_email, is_valid_phone
+from core.watchdog import watchdog
 from network.metadata.metadata_module import metadata_bp
-from social_networks.discord.discord_module import discord_module
-from social_networks.github.osgint_module import github_module
-from social_networks.google.ghunt_module import google_module
-from social_networks.mastodon.mastodon_module import mastodon_module
-from social_networks.reddit.reddit_module import run_reddit
-from social_networks.telegram.telegram_module import telegram_module
-from social_networks.tiktok.tiktok_module import tiktok_module
-from username.whatsmyname.whatsmyname_module import whatsmyname_module
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
+# Handlers are shared with the asyncio loop thread (see core/async_runtime.py).
+use_native_logging_locks()
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Set to a Redis URL to run several workers: Socket.IO rooms, the task
+# registry and rate limits are then shared through it.
+MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+
+# Wire format for every Socket.IO event: ujson-backed JSON by default, or
+# MessagePack with OSINT_SOCKET_SERIALIZER=msgpack (see core/serializers.py).
+SOCKET_SERIALIZER = serializer_from_env()
+
 io = SocketIO(
     app,
     cors_allowed_origins="*",
@@ -57,77 +65,233 @@ io = SocketIO(
     engineio_logger=True,
     ping_timeout=60,
     ping_interval=25,
+    message_queue=MESSAGE_QUEUE,
+    **socketio_options(SOCKET_SERIALIZER),
 )
 
-limiter = Limiter(get_remote_address, app=app, default_limits=["10 per minute"], storage_uri="memory://")
+limiter = Limiter(
+    get_remote_address,
+    app=app,
+    default_limits=["10 per minute"],
+    storage_uri=MESSAGE_QUEUE or "memory://",
+)
 
 app.register_blueprint(metadata_bp)
 
+# Progress events skip clients whose socket has fallen behind (see
+# core/emission.py); everything modules emit ends up going through this.
+_outbox = ClientBackpressure.from_env(io)
+
+# Identical searches running at the same time share one job; its events go to
+# a per-flight room. Module emits pass through the coalescer's emitter so late
+# joiners can be caught up.
+_coalescer = SearchCoalescer(_outbox, on_abandon=lambda namespace, room: _scheduler.cancel(namespace, room))
+
+# One asyncio loop per worker, shared by every async module job. Modules get
+# the bridge in place of `io` so their emits are marshalled back to the hub.
+_loop_thread = AsyncLoopThread()
+_bridge = HubBridge(_coalescer.emitter)
+
+# With OSINT_JOB_WORKERS=N, module searches run in N worker processes and
+# this process only relays their socket events.
+_job_workers = JobWorkerPool.from_env(_coalescer.emitter, se.SERVER_EVENTS["result"])
+
 
 # ---------------------------------------------------------------------------
 # Per-client task tracking
 # ---------------------------------------------------------------------------
 # Keyed by (namespace, sid) so two clients on the same namespace don't cancel
-# each other. Modules cooperate via the threading.Event we pass in.
-_active_tasks: Dict[Tuple[str, str], threading.Event] = {}
+# each other. Modules cooperate via the threading.Event we pass in. Shared
+# through Redis when SOCKETIO_MESSAGE_QUEUE is set.
+_active_tasks = create_task_registry(
+    MESSAGE_QUEUE,
+    spawn=io.start_background_task,
+    on_cancel=lambda namespace, sid: _scheduler.cancel(namespace, sid),
+)
 
 
 def _cancel_task(namespace: str, sid: str) -> None:
-    event = _active_tasks.pop((namespace, sid), None)
-    if event is not None:
-        logger.info(f"Cancelling task for {namespace} sid={sid}")
-        event.set()
+    _active_tasks.cancel(namespace, sid)
 
 
-def _register_task(namespace: str, sid: str) -> threading.Event:
-    _cancel_task(namespace, sid)
-    event = threading.Event()
-    _active_tasks[(namespace, sid)] = event
-    return event
+def _register_task(namespace: str, sid: str) -> CancelToken:
+    return _active_tasks.register(namespace, sid)
 
 
 def _clear_client(sid: str) -> None:
-    for key in [k for k in _active_tasks if k[1] == sid]:
-        _active_tasks.pop(key).set()
+    _active_tasks.clear_client(sid)
+
+
+# ---------------------------------------------------------------------------
+# Job scheduling
+# ---------------------------------------------------------------------------
+# Caps concurrent jobs globally and per namespace, and lets interactive
+# lookups jump ahead of fan-out jobs. Configured via OSINT_MAX_JOBS,
+# OSINT_JOB_LIMITS ("username=2,mastodon=4") and OSINT_BULK_NAMESPACES.
+def _notify_queue_position(job: Job, position: int, queued: int) -> None:
+    io.emit(
+        se.SERVER_EVENTS["queued"],
+        tracing.stamp({"status": "queued", "position": position, "queued": queued}, job.trace_id),
+        namespace=job.namespace,
+        room=job.room,
+    )
+
+
+_scheduler = JobScheduler.from_env(_notify_queue_position)
+
+
+# ---------------------------------------------------------------------------
+# Admission control
+# ---------------------------------------------------------------------------
+# New searches are turned away while hub lag, scheduler load or memory is
+# over the thresholds of their cost class, so the searches already admitted
+# keep their latency (see core/admission.py). Fan-out namespaces (the bulk
+# lane, HTTP batches and investigations) are shed first, whatever
+# OSINT_BULK_NAMESPACES puts in the bulk lane.
+BATCH_NAMESPACE = "/batch"
+INVESTIGATE_NAMESPACE = "/investigate"
+
+_admission = AdmissionControl.from_env(
+    lambda: Load(
+        lag=metrics.loop_lag_monitor.latest("hub"),
+        jobs=_scheduler.in_flight + _scheduler.queued,
+        rss_mb=process_rss_mb(),
+    ),
+    heavy_namespaces=_scheduler.bulk_namespaces | {BATCH_NAMESPACE, INVESTIGATE_NAMESPACE},
+)
+
+
+def _emit_busy(namespace: str, decision: Decision, room: str) -> None:
+    """Tell a client its search was turned away, and when to try again."""
+    metrics.admission_rejected.labels(namespace, decision.reason).inc()
+    message = f"Server busy, retry in {decision.retry_in} s"
+    io.emit(
+        se.SERVER_EVENTS["busy"],
+        {"status": "busy", "retry_in": decision.retry_in, "reason": decision.reason, "message": message},
+        namespace=namespace,
+        room=room,
+    )
+    # Clients that don't handle server_busy still see the search end.
+    io.emit(se.SERVER_EVENTS["result"], {"error": message, "retry_in": decision.retry_in}, namespace=namespace, room=room)
+
+
+def _busy_response(namespace: str):
+    """A 503 for an HTTP request turned away by admission control, or None to go ahead."""
+    decision = _admission.check(namespace)
+    if decision.admitted:
+        return None
+    metrics.admission_rejected.labels(namespace, decision.reason).inc()
+    body = {"error": f"Server busy, retry in {decision.retry_in} s", "retry_in": decision.retry_in,
+            "reason": decision.reason}
+    return jsonify(body), 503, {"Retry-After": str(decision.retry_in)}
 
 
 # ---------------------------------------------------------------------------
 # Background execution (eventlet-cooperative, single model)
 # ---------------------------------------------------------------------------
-def _spawn_async(coro_fn: Callable, *args, namespace: str, **kwargs) -> None:
-    """Run an async coroutine in an eventlet-backed background task.
+def _spawn_async(coro_fn: Callable, *args, namespace: str, on_done: Optional[Callable] = None, **kwargs) -> None:
+    """Run an async coroutine on the shared asyncio loop.
 
-    One asyncio loop per task — sufficient for the modest concurrency here and
-    drastically simpler than the old thread+loop juggling.
+    The loop outlives the job, so connection pools and caches built by modules
+    are reused across searches. Setting the job's cancel event cancels the
+    task itself, aborting in-flight I/O. Completion is reported from the loop
+    thread, so errors and ``on_done`` are marshalled back through the bridge.
     """
+    room = kwargs.get("room")
+    trace_id = tracing.current_trace_id()
+    _bridge.start()
+    # The loop task runs in a copy of this context, so it stays in the job's trace.
+    future = _loop_thread.submit(run_cancellable(coro_fn(*args, **kwargs), kwargs.get("cancel_event")))
 
-    def runner() -> None:
-        loop = asyncio.new_event_loop()
+    def finished(fut) -> None:
         try:
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(coro_fn(*args, **kwargs))
-        except asyncio.CancelledError:
+            fut.result()
+        except (asyncio.CancelledError, concurrent.futures.CancelledError, SearchCancelled):
             logger.info(f"Async task cancelled for {namespace}")
         except Exception as exc:
             logger.exception(f"Async task failed for {namespace}: {exc}")
-            io.emit(se.SERVER_EVENTS["result"], {"error": str(exc)}, namespace=namespace, room=kwargs.get("room"))
+            _bridge.emit(
+                se.SERVER_EVENTS["result"], tracing.stamp({"error": str(exc)}, trace_id), namespace=namespace, room=room,
+            )
         finally:
-            loop.close()
+            if on_done is not None:
+                _bridge.call_soon(on_done)
 
-    io.start_background_task(runner)
+    future.add_done_callback(finished)
 
 
-def _spawn_sync(fn: Callable, *args, namespace: str, **kwargs) -> None:
-    """Run a sync callable in an eventlet-backed background task."""
+def _spawn_sync(fn: Callable, *args, namespace: str, on_done: Optional[Callable] = None, **kwargs) -> None:
+    """Run a sync callable in an eventlet-backed background task.
+
+    Setting the job's cancel event kills the greenthread, which unwinds any
+    green socket it is blocked on.
+    """
+    cancel_event = kwargs.get("cancel_event")
+    if cancel_event is not None and cancel_event.is_set():
+        if on_done is not None:
+            on_done()
+        return
+    remove_cancel = None
+    started = False
+    # Greenthreads start with an empty context; carry the job's trace over.
+    context = contextvars.copy_context()
 
     def runner() -> None:
+        nonlocal started
+        started = True
         try:
             fn(*args, **kwargs)
         except Exception as exc:
             logger.exception(f"Sync task failed for {namespace}: {exc}")
-            io.emit(se.SERVER_EVENTS["result"], {"error": str(exc)}, namespace=namespace, room=kwargs.get("room"))
+            _coalescer.emitter.emit(
+                se.SERVER_EVENTS["result"], tracing.stamp({"error": str(exc)}), namespace=namespace, room=kwargs.get("room"),
+            )
+        finally:
+            if remove_cancel is not None:
+                remove_cancel()
+            if on_done is not None:
+                on_done()
+
+    thread = io.start_background_task(context.run, runner)
+    # python-engineio wraps the greenthread; only the greenthread can be killed.
+    greenthread = getattr(thread, "g", thread)
 
-    io.start_background_task(runner)
+    def kill() -> None:
+        greenthread.kill()
+        # Killed before its first switch, the greenthread never runs runner's finally.
+        if not started and on_done is not None:
+            on_done()
+
+    remove_cancel = on_cancel(cancel_event, kill)
+
+
+def _spawn_module(target: str, value, namespace: str, cancel_event, room, on_done, **extra_kwargs) -> None:
+    """Run a module search: in a job worker when enabled, else in-process."""
+    if _job_workers is not None:
+        _job_workers.submit(
+            target,
+            value,
+            namespace,
+            room=room,
+            cancel_event=cancel_event,
+            on_done=on_done,
+            kwargs=extra_kwargs,
+        )
+        return
+
+    fn = registry.resolve(target)
+    spawn = _spawn_async if asyncio.iscoroutinefunction(fn) else _spawn_sync
+    spawn(
+        fn,
+        value,
+        _bridge if spawn is _spawn_async else _coalescer.emitter,
+        namespace,
+        cancel_event=cancel_event,
+        room=room,
+        namespace=namespace,
+        on_done=on_done,
+        **extra_kwargs,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -139,17 +303,30 @@ def _extract_input(data):
     return data
 
 
+def _bypass_cache(data) -> bool:
+    """Clients force a fresh search with ``{"no_cache": true}`` in the payload."""
+    return isinstance(data, dict) and bool(data.get("no_cache"))
+
+
 def _emit_error(namespace: str, message: str, room: Optional[str] = None) -> None:
     io.emit(se.SERVER_EVENTS["result"], {"error": message}, namespace=namespace, room=room)
 
 
 def _validated_handler(validator: Optional[Callable], namespace: str, runner: Callable):
-    """Wrap a runner with input extraction, validation, and per-client task tracking."""
+    """Wrap a runner with admission control, input extraction, validation,
+    per-client task tracking, coalescing of identical concurrent searches,
+    scheduling, job metrics, the job's trace and, when an admin asks for it,
+    its profile."""
 
     @wraps(runner)
     def handler(data=None):
         sid = request.sid
         room = sid
+        # First, before validation spends a DNS lookup on a search that can't run.
+        decision = _admission.check(namespace)
+        if not decision.admitted:
+            _emit_busy(namespace, decision, room)
+            return
         value = _extract_input(data)
 
         if validator is not None:
@@ -161,16 +338,100 @@ def _validated_handler(validator: Optional[Callable], namespace: str, runner: Ca
                 _emit_error(namespace, err, room=room)
                 return
 
-        cancel_event = _register_task(namespace, sid)
+        cancel_event = task_event = _register_task(namespace, sid)
+        profile = profiler.requested(data)
+        flight = None
+        coalesce_key = getattr(runner, "coalesce_key", None)
+        # A profiled search runs on its own, so its profile covers a whole job.
+        if coalesce_key is not None and not profile:
+            key = (namespace, runner, coalesce_key(value))
+            if _coalescer.join(key, sid, cancel_event):
+                return
+            flight = _coalescer.open(key, namespace, sid, cancel_event)
+            room, cancel_event = flight.room, flight.cancel_event
+
+        queued_at = time.monotonic()
+        trace = tracer.start_trace("job", namespace=namespace, query=str(value))
+        queued = trace.start_span("queued", trace.root.span_id, tracing.KIND_INTERNAL, {}) if trace else None
+        if profile and trace is None:
+            # Samples are matched to the job through its trace.
+            logger.warning("Profiling requested but tracing is disabled (OSINT_TRACING=0)")
+            profile = False
+
+        def release():
+            if flight is not None:
+                # Everyone still subscribed was waiting on this job.
+                for subscriber in list(flight.subscribers):
+                    _active_tasks.finish(namespace, subscriber)
+                _coalescer.finish(flight)
+            else:
+                _active_tasks.finish(namespace, sid, task_event)
+
+        def dropped():
+            # Cancelled while queued: the job never starts, but still ends.
+            if queued is not None:
+                queued.end()
+            metrics.observe_job(namespace, None, cancelled=True, failed=False)
+            tracer.finish(trace, status=tracing.STATUS_CANCELLED)
+            release()
+
+        def start(done):
+            started = time.monotonic()
+            metrics.job_queue_wait.labels(namespace).observe(started - queued_at)
+            if queued is not None:
+                queued.end()
+            if profile:
+                profiler.start(trace.trace_id, namespace=namespace, query=str(value))
+
+            def finished():
+                cancelled = cancel_event.is_set()
+                failed = flight is not None and flight.failed
+                metrics.observe_job(namespace, time.monotonic() - started, cancelled=cancelled, failed=failed)
+                tracer.finish(trace, status=tracing.outcome_status(cancelled, failed))
+                if profile:
+                    _finish_profile(trace.trace_id, namespace, room)
+                release()
+                done()
+
+            with tracing.activate(trace.root if trace else None):
+                try:
+                    runner(value, data, cancel_event, room, finished)
+                except Exception:
+                    finished()
+                    raise
+
+        job = Job(
+            namespace=namespace,
+            room=room,
+            cancel_event=cancel_event,
+            start=start,
+            trace_id=trace.trace_id if trace else None,
+            on_drop=dropped,
+        )
         try:
-            runner(value, data, cancel_event, room)
+            _scheduler.submit(job)
         except Exception as exc:
             logger.exception(f"Handler error on {namespace}: {exc}")
+            tracer.finish(trace, status=tracing.STATUS_ERROR, message=str(exc))
             _emit_error(namespace, str(exc), room=room)
 
     return handler
 
 
+def _finish_profile(job_id: str, namespace: str, room: Optional[str]) -> None:
+    try:
+        profiler.finish(job_id)
+    except OSError as exc:
+        logger.error(f"Could not write profile of job {job_id}: {exc}")
+        return
+    io.emit(
+        se.SERVER_EVENTS["result"],
+        tracing.stamp({"status": "profiled", "profile": f"/api/profiles/{job_id}"}, job_id),
+        namespace=namespace,
+        room=room,
+    )
+
+
 def _cancel_handler(namespace: str):
     def handler():
         sid = request.sid
@@ -188,129 +449,102 @@ def _cancel_handler(namespace: str):
 # ---------------------------------------------------------------------------
 # Per-namespace search runners
 # ---------------------------------------------------------------------------
-async def _run_domain(query, _data, cancel_event, room):
-    namespace = se.ns("domain")
-    await crtsh_module.search(query, io, namespace, cancel_event=cancel_event, room=room)
-    if not cancel_event.is_set():
-        await whois_module.search(query, io, namespace, cancel_event=cancel_event, room=room)
+async def _run_domain(query, data, cancel_event, room):
+    # crt.sh and WHOIS side by side: the search takes as long as the slower one.
+    investigation = Investigation(
+        se.ns("domain"),
+        lambda _node: _bridge,
+        cancel_event,
+        limits=PipelineLimits(max_depth=0),
+        specs=[registry.get("subdomains", "search"), registry.get("whois", "search")],
+        room=room,
+        use_cache=not _bypass_cache(data),
+    )
+    await investigation.run(entities.Entity(entities.DOMAIN, _normalize_query(query)))
 
 
-async def _run_email(_query, _data, _cancel_event, room):
-    io.emit(
+async def _run_email(_query, _data, cancel_event, room):
+    _bridge.emit(
         se.SERVER_EVENTS["result"],
-        {"result": {"module": "email", "message": "Email search functionality will be implemented soon."}},
+        tracing.stamp({"result": {"module": "email", "message": "Email search functionality will be implemented soon."}}),
         namespace=se.ns("email"),
         room=room,
     )
 
 
-async def _run_phone(_query, _data, _cancel_event, room):
-    io.emit(
+async def _run_phone(_query, _data, cancel_event, room):
+    _bridge.emit(
         se.SERVER_EVENTS["result"],
-        {"result": {"module": "phone", "message": "Phone search functionality will be implemented soon."}},
+        tracing.stamp({"result": {"module": "phone", "message": "Phone search functionality will be implemented soon."}}),
         namespace=se.ns("phone"),
         room=room,
     )
 
 
-def _async_runner(coro_fn, namespace: str, **extra_kwargs):
-    def runner(value, _data, cancel_event, room):
-        _spawn_async(
-            coro_fn,
-            value,
-            io,
-            namespace,
-            cancel_event=cancel_event,
-            room=room,
-            namespace=namespace,
-            **extra_kwargs,
-        )
+def _normalize_query(value) -> str:
+    return str(value).strip().lower()
 
-    return runner
 
+def _module_runner(target: str, namespace: str, **extra_kwargs):
+    """Runner for a registered module target, imported on its first search."""
 
-def _domain_runner(value, _data, cancel_event, room):
-    _spawn_async(_run_domain, value, None, cancel_event, room, namespace=se.ns("domain"))
+    def module() -> Optional[OsintModule]:
+        owner = getattr(registry.resolve(target), "__self__", None)
+        return owner if isinstance(owner, OsintModule) else None
 
+    def runner(value, data, cancel_event, room, on_done):
+        kwargs = dict(extra_kwargs)
+        if _bypass_cache(data) and module() is not None:
+            kwargs["use_cache"] = False
+        _spawn_module(target, value, namespace, cancel_event, room, on_done, **kwargs)
 
-def _email_runner(value, data, cancel_event, room):
-    _spawn_async(_run_email, value, data, cancel_event, room, namespace=se.ns("email"))
+    def coalesce_key(value) -> str:
+        owner = module()
+        return owner.normalize_query(value) if owner is not None else _normalize_query(value)
 
+    # Concurrent identical searches share one job (see core/coalescer.py).
+    runner.coalesce_key = coalesce_key
+    return runner
 
-def _phone_runner(value, data, cancel_event, room):
-    _spawn_async(_run_phone, value, data, cancel_event, room, namespace=se.ns("phone"))
 
+def _domain_runner(value, data, cancel_event, room, on_done):
+    _spawn_async(
+        _run_domain, value, data, cancel_event=cancel_event, room=room, namespace=se.ns("domain"), on_done=on_done,
+    )
 
-def _whatsmyname_runner(value, _data, cancel_event, room):
-    _spawn_sync(
-        whatsmyname_module.search,
-        value,
-        io,
-        se.ns("username"),
-        cancel_event=cancel_event,
-        room=room,
-        namespace=se.ns("username"),
+
+_domain_runner.coalesce_key = _normalize_query
+
+
+def _email_runner(value, data, cancel_event, room, on_done):
+    _spawn_async(
+        _run_email, value, data, cancel_event=cancel_event, room=room, namespace=se.ns("email"), on_done=on_done,
     )
 
 
-def _wayback_runner(value, _data, cancel_event, room):
-    _spawn_sync(
-        wayback_module.search_sync,
-        value,
-        io,
-        se.ns("wayback"),
-        cancel_event=cancel_event,
-        room=room,
-        namespace=se.ns("wayback"),
+def _phone_runner(value, data, cancel_event, room, on_done):
+    _spawn_async(
+        _run_phone, value, data, cancel_event=cancel_event, room=room, namespace=se.ns("phone"), on_done=on_done,
     )
 
 
 # ---------------------------------------------------------------------------
-# Handler table — single source of truth for what gets registered.
+# Handler registration
 # ---------------------------------------------------------------------------
-SEARCH_HANDLERS = [
-    # (namespace_key, event_key, validator, runner)
-    ("email",      "search",         is_valid_email,    _email_runner),
-    ("domain",     "search",         is_valid_domain,   _domain_runner),
-    ("whois",      "search",         is_valid_domain,
-        _async_runner(whois_module.search, se.ns("whois"))),
-    ("subdomains", "search",         is_valid_domain,
-        _async_runner(crtsh_module.search, se.ns("subdomains"))),
-    ("username",   "search",         is_valid_username, _whatsmyname_runner),
-    ("discord",    "search",         None,
-        _async_runner(discord_module.search, se.ns("discord"))),
-    ("github",     "search",         None,
-        _async_runner(github_module.search, se.ns("github"))),
-    ("google",     "search",         None,
-        _async_runner(google_module.search, se.ns("google"))),
-    ("reddit",     "search",         is_valid_username,
-        _async_runner(run_reddit, se.ns("reddit"))),
-    ("tiktok",     "searchVideo",    is_valid_url,
-        _async_runner(tiktok_module.search, se.ns("tiktok"), search_type="video")),
-    ("tiktok",     "searchProfile",  is_valid_username,
-        _async_runner(tiktok_module.search, se.ns("tiktok"), search_type="profile")),
-    ("mastodon",   "searchUsername", is_valid_username,
-        _async_runner(mastodon_module.search, se.ns("mastodon"), search_type="username")),
-    ("mastodon",   "searchInstance", None,
-        _async_runner(mastodon_module.search, se.ns("mastodon"), search_type="instance")),
-    ("phone",      "search",         is_valid_phone,    _phone_runner),
-    ("dns",        "search",         is_valid_domain,
-        _async_runner(dns_module.search, se.ns("dns"))),
-    ("ip",         "search",         is_valid_ip,
-        _async_runner(ip_module.search, se.ns("ip"))),
-    ("wayback",    "search",         is_valid_domain,   _wayback_runner),
-    ("crypto",     "search",         is_valid_crypto_address,
-        _async_runner(crypto_module.search, se.ns("crypto"))),
-    ("telegram",   "search",         is_valid_username,
-        _async_runner(telegram_module.search, se.ns("telegram"))),
-]
+# Module searches are declared in each module package's plugin.py (see
+# core/registry.py); searches composed here are registered alongside them.
+registry.register("email", "search", validator=is_valid_email, runner=_email_runner)
+registry.register("domain", "search", validator=is_valid_domain, runner=_domain_runner)
+registry.register("phone", "search", validator=is_valid_phone, runner=_phone_runner)
+registry.discover()
 
 
 def _register_handlers() -> None:
-    for ns_key, event_key, validator, runner in SEARCH_HANDLERS:
-        namespace = se.ns(ns_key)
-        event_name = se.event(ns_key, event_key)
-        handler = _validated_handler(validator, namespace, runner)
+    for spec in registry.specs():
+        namespace = se.ns(spec.namespace)
+        event_name = se.event(spec.namespace, spec.event)
+        runner = spec.runner or _module_runner(spec.target, namespace, **spec.kwargs)
+        handler = _validated_handler(spec.validator, namespace, runner)
         io.on(event_name, namespace=namespace)(handler)
         logger.info(f"Registered handler {namespace}:{event_name}")
 
@@ -325,6 +559,420 @@ def _register_handlers() -> None:
 
 _register_handlers()
 
+# Import module code in a background task: it first runs once the worker is
+# serving, and yields to the hub between imports, so startup never waits on it.
+if os.environ.get("OSINT_WARM_UP", "1") != "0":
+    io.start_background_task(registry.warm_up, pause=lambda: io.sleep(0))
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+# Event loop lag is sampled on the hub and on the shared asyncio loop every
+# OSINT_LAG_INTERVAL seconds, and the stall watchdog (core/watchdog.py) logs
+# what blocked a loop for longer than OSINT_STALL_THRESHOLD. The rest of
+# core/metrics.py is fed by the code it instruments, or read from these
+# components when scraped.
+def _collect_state():
+    cache = result_cache.stats()
+    modules = cache["modules"]
+    yield metrics.counter(
+        "osint_cache_hits", "Result cache hits by module",
+        {name: counts["hits"] for name, counts in modules.items()}, label="module",
+    )
+    yield metrics.counter(
+        "osint_cache_misses", "Result cache misses by module",
+        {name: counts["misses"] for name, counts in modules.items()}, label="module",
+    )
+    yield metrics.gauge(
+        "osint_cache_hit_ratio", "Result cache hits over lookups, by module",
+        {
+            name: counts["hits"] / (counts["hits"] + counts["misses"])
+            for name, counts in modules.items() if counts["hits"] + counts["misses"]
+        },
+        label="module",
+    )
+    yield metrics.counter("osint_cache_disk_hits", "Result cache misses served from the disk cache", cache["disk_hits"])
+    yield metrics.gauge("osint_cache_entries", "Entries in the in-memory result cache", cache["size"])
+    yield metrics.gauge("osint_active_tasks", "Searches tracked for cancellation in this worker", len(_active_tasks))
+
+    scheduler = _scheduler.stats()
+    yield metrics.gauge("osint_scheduler_in_flight", "Jobs running", scheduler["in_flight"])
+    yield metrics.gauge("osint_scheduler_queued", "Jobs waiting for a slot", scheduler["queued"])
+    yield metrics.gauge("osint_scheduler_running", "Jobs running, by namespace", scheduler["running"], label="namespace")
+    yield metrics.gauge("osint_coalescer_flights", "Searches shared by concurrent clients", _coalescer.stats()["flights"])
+    yield metrics.gauge(
+        "osint_admission_shedding", "1 while admission control turns away a cost class",
+        {name: int(shedding) for name, shedding in _admission.shedding().items()}, label="cost_class",
+    )
+    yield metrics.gauge("osint_process_resident_memory_bytes", "Resident memory of this worker", process_rss_mb() * 1024 * 1024)
+
+
+def _watch_loop_lag() -> None:
+    # Started from a background task so the loop thread isn't spun up at import.
+    _loop_thread.submit(metrics.loop_lag_monitor.watch_asyncio())
+    watchdog.start()
+    metrics.loop_lag_monitor.watch_hub(io.sleep)
+
+
+metrics.register_collector(_collect_state)
+
+if metrics.loop_lag_monitor.interval > 0:
+    io.start_background_task(_watch_loop_lag)
+
+
+@app.route("/metrics")
+@limiter.exempt
+def prometheus_metrics():
+    """Prometheus exposition of this worker's metrics (see core/metrics.py)."""
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
+# ---------------------------------------------------------------------------
+# Traces
+# ---------------------------------------------------------------------------
+# Each search job is traced (see core/tracing.py); finished traces are kept
+# per worker and optionally exported to an OTLP collector. They show what was
+# searched for, so, like profiles, they are only served to holders of
+# OSINT_ADMIN_TOKEN.
+_otlp_exporter = OtlpExporter.from_env()
+if _otlp_exporter is not None:
+    tracer.add_exporter(lambda trace: _loop_thread.submit(_otlp_exporter.export(trace)))
+
+
+def _admin_request() -> bool:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and profiler.authorized(token.strip())
+
+
+@app.route("/api/traces")
+def list_traces():
+    """Recently finished traces, newest first.
+
+    Query parameters: ``limit`` (default 50), ``namespace`` (e.g. ``/dns``)
+    and ``min_ms`` to only list jobs slower than that.
+    """
+    if not _admin_request():
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({
+        "traces": tracer.recent(
+            limit=request.args.get("limit", 50, type=int),
+            namespace=request.args.get("namespace"),
+            min_ms=request.args.get("min_ms", 0, type=float),
+        ),
+        "tracer": tracer.stats(),
+        "otlp": _otlp_exporter.stats() if _otlp_exporter is not None else None,
+    })
+
+
+@app.route("/api/traces/<trace_id>")
+def get_trace(trace_id: str):
+    """One trace with all of its spans; ``?format=otlp`` returns OTLP JSON."""
+    if not _admin_request():
+        return jsonify({"error": "Not found"}), 404
+    trace = tracer.get(trace_id)
+    if trace is None:
+        return jsonify({"error": "Unknown trace"}), 404
+    if request.args.get("format") == "otlp":
+        return jsonify(tracing.to_otlp([trace]))
+    return jsonify(trace.to_dict())
+
+
+# ---------------------------------------------------------------------------
+# Profiles
+# ---------------------------------------------------------------------------
+# Searches sent with "profile": true and the admin token are sampled while
+# they run (see core/profiler.py). Profiles are files shared by the workers
+# and, like the searches, only available to holders of OSINT_ADMIN_TOKEN.
+
+
+@app.route("/api/profiles")
+def list_profiles():
+    """Stored job profiles, newest first (``limit``, default 50)."""
+    if not _admin_request():
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"profiles": profiler.recent(limit=request.args.get("limit", 50, type=int))})
+
+
+@app.route("/api/profiles/<job_id>")
+def get_profile(job_id: str):
+    """A job's profile as collapsed stacks; ``?format=speedscope`` returns speedscope JSON."""
+    if not _admin_request():
+        return jsonify({"error": "Not found"}), 404
+    profile = profiler.get(job_id)
+    if profile is None:
+        return jsonify({"error": "Unknown profile"}), 404
+    if request.args.get("format") == "speedscope":
+        return jsonify(to_speedscope(profile))
+    return Response(
+        profile["folded"],
+        mimetype="text/plain",
+        headers={"Content-Disposition": f"attachment; filename={job_id}.folded"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Batch searches
+# ---------------------------------------------------------------------------
+# POST /api/search/batch runs many module searches from one request and
+# streams their events back as NDJSON (see core/batch.py). Items are scheduled
+# and traced like Socket.IO searches, and always run on this process's shared
+# asyncio loop, also when OSINT_JOB_WORKERS is set.
+_batch_limits = BatchLimits.from_env()
+
+
+async def _run_batch_item(fn: Callable, item: BatchItem, emitter: LineEmitter, namespace: str, use_cache: bool) -> bool:
+    """Run one batch item's module search; True if its result reports an error."""
+    result = await fn(
+        item.query, emitter, namespace, use_cache=use_cache, cancel_event=item.cancel_event, **item.spec.kwargs,
+    )
+    return metrics.result_failed(result)
+
+
+def _launch_batch_item(item: BatchItem, emitter: LineEmitter, finished: Callable, use_cache: bool) -> None:
+    """Validate a batch item and schedule its search (a ``core.batch.Launcher``)."""
+    namespace = se.ns(item.module)
+    if item.spec.validator is not None:
+        ok, err = item.spec.validator(item.query)
+        if not ok:
+            finished(batch.STATUS_INVALID, {"error": err})
+            return
+    fn = registry.resolve(item.spec.target)
+    if not asyncio.iscoroutinefunction(fn):
+        finished(batch.STATUS_ERROR, {"error": f"{item.module} searches can't run in a batch"})
+        return
+
+    queued_at = time.monotonic()
+    trace = tracer.start_trace("job", namespace=namespace, query=item.query, batch=True)
+    queued = trace.start_span("queued", trace.root.span_id, tracing.KIND_INTERNAL, {}) if trace else None
+    details = {"trace_id": trace.trace_id} if trace else {}
+
+    def start(done):
+        started = time.monotonic()
+        metrics.job_queue_wait.labels(namespace).observe(started - queued_at)
+        if queued is not None:
+            queued.end()
+
+        def report(future) -> None:
+            cancelled = item.cancel_event.is_set()
+            failed, error = True, None
+            try:
+                failed = future.result()
+            except (asyncio.CancelledError, concurrent.futures.CancelledError, SearchCancelled):
+                cancelled = True
+            except Exception as exc:
+                logger.exception(f"Batch search failed for {namespace}: {exc}")
+                error = str(exc)
+            metrics.observe_job(namespace, time.monotonic() - started, cancelled=cancelled, failed=failed)
+            tracer.finish(trace, status=tracing.outcome_status(cancelled, failed), message=error)
+            done()
+            if cancelled:
+                finished(batch.STATUS_CANCELLED, details)
+            elif error is not None:
+                finished(batch.STATUS_ERROR, dict(details, error=error))
+            else:
+                finished(batch.STATUS_ERROR if failed else batch.STATUS_SUCCESS, details)
+
+        # The loop task runs in a copy of this context, so it stays in the job's trace.
+        with tracing.activate(trace.root if trace else None):
+            future = _loop_thread.submit(
+                run_cancellable(_run_batch_item(fn, item, emitter, namespace, use_cache), item.cancel_event)
+            )
+        future.add_done_callback(lambda fut: _bridge.call_soon(report, fut))
+
+    def dropped():
+        if queued is not None:
+            queued.end()
+        metrics.observe_job(namespace, None, cancelled=True, failed=False)
+        tracer.finish(trace, status=tracing.STATUS_CANCELLED)
+        finished(batch.STATUS_CANCELLED, details)
+
+    _scheduler.submit(Job(
+        namespace=namespace,
+        room=f"batch:{id(item)}",
+        cancel_event=item.cancel_event,
+        start=start,
+        trace_id=trace.trace_id if trace else None,
+        on_drop=dropped,
+    ))
+
+
+@app.route("/api/search/batch", methods=["POST"])
+def search_batch():
+    """Run a list of module searches and stream their events as NDJSON.
+
+    Body: ``{"searches": [{"module": "dns", "query": "example.com"}, ...]}``,
+    optionally with ``concurrency`` and ``no_cache``. See core/batch.py for the
+    line format.
+    """
+    busy = _busy_response(BATCH_NAMESPACE)
+    if busy is not None:
+        return busy
+    try:
+        parsed = parse_batch(request.get_json(silent=True), registry, _batch_limits)
+    except BatchError as exc:
+        return jsonify({"error": str(exc)}), 400
+    _bridge.start()
+    search = SearchBatch(
+        parsed,
+        lambda item, emitter, finished: _launch_batch_item(item, emitter, finished, parsed.use_cache),
+        _bridge.call_soon,
+    )
+    return Response(search.lines(), mimetype=batch.CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# Investigations
+# ---------------------------------------------------------------------------
+# POST /api/investigate fans out from one seed through the module searches
+# that take what earlier ones found (see core/pipeline.py) and streams the
+# events back as NDJSON. An investigation is scheduled as one job; its
+# searches run concurrently on this process's shared asyncio loop.
+_pipeline_limits = PipelineLimits.from_env()
+
+
+def _launch_investigation(investigation: Investigation, seed: entities.Entity, finished: Callable) -> None:
+    """Schedule *investigation*; ``finished(summary)`` is called on the hub once it is over."""
+    namespace = INVESTIGATE_NAMESPACE
+    cancel_event = investigation.cancel_event
+    queued_at = time.monotonic()
+    trace = tracer.start_trace("job", namespace=namespace, query=seed.value, entity=seed.type)
+    queued = trace.start_span("queued", trace.root.span_id, tracing.KIND_INTERNAL, {}) if trace else None
+
+    def start(done):
+        started = time.monotonic()
+        metrics.job_queue_wait.labels(namespace).observe(started - queued_at)
+        if queued is not None:
+            queued.end()
+
+        def report(future) -> None:
+            cancelled = cancel_event.is_set()
+            summary, error = None, None
+            try:
+                summary = future.result()
+            except (asyncio.CancelledError, concurrent.futures.CancelledError, SearchCancelled):
+                cancelled = True
+            except Exception as exc:
+                logger.exception(f"Investigation of {seed.value} failed: {exc}")
+                error = str(exc)
+            failed = error is not None
+            metrics.observe_job(namespace, time.monotonic() - started, cancelled=cancelled, failed=failed)
+            tracer.finish(trace, status=tracing.outcome_status(cancelled, failed), message=error)
+            done()
+            summary = summary or investigation.summary()
+            finished(dict(summary, error=error) if error else summary)
+
+        with tracing.activate(trace.root if trace else None):
+            future = _loop_thread.submit(investigation.run(seed))
+        future.add_done_callback(lambda fut: _bridge.call_soon(report, fut))
+
+    def dropped():
+        if queued is not None:
+            queued.end()
+        metrics.observe_job(namespace, None, cancelled=True, failed=False)
+        tracer.finish(trace, status=tracing.STATUS_CANCELLED)
+        finished(investigation.summary())
+
+    _scheduler.submit(Job(
+        namespace=namespace,
+        room=f"investigate:{id(investigation)}",
+        cancel_event=cancel_event,
+        start=start,
+        trace_id=trace.trace_id if trace else None,
+        on_drop=dropped,
+    ))
+
+
+@app.route("/api/investigate", methods=["POST"])
+def investigate():
+    """Investigate one seed and stream what each search finds as NDJSON.
+
+    Body: ``{"seed": "example.com"}``, optionally with ``type``, ``modules``,
+    ``max_depth``, ``max_fanout``, ``max_searches``, ``concurrency`` and
+    ``no_cache``. Lines are, in completion order: ``{"entity": ..., "depth",
+    "source"}`` for each entity visited (``source`` is the index of the search
+    that found it), the events of each search as in batch responses, a
+    ``{"index", "module", "entity", "status", ...}`` line once a search is
+    finished, and ``{"summary": ...}`` last.
+    """
+    busy = _busy_response(INVESTIGATE_NAMESPACE)
+    if busy is not None:
+        return busy
+    try:
+        parsed = parse_investigation(request.get_json(silent=True), registry, _pipeline_limits)
+    except PipelineError as exc:
+        return jsonify({"error": str(exc)}), 400
+    _bridge.start()
+    lines = LightQueue()
+
+    def put(line: str) -> None:
+        _bridge.call_soon(lines.put, line)
+
+    investigation = Investigation(
+        INVESTIGATE_NAMESPACE,
+        lambda node: LineEmitter(node.index, node.spec.name, put),
+        CancelToken(),
+        limits=parsed.limits,
+        specs=parsed.specs,
+        on_entity=lambda entity, depth, source: put(batch.encode({
+            "entity": entity.to_dict(),
+            "depth": depth,
+            "source": source.index if source is not None else None,
+        })),
+        on_search=lambda node: put(batch.encode(node.to_dict())),
+        use_cache=parsed.use_cache,
+    )
+
+    def finished(summary) -> None:
+        lines.put(batch.encode({"summary": summary}))
+        lines.put(None)
+
+    def body():
+        try:
+            while True:
+                line = lines.get()
+                if line is None:
+                    return
+                yield line
+        finally:
+            # Also when the client goes away mid-stream.
+            investigation.cancel_event.set()
+
+    _launch_investigation(investigation, parsed.seed, finished)
+    return Response(body(), mimetype=batch.CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# Status
+# ---------------------------------------------------------------------------
+@app.route("/api/status")
+def status():
+    """Scheduler load, result cache and pooled HTTP client counters for this worker.
+
+    With job workers enabled, module searches are cached and their requests
+    made (and counted) in the worker processes, so ``cache``, ``http`` and the
+    buffer counters in ``emission`` only cover searches run in-process.
+    """
+    return jsonify({
+        "scheduler": _scheduler.stats(),
+        "admission": _admission.stats(),
+        "cache": result_cache.stats(),
+        "coalescing": _coalescer.stats(),
+        "emission": _outbox.stats(),
+        "http": http_client.stats(),
+        "job_workers": _job_workers.stats() if _job_workers is not None else None,
+        "modules": registry.stats(),
+        "loop_lag": metrics.loop_lag_monitor.stats(),
+        "stalls": watchdog.stats(),
+    })
+
+
+@app.route("/api/socket-config")
+def socket_config():
+    """Wire format clients must use for Socket.IO, read before connecting."""
+    return jsonify(client_config(SOCKET_SERIALIZER))
+
 
 # ---------------------------------------------------------------------------
 # Connection lifecycle
@@ -0,0 +1,546 @@
+"""
+Load test: the whole backend under many concurrent Socket.IO clients.
+
+Starts the mock upstreams from ``bench/mock_upstreams.py`` and the backend
+under gunicorn (one eventlet worker by default), routed to the mocks with
+``OSINT_BENCH_UPSTREAMS`` (see ``bench/upstreams.py`` and ``bench/wsgi.py``). Then, for each ``--clients`` level, it connects
+that many websocket clients to every namespace in the mix. Each client
+searches back to back for ``--duration`` seconds and cancels a share
+``--cancel-rate`` of its searches part-way.
+
+Namespaces are picked by weight (``--mix ip=4,telegram=2``). Queries are
+distinct, so searches neither coalesce nor hit the result cache; with
+``--distinct N`` they cycle through N queries instead. Per level, the test
+reports:
+
+- completed searches per second, errors, timeouts and searches turned
+  away by admission control (``busy``)
+- p50/p99 time to the first event of a search and to its final result
+- cancels, and how long the cancel took to be acknowledged
+- dropped connections (disconnects the client did not ask for) and failed
+  connects
+- the server's CPU use and peak RSS (gunicorn master, workers and job-worker
+  processes, read from /proc), and its worst hub lag and largest scheduler
+  queue (scraped from ``/metrics``)
+
+The worker is saturated once more clients stop adding throughput. The last
+line names the first level where that happened.
+
+Domain namespaces (``subdomains``, ``wayback``, ``dns``, ``whois``,
+``domain``) validate their input with a DNS lookup, so they cycle through
+``--domains``. They need a resolver, and only ``subdomains`` and ``wayback``
+are served by the mocks. ``email`` and ``phone`` make no upstream requests,
+so they measure the web tier alone.
+
+Requirements (not part of the app image):
+    pip install "python-socketio[asyncio_client]" aiohttp
+
+Usage (from backend/, Linux):
+    python -m bench.load_test --clients 8 16 32 64 128 --duration 20
+    python -m bench.load_test --mix ip=1,username=1 --cancel-rate 0.2 --wmn-sites 200 \\
+        --server-env OSINT_JOB_WORKERS=2 --save /tmp/load.json
+    python -m bench.load_test --url http://127.0.0.1:5000 --pid 1234 --clients 32
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import socketio
+
+from bench.module_suite import _crypto_address, build_mocks, percentile
+from bench.upstreams import ENV_VAR
+from bench.worker_scaling import wait_for_server
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(BACKEND_DIR, "socket_events.json"), encoding="utf-8") as _f:
+    _MANIFEST = json.load(_f)
+NAMESPACES: Dict[str, Dict[str, str]] = _MANIFEST["namespaces"]
+SERVER_EVENTS: Dict[str, str] = _MANIFEST["serverEvents"]
+
+DOMAIN_NAMESPACES = ("subdomains", "wayback", "dns", "whois", "domain")
+
+# Namespace -> (manifest key of its search event, query for the i-th search).
+SEARCHES: Dict[str, Tuple[str, Callable[[int], str]]] = {
+    "ip": ("search", lambda i: f"8.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"),
+    "crypto": ("search", _crypto_address),
+    "telegram": ("search", lambda i: f"channel{i}"),
+    "mastodon": ("searchUsername", lambda i: f"user{i}"),
+    "username": ("search", lambda i: f"user{i}"),
+    "email": ("search", lambda i: f"user{i}@example.com"),
+    "phone": ("search", lambda i: f"+1555{i % 10 ** 7:07d}"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+@dataclass
+class Search:
+    """One search a client is waiting on."""
+
+    namespace: str
+    started: float
+    first_event: Optional[float] = None
+    cancelled: Optional[float] = None
+    final: Any = None
+    trace_ids: set = field(default_factory=set)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+@dataclass
+class LevelStats:
+    """What the clients of one level saw."""
+
+    searches: int = 0
+    completed: int = 0
+    errors: int = 0
+    busy: int = 0
+    timeouts: int = 0
+    cancels: int = 0
+    dropped: int = 0
+    connect_failures: int = 0
+    first_event: List[float] = field(default_factory=list)
+    complete: List[float] = field(default_factory=list)
+    cancel_ack: List[float] = field(default_factory=list)
+
+
+def final_result(search: Search, event: str, data: Any) -> Optional[Dict[str, Any]]:
+    """
+    The result in *data* that ends *search*, if any.
+
+    A search ends with a ``search_result`` that carries an error or a
+    ``result`` (WhatsMyName's ``start`` and ``site_found`` messages carry
+    neither). It can arrive on its own or among the items of a
+    ``search_result_batch``. A cancelled search only ends with the cancel
+    acknowledgement, so a result racing the cancel isn't taken for the next
+    search's.
+    """
+    if not isinstance(data, dict):
+        return None
+    if event == SERVER_EVENTS["result_batch"]:
+        for item in data.get("items") or ():
+            final = final_result(search, SERVER_EVENTS["result"], item)
+            if final is not None:
+                return final
+        return None
+    if event != SERVER_EVENTS["result"]:
+        return None
+    if search.cancelled is not None:
+        return data if data.get("status") == "cancelled" else None
+    return data if "error" in data or "result" in data else None
+
+
+class LoadClient:
+    """A websocket client connected to every namespace in the mix."""
+
+    def __init__(self, url: str, namespaces: List[str], stats: LevelStats):
+        self.url = url
+        self.namespaces = namespaces
+        self.stats = stats
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.current: Optional[Search] = None
+        # Trace ids of searches given up on; their late events are ignored.
+        self.stale: set = set()
+        self.closing = False
+        for namespace in namespaces:
+            for event in SERVER_EVENTS.values():
+                self.client.on(event, self._handler(event), namespace=f"/{namespace}")
+        self.client.on("disconnect", self._on_disconnect)
+
+    def _handler(self, event: str) -> Callable:
+        async def handle(data=None):
+            search = self.current
+            trace_id = data.get("trace_id") if isinstance(data, dict) else None
+            if search is None or trace_id in self.stale:
+                return
+            if search.first_event is None:
+                search.first_event = time.perf_counter()
+            if trace_id:
+                search.trace_ids.add(trace_id)
+            final = final_result(search, event, data)
+            if final is not None:
+                search.final = final
+                search.done.set()
+
+        return handle
+
+    async def _on_disconnect(self, *_reason) -> None:
+        if not self.closing:
+            self.stats.dropped += 1
+            if self.current is not None:
+                self.current.done.set()
+
+    async def connect(self) -> bool:
+        try:
+            await self.client.connect(
+                self.url, namespaces=[f"/{n}" for n in self.namespaces], transports=["websocket"], wait_timeout=30,
+            )
+            return True
+        except socketio.exceptions.ConnectionError:
+            self.stats.connect_failures += 1
+            return False
+
+    async def close(self) -> None:
+        self.closing = True
+        if self.client.connected:
+            await self.client.disconnect()
+
+    async def search(self, namespace: str, payload: Dict[str, Any], cancel_after: Optional[float], timeout: float):
+        """Run one search to its end, cancelling it after *cancel_after* seconds if given."""
+        ns = f"/{namespace}"
+        search = self.current = Search(namespace, time.perf_counter())
+        self.stats.searches += 1
+        event_key, _query = SEARCHES.get(namespace, ("search", None))
+        await self.client.emit(NAMESPACES[namespace][event_key], payload, namespace=ns)
+
+        if cancel_after is not None:
+            try:
+                await asyncio.wait_for(search.done.wait(), cancel_after)
+            except asyncio.TimeoutError:
+                await self._cancel(search, ns)
+        try:
+            await asyncio.wait_for(search.done.wait(), max(timeout - (time.perf_counter() - search.started), 0))
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            self.stale |= search.trace_ids
+            if search.cancelled is None and "cancel" in NAMESPACES[namespace]:
+                # Stop the server's job and drop its ack along with its results.
+                await self._cancel(search, ns, count=False)
+                try:
+                    await asyncio.wait_for(search.done.wait(), 5)
+                except asyncio.TimeoutError:
+                    pass
+            return
+        finally:
+            self.current = None
+
+        if search.final is None:
+            return  # disconnected
+        now = time.perf_counter()
+        if search.first_event is not None:
+            self.stats.first_event.append(search.first_event - search.started)
+        if search.cancelled is not None:
+            self.stats.cancel_ack.append(now - search.cancelled)
+            self.stale |= search.trace_ids
+        elif search.final.get("retry_in") is not None:
+            self.stats.busy += 1
+        elif search.final.get("error"):
+            self.stats.errors += 1
+        else:
+            self.stats.completed += 1
+            self.stats.complete.append(now - search.started)
+
+    async def _cancel(self, search: Search, ns: str, count: bool = True) -> None:
+        search.cancelled = time.perf_counter()
+        if count:
+            self.stats.cancels += 1
+        await self.client.emit(NAMESPACES[search.namespace]["cancel"], namespace=ns)
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+def start_server(args: argparse.Namespace, upstreams: str) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env[ENV_VAR] = upstreams
+    env.pop("TELEGRAM_BOT_TOKEN", None)
+    if args.message_queue:
+        env["SOCKETIO_MESSAGE_QUEUE"] = args.message_queue
+    for pair in args.server_env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "--worker-class", "eventlet",
+        "-w", str(args.workers),
+        "--bind", f"127.0.0.1:{args.port}",
+        "--log-level", "warning",
+        "bench.wsgi:app",
+    ]
+    log = open(args.server_log, "ab") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def _process_tree(root: int) -> List[int]:
+    """*root* and all of its descendants, from /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, ()))
+    return tree
+
+
+def _cpu_and_rss(pids: List[int]) -> Tuple[float, int]:
+    """CPU seconds used so far and resident bytes, summed over *pids*."""
+    ticks, pages = 0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rpartition(")")[2].split()
+        except OSError:
+            continue
+        # After the command name: utime and stime are fields 12 and 13, rss 22.
+        ticks += int(fields[11]) + int(fields[12])
+        pages += int(fields[21])
+    return ticks / os.sysconf("SC_CLK_TCK"), pages * os.sysconf("SC_PAGE_SIZE")
+
+
+_SAMPLE_RE = re.compile(r'^(\w+)(?:\{([^}]*)\})? (\S+)$', re.MULTILINE)
+
+
+def scrape(text: str, name: str, labels: str = "") -> Optional[float]:
+    """One sample's value from Prometheus exposition text."""
+    for metric, metric_labels, value in _SAMPLE_RE.findall(text):
+        if metric == name and (metric_labels or "") == labels:
+            return float(value)
+    return None
+
+
+class ServerSampler:
+    """Samples the server's CPU, memory, hub lag and queue while a level runs."""
+
+    def __init__(self, url: str, pid: Optional[int], interval: float = 1.0):
+        self.url = url
+        self.pid = pid
+        self.interval = interval
+        self.cpu_percent: List[float] = []
+        self.peak_rss = 0
+        self.hub_lag = 0.0
+        self.queued = 0.0
+
+    async def run(self) -> None:
+        last = None
+        async with aiohttp.ClientSession() as session:
+            while True:
+                if self.pid is not None:
+                    cpu, rss = _cpu_and_rss(_process_tree(self.pid))
+                    now = time.monotonic()
+                    if last is not None:
+                        self.cpu_percent.append((cpu - last[0]) / (now - last[1]) * 100)
+                    last = (cpu, now)
+                    self.peak_rss = max(self.peak_rss, rss)
+                try:
+                    async with session.get(f"{self.url}/metrics") as resp:
+                        text = await resp.text()
+                    self.hub_lag = max(self.hub_lag, scrape(text, "osint_event_loop_lag_latest_seconds", 'loop="hub"') or 0)
+                    self.queued = max(self.queued, scrape(text, "osint_scheduler_queued") or 0)
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(self.interval)
+
+
+# ---------------------------------------------------------------------------
+# Levels
+# ---------------------------------------------------------------------------
+def parse_mix(value: str) -> Dict[str, float]:
+    """``"ip=4,telegram=2"`` -> ``{"ip": 4.0, "telegram": 2.0}``."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in NAMESPACES:
+            raise SystemExit(f"Unknown namespace in --mix: {name}")
+        if name not in SEARCHES and name not in DOMAIN_NAMESPACES:
+            raise SystemExit(f"No queries for namespace {name}; choose from {sorted(SEARCHES) + list(DOMAIN_NAMESPACES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def query_for(namespace: str, i: int, domains: List[str]) -> str:
+    if namespace in DOMAIN_NAMESPACES:
+        return domains[i % len(domains)]
+    return SEARCHES[namespace][1](i)
+
+
+async def client_loop(client: LoadClient, args: argparse.Namespace, mix: Dict[str, float],
+                      counter: itertools.count, rng: random.Random, stop_at: float) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < stop_at and client.client.connected:
+        namespace = rng.choices(names, weights)[0]
+        i = next(counter)
+        if args.distinct:
+            i %= args.distinct
+        payload = {"query": query_for(namespace, i, args.domains)}
+        if args.no_cache:
+            payload["no_cache"] = True
+        cancel_after = None
+        if "cancel" in NAMESPACES[namespace] and rng.random() < args.cancel_rate:
+            cancel_after = rng.uniform(0, args.cancel_after)
+        await client.search(namespace, payload, cancel_after, args.timeout)
+        if args.think:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+
+
+async def run_level(url: str, pid: Optional[int], clients: int, args: argparse.Namespace,
+                    mix: Dict[str, float]) -> Dict[str, Any]:
+    stats = LevelStats()
+    pool = [LoadClient(url, list(mix), stats) for _ in range(clients)]
+    connected = await asyncio.gather(*(client.connect() for client in pool))
+    pool = [client for client, ok in zip(pool, connected) if ok]
+
+    sampler = ServerSampler(url, pid)
+    sampling = asyncio.ensure_future(sampler.run())
+    counter = itertools.count(clients * 100000)
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(
+            client_loop(client, args, mix, counter, random.Random(args.seed * 7919 + n), started + args.duration)
+            for n, client in enumerate(pool)
+        ))
+    finally:
+        elapsed = time.monotonic() - started
+        sampling.cancel()
+        await asyncio.gather(sampling, *(client.close() for client in pool), return_exceptions=True)
+
+    def ms(values: List[float], pct: float) -> Optional[float]:
+        value = percentile(values, pct)
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "searches": stats.searches,
+        "completed": stats.completed,
+        "throughput": round(stats.completed / elapsed, 2),
+        "errors": stats.errors,
+        "busy": stats.busy,
+        "timeouts": stats.timeouts,
+        "cancels": stats.cancels,
+        "dropped": stats.dropped,
+        "connect_failures": stats.connect_failures,
+        "first_event_p50_ms": ms(stats.first_event, 50),
+        "first_event_p99_ms": ms(stats.first_event, 99),
+        "complete_p50_ms": ms(stats.complete, 50),
+        "complete_p99_ms": ms(stats.complete, 99),
+        "cancel_ack_p50_ms": ms(stats.cancel_ack, 50),
+        "server_cpu_percent": round(sum(sampler.cpu_percent) / len(sampler.cpu_percent), 1)
+        if sampler.cpu_percent else None,
+        "server_peak_rss_mb": round(sampler.peak_rss / 2 ** 20, 1) if pid is not None else None,
+        "hub_lag_max_ms": round(sampler.hub_lag * 1000, 1),
+        "queued_max": int(sampler.queued),
+    }
+
+
+def saturation(results: List[Dict[str, Any]], gain: float = 1.1) -> Optional[Dict[str, Any]]:
+    """The first level whose throughput is less than *gain* times the previous level's."""
+    for before, after in zip(results, results[1:]):
+        if after["throughput"] < before["throughput"] * gain:
+            return after
+    return None
+
+
+def report(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'clients':>7} {'searches/s':>10} {'errors':>6} {'busy':>6} {'timeout':>7} {'cancels':>7} {'dropped':>7}"
+        f" {'first p50':>9} {'first p99':>9} {'done p50':>9} {'done p99':>9} {'cancel':>7}"
+        f" {'cpu %':>6} {'rss MB':>7} {'lag ms':>7} {'queued':>6}"
+    )
+    for r in results:
+        print(
+            f"{r['clients']:>7} {r['throughput']:>10} {r['errors']:>6} {r['busy']:>6} {r['timeouts']:>7} {r['cancels']:>7}"
+            f" {r['dropped'] + r['connect_failures']:>7} {str(r['first_event_p50_ms']):>9}"
+            f" {str(r['first_event_p99_ms']):>9} {str(r['complete_p50_ms']):>9} {str(r['complete_p99_ms']):>9}"
+            f" {str(r['cancel_ack_p50_ms']):>7} {str(r['server_cpu_percent']):>6}"
+            f" {str(r['server_peak_rss_mb']):>7} {r['hub_lag_max_ms']:>7} {r['queued_max']:>6}"
+        )
+    saturated = saturation(results)
+    if saturated is not None:
+        print(f"Throughput stopped scaling at {saturated['clients']} clients ({saturated['throughput']} searches/s)")
+    elif len(results) > 1:
+        print("Throughput still scaled at the highest level; try more clients")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[8, 16, 32, 64], help="Concurrent clients per level")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--mix", default="ip=4,telegram=2,crypto=1,mastodon=1,username=1",
+                        help="Namespaces searched, with weights")
+    parser.add_argument("--cancel-rate", type=float, default=0.1, help="Share of searches cancelled part-way")
+    parser.add_argument("--cancel-after", type=float, default=0.5, help="Cancel within this many seconds")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean pause between a client's searches")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a search counts as timed out")
+    parser.add_argument("--distinct", type=int, default=0, help="Cycle through this many queries (0: all distinct)")
+    parser.add_argument("--no-cache", action="store_true", help="Send no_cache with every search")
+    parser.add_argument("--domains", nargs="+", default=["example.com", "example.org", "example.net"])
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="With --url: the server's (gunicorn master's) pid, for CPU and RSS")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers (more need --message-queue)")
+    parser.add_argument("--message-queue", help="SOCKETIO_MESSAGE_QUEUE for the server")
+    parser.add_argument("--server-env", action="append", default=[], help="KEY=VALUE for the server's environment")
+    parser.add_argument("--server-log", help="Append the server's output to this file")
+    parser.add_argument("--port", type=int, default=5056)
+    # Mock upstreams, as in bench/module_suite.py.
+    parser.add_argument("--latency", action="append", default=[], help="Seconds per response, or upstream=seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread, as a fraction of it")
+    parser.add_argument("--error-rate", action="append", default=[], help="Share of failed responses, or upstream=share")
+    parser.add_argument("--error-kind", choices=["status", "reset"], default="status")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--crtsh-entries", type=int, default=2000)
+    parser.add_argument("--wmn-sites", type=int, default=600)
+    parser.add_argument("--masto-instances", type=int, default=200)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    mocks = server = None
+    url, pid = args.url, args.pid
+    try:
+        if url is None:
+            mocks = build_mocks(args)
+            server = start_server(args, mocks.env())
+            url, pid = f"http://127.0.0.1:{args.port}", server.pid
+            asyncio.run(wait_for_server(url))
+        results = []
+        for clients in args.clients:
+            if mocks is not None:
+                mocks.reset_stats()
+            results.append(asyncio.run(run_level(url, pid, clients, args, mix)))
+            if mocks is not None:
+                results[-1]["upstreams"] = {name: s for name, s in mocks.snapshot().items() if s["requests"]}
+    finally:
+        if server is not None:
+            stop_server(server)
+        if mocks is not None:
+            mocks.stop()
+
+    report(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "save"}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Local mock upstreams for offline benchmarks.
+
+Each upstream the modules talk to is an aiohttp app on its own port on
+127.0.0.1, answering with generated responses shaped like the real ones:
+
+- ``crtsh``: crt.sh JSON certificate search (``--crtsh-entries`` certificates)
+- ``wayback``: Wayback Machine CDX JSON (``limit`` rows)
+- ``shodan``: Shodan InternetDB host records
+- ``blockcypher``: BlockCypher BTC/ETH address summaries
+- ``github``: raw.githubusercontent.com, serving the WhatsMyName site list
+  (``--wmn-sites`` sites) and the Masto instance list (``--masto-instances``)
+- ``wmn_sites``: every WhatsMyName site page (hosts ``*.wmn.bench``)
+- ``mastodon``: mastodon.social search API and the listed instances
+  (``*.masto.bench``)
+- ``telegram``: t.me profile pages
+
+Responses are deterministic for a given seed and query, so runs compare.
+Every upstream adds ``latency`` seconds (+/- ``jitter`` as a fraction) to
+each response, and fails a fraction ``error_rate`` of requests with a 503
+(``error_kind="status"``) or a dropped connection (``"reset"``). Requests,
+errors and distinct client connections are counted per upstream.
+
+``MockUpstreams.env()`` is the ``OSINT_BENCH_UPSTREAMS`` value that routes
+the app's HTTP client to the mocks (see ``bench/upstreams.py``).
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+WMN_DOMAIN = "wmn.bench"
+MASTO_DOMAIN = "masto.bench"
+WMN_LIST_PATH = "/WebBreacher/WhatsMyName/main/wmn-data.json"
+MASTO_LIST_PATH = "/C3n7ral051nt4g3ncy/Masto/master/fediverse_instances.json"
+
+ISSUERS = (
+    "C=US, O=Let's Encrypt, CN=R3",
+    "C=US, O=Let's Encrypt, CN=E1",
+    "C=US, O=DigiCert Inc, CN=DigiCert TLS RSA SHA256 2020 CA1",
+    "C=GB, ST=Greater Manchester, L=Salford, O=Sectigo Limited, CN=Sectigo RSA Domain Validation Secure Server CA",
+)
+MIMETYPES = ("text/html", "text/html", "text/html", "image/png", "application/javascript", "text/css")
+UPSTREAMS = ("crtsh", "wayback", "shodan", "blockcypher", "github", "wmn_sites", "mastodon", "telegram")
+
+PORTS = (22, 25, 53, 80, 110, 143, 443, 587, 993, 3306, 5432, 8080, 8443)
+
+
+@dataclass
+class Faults:
+    """Latency and error injection for one upstream."""
+
+    latency: float = 0.05
+    jitter: float = 0.5
+    error_rate: float = 0.0
+    error_kind: str = "status"
+
+
+@dataclass
+class UpstreamStats:
+    requests: int = 0
+    errors: int = 0
+    connections: set = field(default_factory=set)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections": len(self.connections),
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def _rng(*parts: Any) -> random.Random:
+    """A generator seeded by *parts*, so the same request gets the same answer."""
+    digest = hashlib.sha256("|".join(map(str, parts)).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _hit(rng: random.Random, rate: float) -> bool:
+    return rng.random() < rate
+
+
+# ---------------------------------------------------------------------------
+# Response generators
+# ---------------------------------------------------------------------------
+def crtsh_entries(domain: str, count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = _rng(seed, "crtsh", domain)
+    labels = [f"{rng.choice(('www', 'mail', 'api', 'dev', 'staging', 'vpn', 'cdn', 'app'))}{i}" for i in range(max(count // 4, 1))]
+    entries = []
+    for i in range(count):
+        names = {f"{rng.choice(labels)}.{domain}" for _ in range(rng.randint(1, 3))}
+        if rng.random() < 0.2:
+            names.add(f"*.{domain}")
+        entries.append({
+            "issuer_ca_id": 180000 + rng.randint(0, 5000),
+            "issuer_name": rng.choice(ISSUERS),
+            "common_name": sorted(names)[0],
+            "name_value": "\n".join(sorted(names)),
+            "id": 9000000000 + i,
+            "entry_timestamp": f"20{rng.randint(15, 24)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:00:00.000",
+            "not_before": "2024-01-01T00:00:00",
+            "not_after": "2024-04-01T00:00:00",
+            "serial_number": f"{rng.getrandbits(128):032x}",
+            "result_count": len(names) + 1,
+        })
+    return entries
+
+
+def cdx_rows(domain: str, limit: int, seed: int) -> List[List[str]]:
+    rng = _rng(seed, "cdx", domain)
+    rows = [["timestamp", "original", "statuscode", "mimetype", "digest", "length"]]
+    for _ in range(limit):
+        path = "/".join(rng.choice(("blog", "about", "news", "img", "static", "en", "contact", "post")) for _ in range(rng.randint(0, 3)))
+        rows.append([
+            f"20{rng.randint(5, 24):02d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}{rng.randint(0, 235959):06d}",
+            f"http://{rng.choice(('', 'www.'))}{domain}/{path}",
+            "200",
+            rng.choice(MIMETYPES),
+            f"{rng.getrandbits(160):040X}"[:32],
+            str(rng.randint(300, 90000)),
+        ])
+    return rows
+
+
+def internetdb_host(ip: str, seed: int) -> Optional[Dict[str, Any]]:
+    rng = _rng(seed, "shodan", ip)
+    if _hit(rng, 0.2):
+        return None
+    ports = sorted(rng.sample(PORTS, rng.randint(1, 6)))
+    return {
+        "cpes": [f"cpe:/a:vendor{rng.randint(1, 50)}:product:{rng.randint(1, 9)}.{rng.randint(0, 9)}" for _ in range(rng.randint(0, 4))],
+        "hostnames": [f"host{rng.randint(1, 999)}.example.net" for _ in range(rng.randint(0, 3))],
+        "ip": ip,
+        "ports": ports,
+        "tags": rng.sample(["cloud", "cdn", "vpn", "self-signed", "database"], rng.randint(0, 2)),
+        "vulns": [f"CVE-20{rng.randint(10, 24)}-{rng.randint(1000, 49999)}" for _ in range(rng.randint(0, 12))],
+    }
+
+
+def blockcypher_address(chain: str, address: str, seed: int) -> Dict[str, Any]:
+    rng = _rng(seed, "blockcypher", chain, address)
+    unit = 10 ** 8 if chain == "btc" else 10 ** 18
+    txrefs = []
+    height = 830000 if chain == "btc" else 19000000
+    for i in range(rng.randint(5, 50)):
+        txrefs.append({
+            "tx_hash": f"{rng.getrandbits(256):064x}",
+            "block_height": height - i * rng.randint(1, 500),
+            "tx_input_n": -1 if i % 2 else 0,
+            "tx_output_n": 0 if i % 2 else -1,
+            "value": rng.randint(1, 5 * unit),
+            "ref_balance": rng.randint(0, 10 * unit),
+            "spent": bool(i % 3),
+            "confirmations": i * 10 + 1,
+            "confirmed": f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T10:00:00Z",
+            "double_spend": False,
+        })
+    received = sum(t["value"] for t in txrefs if t["tx_output_n"] >= 0)
+    sent = sum(t["value"] for t in txrefs if t["tx_input_n"] >= 0)
+    return {
+        "address": address,
+        "total_received": received,
+        "total_sent": sent,
+        "balance": max(received - sent, 0),
+        "unconfirmed_balance": 0,
+        "final_balance": max(received - sent, 0),
+        "n_tx": len(txrefs),
+        "unconfirmed_n_tx": 0,
+        "final_n_tx": len(txrefs),
+        "txrefs": txrefs,
+        "tx_url": f"https://api.blockcypher.com/v1/{chain}/main/txs/",
+    }
+
+
+def wmn_site_list(count: int) -> Dict[str, Any]:
+    categories = ("social", "gaming", "coding", "art", "music", "news", "shopping", "video")
+    sites = []
+    for i in range(count):
+        sites.append({
+            "name": f"Site{i}",
+            "uri_check": f"https://s{i}.{WMN_DOMAIN}/users/{{account}}",
+            "uri_pretty": f"https://s{i}.{WMN_DOMAIN}/@{{account}}",
+            "e_code": 200,
+            "e_string": "profile-header",
+            "m_string": "Page not found",
+            "m_code": 404,
+            "known": ["admin", "test"],
+            "cat": categories[i % len(categories)],
+        })
+    return {"license": ["CC BY-SA 4.0"], "authors": ["bench"], "categories": list(categories), "sites": sites}
+
+
+def masto_instance_list(count: int) -> Dict[str, Any]:
+    return {"sites": [
+        {
+            "name": f"m{i}.{MASTO_DOMAIN}",
+            "uri_check": f"https://m{i}.{MASTO_DOMAIN}/@{{account}}",
+            "e_string": "profile:username",
+        }
+        for i in range(count)
+    ]}
+
+
+def profile_page(title: str, username: str, rng: random.Random, marker: str, size: int) -> str:
+    """An HTML profile page of roughly *size* bytes containing *marker*."""
+    filler = []
+    while sum(map(len, filler)) < size:
+        filler.append(f"<div class=\"post\"><p>{rng.getrandbits(256):064x} {username}</p></div>\n")
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{title} ({username})</title>"
+        f"<meta property=\"og:title\" content=\"{username}\">"
+        f"<meta property=\"og:description\" content=\"Profile of {username}\">"
+        f"<meta name=\"{marker}\" content=\"{username}\">"
+        "</head><body>"
+        f"<header class=\"{marker}\"><h1>{username}</h1><a href=\"https://example.org/{username}\">site</a></header>"
+        + "".join(filler)
+        + "</body></html>"
+    )
+
+
+def mastodon_account(username: str, instance: str, seed: int) -> Dict[str, Any]:
+    rng = _rng(seed, "masto-account", username)
+    return {
+        "id": str(rng.getrandbits(60)),
+        "username": username,
+        "acct": username,
+        "display_name": username.title(),
+        "locked": False,
+        "bot": False,
+        "discoverable": True,
+        "group": False,
+        "created_at": "2022-11-05T00:00:00.000Z",
+        "note": f"<p>Hello, I am {username}.</p>",
+        "url": f"https://{instance}/@{username}",
+        "avatar": f"https://{instance}/avatars/{username}.png",
+        "followers_count": rng.randint(0, 5000),
+        "following_count": rng.randint(0, 900),
+        "statuses_count": rng.randint(0, 20000),
+        "last_status_at": "2024-05-01",
+        "fields": [{"name": "Website", "value": f"<a href=\"https://example.org/{username}\">example.org</a>"}],
+    }
+
+
+def tme_page(username: str, seed: int) -> str:
+    rng = _rng(seed, "tme", username)
+    kind = rng.choice(("subscribers", "members", ""))
+    extra = f"{rng.randint(1, 999)} {rng.randint(100, 999)} {kind}" if kind else f"@{username}"
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<meta property=\"og:title\" content=\"{username.title()}\">"
+        f"<meta property=\"og:description\" content=\"News and updates from {username}\">"
+        f"<meta property=\"og:image\" content=\"https://cdn.telegram.bench/{username}.jpg\">"
+        "</head><body><div class=\"tgme_page\">"
+        f"<div class=\"tgme_page_title\"><span>{username.title()}</span></div>"
+        f"<div class=\"tgme_page_extra\">{extra}</div>"
+        f"<div class=\"tgme_page_description\">News and updates from {username}. " + "Lorem ipsum " * rng.randint(5, 60) + "</div>"
+        f"<a class=\"tgme_action_button_new\" href=\"tg://resolve?domain={username}\">View in Telegram</a>"
+        "</div></body></html>"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Apps
+# ---------------------------------------------------------------------------
+class MockUpstreams:
+    """The mock upstreams, served from a background thread."""
+
+    def __init__(
+        self,
+        faults: Optional[Dict[str, Faults]] = None,
+        default_faults: Optional[Faults] = None,
+        seed: int = 1,
+        crtsh_entries: int = 2000,
+        wmn_sites: int = 600,
+        wmn_hit_rate: float = 0.05,
+        masto_instances: int = 200,
+        masto_hit_rate: float = 0.01,
+        page_bytes: int = 30000,
+    ):
+        """
+        Args:
+            faults: Latency and errors per upstream name
+            default_faults: For upstreams not in *faults*
+            seed: Seed for generated responses
+            crtsh_entries: Certificates in each crt.sh answer
+            wmn_sites: Sites in the WhatsMyName list
+            wmn_hit_rate: Share of WhatsMyName sites where the account exists
+            masto_instances: Instances in the Masto list
+            masto_hit_rate: Share of instances where the account exists
+            page_bytes: Approximate size of generated profile pages
+        """
+        self.faults = faults or {}
+        self.default_faults = default_faults or Faults()
+        self.seed = seed
+        self.crtsh_entries = crtsh_entries
+        self.wmn_sites = wmn_sites
+        self.wmn_hit_rate = wmn_hit_rate
+        self.masto_instances = masto_instances
+        self.masto_hit_rate = masto_hit_rate
+        self.page_bytes = page_bytes
+        self.ports: Dict[str, int] = {}
+        self.stats: Dict[str, UpstreamStats] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runners: List[web.AppRunner] = []
+        self._cache: Dict[Any, bytes] = {}
+
+    # Upstream name -> (hosts routed to it, app factory).
+    def _upstreams(self) -> Dict[str, Any]:
+        return {
+            "crtsh": (["crt.sh"], self._crtsh_app),
+            "wayback": (["web.archive.org"], self._wayback_app),
+            "shodan": (["internetdb.shodan.io"], self._shodan_app),
+            "blockcypher": (["api.blockcypher.com"], self._blockcypher_app),
+            "github": (["raw.githubusercontent.com"], self._github_app),
+            "wmn_sites": ([f"*.{WMN_DOMAIN}"], self._wmn_sites_app),
+            "mastodon": (["mastodon.social", f"*.{MASTO_DOMAIN}"], self._mastodon_app),
+            "telegram": (["t.me"], self._telegram_app),
+        }
+
+    def env(self) -> str:
+        """``OSINT_BENCH_UPSTREAMS`` routing every mocked host to its mock."""
+        routes = []
+        for name, (hosts, _factory) in self._upstreams().items():
+            routes.extend(f"{host}=http://127.0.0.1:{self.ports[name]}" for host in hosts)
+        return ",".join(routes)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def reset_stats(self) -> None:
+        for name in self.stats:
+            self.stats[name] = UpstreamStats()
+
+    # ----- lifecycle --------------------------------------------------------
+
+    def start(self) -> "MockUpstreams":
+        """Start every upstream on an ephemeral port; returns once they listen."""
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self._start_apps())
+            except BaseException as exc:
+                errors.append(exc)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="mock-upstreams", daemon=True).start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_apps(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _start_apps(self) -> None:
+        for name, (_hosts, factory) in self._upstreams().items():
+            app = web.Application(middlewares=[self._middleware(name)])
+            factory(app)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self._runners.append(runner)
+            self.ports[name] = site._server.sockets[0].getsockname()[1]
+            self.stats[name] = UpstreamStats()
+
+    async def _stop_apps(self) -> None:
+        for runner in self._runners:
+            await runner.cleanup()
+
+    def _middleware(self, name: str) -> Callable:
+        @web.middleware
+        async def inject(request: web.Request, handler):
+            stats = self.stats[name]
+            faults = self.faults.get(name, self.default_faults)
+            stats.requests += 1
+            stats.connections.add(id(request.transport))
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            try:
+                if faults.latency > 0:
+                    spread = faults.latency * faults.jitter
+                    await asyncio.sleep(max(random.uniform(faults.latency - spread, faults.latency + spread), 0))
+                if faults.error_rate > 0 and random.random() < faults.error_rate:
+                    stats.errors += 1
+                    if faults.error_kind == "reset" and request.transport is not None:
+                        request.transport.close()
+                    return web.Response(status=503, text="Service Unavailable")
+                return await handler(request)
+            finally:
+                stats.in_flight -= 1
+
+        return inject
+
+    def _cached_json(self, key: Any, build: Callable[[], Any]) -> web.Response:
+        body = self._cache.get(key)
+        if body is None:
+            body = self._cache[key] = json.dumps(build()).encode()
+        return web.Response(body=body, content_type="application/json")
+
+    # ----- upstream apps ----------------------------------------------------
+
+    def _crtsh_app(self, app: web.Application) -> None:
+        async def search(request: web.Request) -> web.Response:
+            domain = request.query.get("q", "example.com").lstrip("%.")
+            return self._cached_json(("crtsh", domain), lambda: crtsh_entries(domain, self.crtsh_entries, self.seed))
+
+        app.router.add_get("/", search)
+
+    def _wayback_app(self, app: web.Application) -> None:
+        async def cdx(request: web.Request) -> web.Response:
+            domain = request.query.get("url", "example.com")
+            limit = int(request.query.get("limit", 500))
+            return self._cached_json(("cdx", domain, limit), lambda: cdx_rows(domain, limit, self.seed))
+
+        app.router.add_get("/cdx/search/cdx", cdx)
+
+    def _shodan_app(self, app: web.Application) -> None:
+        async def host(request: web.Request) -> web.Response:
+            record = internetdb_host(request.match_info["ip"], self.seed)
+            if record is None:
+                return web.json_response({"detail": "No information available"}, status=404)
+            return web.json_response(record)
+
+        app.router.add_get("/{ip}", host)
+
+    def _blockcypher_app(self, app: web.Application) -> None:
+        async def address(request: web.Request) -> web.Response:
+            chain, addr = request.match_info["chain"], request.match_info["address"]
+            return web.json_response(blockcypher_address(chain, addr, self.seed))
+
+        app.router.add_get("/v1/{chain}/main/addrs/{address}", address)
+
+    def _github_app(self, app: web.Application) -> None:
+        async def wmn(_request: web.Request) -> web.Response:
+            return self._cached_json(("wmn", self.wmn_sites), lambda: wmn_site_list(self.wmn_sites))
+
+        async def masto(_request: web.Request) -> web.Response:
+            # Served as text/plain like raw.githubusercontent.com does.
+            body = json.dumps(masto_instance_list(self.masto_instances))
+            return web.Response(text=body, content_type="text/plain")
+
+        app.router.add_get(WMN_LIST_PATH, wmn)
+        app.router.add_get(MASTO_LIST_PATH, masto)
+
+    def _wmn_sites_app(self, app: web.Application) -> None:
+        async def profile(request: web.Request) -> web.Response:
+            site, account = request.host.split(".")[0], request.match_info["account"]
+            rng = _rng(self.seed, "wmn", site, account)
+            if not _hit(rng, self.wmn_hit_rate):
+                return web.Response(status=404, text="<html><body>Page not found</body></html>", content_type="text/html")
+            page = profile_page(site, account, rng, "profile-header", self.page_bytes)
+            return web.Response(text=page, content_type="text/html")
+
+        app.router.add_get("/users/{account}", profile)
+
+    def _mastodon_app(self, app: web.Application) -> None:
+        async def search(request: web.Request) -> web.Response:
+            username = request.query.get("q", "")
+            return web.json_response({"accounts": [mastodon_account(username, "mastodon.social", self.seed)], "statuses": [], "hashtags": []})
+
+        async def profile(request: web.Request) -> web.Response:
+            instance, account = request.host, request.match_info["account"]
+            rng = _rng(self.seed, "masto", instance, account)
+            if not _hit(rng, self.masto_hit_rate):
+                return web.Response(status=404, text="<html><body>The page you are looking for isn't here.</body></html>", content_type="text/html")
+            page = profile_page(instance, account, rng, "profile:username", self.page_bytes)
+            return web.Response(text=page, content_type="text/html")
+
+        app.router.add_get("/api/v2/search", search)
+        app.router.add_get("/@{account}", profile)
+
+    def _telegram_app(self, app: web.Application) -> None:
+        async def page(request: web.Request) -> web.Response:
+            return web.Response(text=tme_page(request.match_info["username"], self.seed), content_type="text/html")
+
+        app.router.add_get("/{username}", page)
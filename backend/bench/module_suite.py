@@ -0,0 +1,291 @@
+"""
+Benchmark: module searches end to end against local mock upstreams.
+
+Starts the mock upstreams from ``bench/mock_upstreams.py`` and runs each
+module's ``search`` through the shared HTTP client, routed to the mocks with
+``OSINT_BENCH_UPSTREAMS`` (see ``bench/upstreams.py``). Each module runs in a
+fresh interpreter, so memory and connection counts are its own. A run issues
+``--searches`` searches with ``--concurrency`` in flight and reports, per
+module:
+
+- throughput (searches/s) and p50/p99 search latency
+- searches that ended in an error
+- the process's peak RSS
+- connections the HTTP client opened and reused, and the distinct connections
+  the mocks saw
+
+Latency and errors are injected by the mocks: ``--latency`` seconds per
+response (``--jitter`` as a fraction), and ``--error-rate`` of responses fail
+with a 503 or a dropped connection (``--error-kind``). ``--latency`` and
+``--error-rate`` also take ``upstream=value`` to set one upstream only (see
+``bench/mock_upstreams.py`` for their names).
+
+Everything runs on 127.0.0.1, so the suite works offline. Save a run with
+``--save`` and compare a later one against it with ``--baseline``.
+
+Usage (from backend/, with the app's requirements installed):
+    python -m bench.module_suite --searches 20 --concurrency 4 --save /tmp/before.json
+    python -m bench.module_suite --modules crtsh whatsmyname --latency 0.2 --latency crtsh=1.5 \\
+        --error-rate 0.02 --baseline /tmp/before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from bench.upstreams import ENV_VAR, install
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class Case:
+    """How to drive one module: its import target and the queries to send."""
+
+    target: str
+    query: Callable[[int], str]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+# A few distinct domains, so large answers are generated once by the mocks.
+def _domain(i: int) -> str:
+    return f"bench{i % 8}.example.com"
+
+
+def _crypto_address(i: int) -> str:
+    if i % 2:
+        return f"0x{i:040x}"
+    return "1BenchAddr" + "".join("123456789ABCDEFGHJKLMNPQRSTUVWXYZ"[(i + n) % 33] for n in range(24))
+
+
+CASES: Dict[str, Case] = {
+    "crtsh": Case("domain.subdomains.crtsh_module:crtsh_module", _domain),
+    "wayback": Case("network.wayback.wayback_module:wayback_module", _domain),
+    "ip": Case("network.ip.ip_module:ip_module", lambda i: f"10.0.{i // 256 % 256}.{i % 256}"),
+    "crypto": Case("network.crypto.crypto_module:crypto_module", _crypto_address),
+    "mastodon": Case(
+        "social_networks.mastodon.mastodon_module:mastodon_module", lambda i: f"user{i}", {"search_type": "username"},
+    ),
+    "whatsmyname": Case("username.whatsmyname.whatsmyname_module:whatsmyname_module", lambda i: f"user{i}"),
+    "telegram": Case("social_networks.telegram.telegram_module:telegram_module", lambda i: f"channel{i}"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Child: one module, in its own interpreter
+# ---------------------------------------------------------------------------
+class _NullEmitter:
+    """Stands in for SocketIO: counts events instead of sending them."""
+
+    def __init__(self):
+        self.events = 0
+
+    def emit(self, *_args: Any, **_kwargs: Any) -> None:
+        self.events += 1
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of *values*."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def drive(name: str, searches: int, concurrency: int) -> Dict[str, Any]:
+    from core import metrics
+    from core.http_client import http_client
+    from core.registry import resolve_target
+
+    case = CASES[name]
+    module = resolve_target(case.target)
+    emitter = _NullEmitter()
+    namespace = f"/{name}"
+
+    # One untimed search, so imports and the first connections don't count.
+    await module.search(case.query(searches), emitter, namespace, room="bench", **case.kwargs)
+
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(searches):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                result = await module.search(case.query(i), emitter, namespace, room="bench", **case.kwargs)
+                failed = metrics.result_failed(result)
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    http = http_client.stats()
+    await http_client.close()
+    return {
+        "module": name,
+        "searches": searches,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput": round(searches / elapsed, 3) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "errors": errors,
+        "events": emitter.events,
+        # ru_maxrss is in KiB on Linux.
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "requests": http["requests"],
+        "connections_created": http["connections_created"],
+        "connections_reused": http["connections_reused"],
+    }
+
+
+def run_child(name: str, searches: int, concurrency: int) -> None:
+    import logging
+
+    logging.basicConfig(level=logging.CRITICAL)
+    install()
+    result = asyncio.run(drive(name, searches, concurrency))
+    print(json.dumps(result))
+
+
+# ---------------------------------------------------------------------------
+# Parent: mocks and reporting
+# ---------------------------------------------------------------------------
+def parse_overrides(values: List[str], default: float) -> Dict[str, float]:
+    """``["0.1", "crtsh=1.5"]`` -> ``{"*": 0.1, "crtsh": 1.5}``."""
+    parsed = {"*": default}
+    for value in values:
+        name, _, number = value.rpartition("=")
+        parsed[name or "*"] = float(number)
+    return parsed
+
+
+def build_mocks(args: argparse.Namespace):
+    from bench.mock_upstreams import UPSTREAMS, Faults, MockUpstreams
+
+    latency = parse_overrides(args.latency, 0.05)
+    error_rate = parse_overrides(args.error_rate, 0.0)
+
+    def faults(name: str) -> Faults:
+        return Faults(
+            latency=latency.get(name, latency["*"]),
+            jitter=args.jitter,
+            error_rate=error_rate.get(name, error_rate["*"]),
+            error_kind=args.error_kind,
+        )
+
+    return MockUpstreams(
+        faults={name: faults(name) for name in UPSTREAMS},
+        default_faults=faults("*"),
+        seed=args.seed,
+        crtsh_entries=args.crtsh_entries,
+        wmn_sites=args.wmn_sites,
+        masto_instances=args.masto_instances,
+    ).start()
+
+
+def measure(name: str, args: argparse.Namespace, mocks) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env[ENV_VAR] = mocks.env()
+    env.pop("TELEGRAM_BOT_TOKEN", None)
+    mocks.reset_stats()
+    proc = subprocess.run(
+        [sys.executable, "-m", "bench.module_suite", "--child", name,
+         "--searches", str(args.searches), "--concurrency", str(args.concurrency)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"Benchmarking {name} failed (exit {proc.returncode})")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    upstreams = {upstream: stats for upstream, stats in mocks.snapshot().items() if stats["requests"]}
+    result["upstream_connections"] = sum(stats["connections"] for stats in upstreams.values())
+    result["upstreams"] = upstreams
+    return result
+
+
+def _delta(current: Optional[float], before: Optional[float]) -> str:
+    if not current or not before:
+        return ""
+    return f" ({(current - before) / before * 100:+.0f}%)"
+
+
+def report(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(
+        f"{'module':>12} {'searches/s':>16} {'p50 ms':>16} {'p99 ms':>16} {'errors':>7}"
+        f" {'rss MB':>8} {'conns':>6} {'reused':>7} {'mock conns':>10}"
+    )
+    for r in results:
+        before = baseline.get(r["module"], {})
+        print(
+            f"{r['module']:>12}"
+            f" {str(r['throughput']) + _delta(r['throughput'], before.get('throughput')):>16}"
+            f" {str(r['p50_ms']) + _delta(r['p50_ms'], before.get('p50_ms')):>16}"
+            f" {str(r['p99_ms']) + _delta(r['p99_ms'], before.get('p99_ms')):>16}"
+            f" {r['errors']:>7} {r['max_rss_mb']:>8} {r['connections_created']:>6}"
+            f" {r['connections_reused']:>7} {r['upstream_connections']:>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--searches", type=int, default=20, help="Timed searches per module")
+    parser.add_argument("--concurrency", type=int, default=4, help="Searches in flight at once")
+    parser.add_argument("--latency", action="append", default=[], help="Seconds per response, or upstream=seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread, as a fraction of it")
+    parser.add_argument("--error-rate", action="append", default=[], help="Share of failed responses, or upstream=share")
+    parser.add_argument("--error-kind", choices=["status", "reset"], default="status")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--crtsh-entries", type=int, default=2000)
+    parser.add_argument("--wmn-sites", type=int, default=600)
+    parser.add_argument("--masto-instances", type=int, default=200)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.searches, args.concurrency)
+        return
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["module"]: r for r in json.load(f)["results"]}
+
+    mocks = build_mocks(args)
+    try:
+        results = [measure(name, args, mocks) for name in args.modules]
+    finally:
+        mocks.stop()
+
+    report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "child")},
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
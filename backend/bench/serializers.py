@@ -0,0 +1,132 @@
+"""
+Benchmark: Socket.IO payload encoding, stdlib json vs ujson vs MessagePack.
+
+Runs real module searches (Wayback, crt.sh, DNS by default) for a domain,
+captures the result payloads they emit, and encodes each one as the complete
+Socket.IO event packet the server would put on the wire. Reports the mean
+encode time and the frame size per serializer.
+
+Captured payloads can be saved with ``--save`` and replayed with ``--load``,
+so serializers can be compared on the same data without hitting upstreams
+again.
+
+Requirements (not part of the app image):
+    pip install python-socketio msgpack
+
+Usage (from backend/):
+    python -m bench.serializers --domain example.com --save /tmp/payloads.json
+    python -m bench.serializers --load /tmp/payloads.json --rounds 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from socketio import msgpack_packet, packet
+
+from core import socket_events as se
+from core.serializers import FastJSON
+
+RESULT_EVENT = se.SERVER_EVENTS["result"]
+
+
+class _Capture:
+    """Emitter that keeps the result payloads a module sends."""
+
+    def __init__(self):
+        self.payloads: List[Any] = []
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        data = args[0] if args else kwargs.get("data")
+        if event == RESULT_EVENT and isinstance(data, dict) and "result" in data:
+            self.payloads.append(data)
+
+
+def _modules() -> Dict[str, Any]:
+    from domain.dns.dns_module import dns_module
+    from domain.subdomains.crtsh_module import crtsh_module
+    from network.wayback.wayback_module import wayback_module
+
+    return {"wayback": wayback_module, "crtsh": crtsh_module, "dns": dns_module}
+
+
+async def capture(domain: str, names: List[str]) -> Dict[str, List[Any]]:
+    modules = _modules()
+    captured: Dict[str, List[Any]] = {}
+    for name in names:
+        emitter = _Capture()
+        started = time.monotonic()
+        await modules[name].search(domain, emitter, se.ns(name), room="bench")
+        captured[name] = emitter.payloads
+        print(f"captured {len(emitter.payloads)} payload(s) from {name} in {time.monotonic() - started:.1f}s")
+    return captured
+
+
+def _json_encoder(json_module) -> Callable[[str, Any], Any]:
+    def encode(namespace: str, payload: Any) -> Any:
+        packet.Packet.json = json_module
+        return packet.Packet(packet.EVENT, data=[RESULT_EVENT, payload], namespace=namespace).encode()
+
+    return encode
+
+
+def _msgpack_encode(namespace: str, payload: Any) -> Any:
+    return msgpack_packet.MsgPackPacket(packet.EVENT, data=[RESULT_EVENT, payload], namespace=namespace).encode()
+
+
+ENCODERS: List[Tuple[str, Callable[[str, Any], Any]]] = [
+    ("json", _json_encoder(json)),
+    ("ujson", _json_encoder(FastJSON)),
+    ("msgpack", _msgpack_encode),
+]
+
+
+def _frame_bytes(encoded: Any) -> int:
+    return len(encoded.encode("utf-8")) if isinstance(encoded, str) else len(encoded)
+
+
+def measure(captured: Dict[str, List[Any]], rounds: int) -> None:
+    print(f"{'module':>8} {'serializer':>10} {'encode ms':>10} {'bytes':>10} {'vs json':>8}")
+    for name, payloads in captured.items():
+        if not payloads:
+            print(f"{name:>8} {'-':>10} (no result captured)")
+            continue
+        namespace = se.ns(name)
+        baseline = None
+        for label, encode in ENCODERS:
+            size = sum(_frame_bytes(encode(namespace, payload)) for payload in payloads)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for payload in payloads:
+                    encode(namespace, payload)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / rounds
+            baseline = baseline or elapsed_ms
+            print(f"{name:>8} {label:>10} {elapsed_ms:>10.3f} {size:>10} {baseline / elapsed_ms:>7.2f}x")
+    packet.Packet.json = json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domain", default="example.com")
+    parser.add_argument("--modules", nargs="+", default=["wayback", "crtsh", "dns"], choices=["wayback", "crtsh", "dns"])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--save", help="Write the captured payloads to this file")
+    parser.add_argument("--load", help="Use payloads saved with --save instead of running searches")
+    args = parser.parse_args()
+
+    if args.load:
+        with open(args.load) as f:
+            captured = json.load(f)
+    else:
+        captured = asyncio.run(capture(args.domain, args.modules))
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(captured, f)
+
+    measure(captured, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
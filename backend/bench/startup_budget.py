@@ -0,0 +1,97 @@
+"""
+Startup check: import time of the web app, and what it pulls in.
+
+Imports ``app`` in a fresh interpreter (with warm-up disabled) and fails if
+the import takes longer than the budget, or if any module that is meant to be
+loaded lazily (see core/registry.py) was imported at startup. The slowest
+imports, from ``python -X importtime``, are listed to help find the culprit.
+
+Usage (from backend/, with the app's requirements installed):
+    python -m bench.startup_budget --budget-ms 1500
+
+Exit status is 1 when the budget or the lazy-import rule is broken, so it
+can run as a CI step.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages only module code (never startup) may import. dnspython
+# is missing on purpose: eventlet's green DNS resolver imports it anyway.
+LAZY_MODULES = (
+    "asyncpraw",
+    "bs4",
+    "whois",
+    "socid_extractor",
+    "w3lib",
+    "tldextract",
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run_probe() -> Tuple[dict, List[Tuple[int, str]]]:
+    env = dict(os.environ, OSINT_WARM_UP="0", PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"Importing app failed (exit {proc.returncode})")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # Modules imported directly by app (depth 2 in the tree), by cumulative time.
+    slowest = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match and len(match.group(2)) == 3:
+            slowest.append((int(match.group(1)), match.group(3)))
+    slowest.sort(reverse=True)
+    return result, slowest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+    args = parser.parse_args()
+
+    result, slowest = run_probe()
+    elapsed_ms = result["seconds"] * 1000
+    print(f"import app: {elapsed_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for micros, name in slowest[:args.top]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    failed = False
+    if elapsed_ms > args.budget_ms:
+        print(f"FAIL: startup import is over budget by {elapsed_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if result["loaded"]:
+        print(f"FAIL: imported at startup but meant to load lazily: {', '.join(result['loaded'])}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Routing the app's HTTP client to the bench's mock upstreams.
+
+``OSINT_BENCH_UPSTREAMS`` names the origin that requests for each host (or
+``*.suffix``) are sent to instead, e.g.
+``"crt.sh=http://127.0.0.1:9001,*.wmn.bench=http://127.0.0.1:9002"``
+(``MockUpstreams.env()`` builds it). The path and query are kept and the
+original host is sent as ``Host``; limits, breakers, stats and metrics still
+key on the original host.
+
+Only the bench's own processes read it, through ``install``: the children of
+``bench/module_suite.py``, and the app served by ``bench/wsgi.py`` for
+``bench/load_test.py`` along with its job workers. ``wsgi.py`` and
+``HttpClient.from_env`` ignore it.
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "OSINT_BENCH_UPSTREAMS"
+
+
+def parse_upstreams(raw: Optional[str]) -> Dict[str, str]:
+    """Parse ``"crt.sh=http://127.0.0.1:9001,*.wmn.bench=http://127.0.0.1:9002"`` into a dict."""
+    upstreams: Dict[str, str] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        host, origin = item.split("=", 1)
+        parts = urlsplit(origin.strip())
+        if not parts.scheme or not parts.netloc:
+            logger.warning(f"Ignoring invalid upstream override {item!r}")
+            continue
+        upstreams[host.strip().lower()] = f"{parts.scheme}://{parts.netloc}"
+    return upstreams
+
+
+def install() -> None:
+    """Route this process's ``http_client`` as ``OSINT_BENCH_UPSTREAMS`` says."""
+    from core.http_client import http_client
+
+    http_client.upstreams = parse_upstreams(os.environ.get(ENV_VAR))
@@ -0,0 +1,145 @@
+"""
+Load test: search throughput as a function of gunicorn worker count.
+
+Starts the backend under gunicorn once per worker count, opens a pool of
+websocket-only Socket.IO clients and has each of them issue searches back to
+back for a fixed duration. Reports completed searches per second, the
+speedup relative to the first worker count and the searches that failed.
+Only results without an error count as completed, so a broken search or a
+server shedding load shows up as failures rather than as throughput.
+
+The default event (``search_email``) is answered without calling an
+upstream, so the measurement isolates the web tier: handler dispatch,
+scheduling, the shared asyncio loop and Socket.IO framing.
+
+Requirements (not part of the app image):
+    pip install "python-socketio[asyncio_client]" aiohttp
+
+Usage (from backend/, with Redis running for the message queue):
+    python -m bench.worker_scaling --workers 1 2 4 --clients 64 --duration 20 \\
+        --message-queue redis://localhost:6379/0
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Tuple
+
+import socketio
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, message_queue: str) -> subprocess.Popen:
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=message_queue)
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "--worker-class", "eventlet",
+        "-w", str(workers),
+        "--bind", f"127.0.0.1:{port}",
+        "--log-level", "warning",
+        "wsgi:app",
+    ]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_for_server(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = socketio.AsyncClient()
+        try:
+            await client.connect(url, transports=["websocket"])
+            await client.disconnect()
+            return
+        except socketio.exceptions.ConnectionError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout}s")
+
+
+def is_error(result) -> bool:
+    """Whether a ``search_result`` payload reports a failed or cancelled search."""
+    return not isinstance(result, dict) or "error" in result or result.get("status") in ("error", "cancelled")
+
+
+async def run_client(url: str, namespace: str, event: str, payload: dict, stop_at: float) -> Tuple[int, int]:
+    client = socketio.AsyncClient()
+    done = asyncio.Event()
+    outcome = {}
+    completed = failed = 0
+
+    @client.on("search_result", namespace=namespace)
+    async def on_result(data):
+        outcome["ok"] = not is_error(data)
+        done.set()
+
+    @client.on("server_busy", namespace=namespace)
+    async def on_busy(_data):
+        outcome["ok"] = False
+        done.set()
+
+    await client.connect(url, namespaces=[namespace], transports=["websocket"])
+    try:
+        while time.monotonic() < stop_at:
+            done.clear()
+            outcome.clear()
+            await client.emit(event, payload, namespace=namespace)
+            try:
+                await asyncio.wait_for(done.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                failed += 1
+                continue
+            if outcome["ok"]:
+                completed += 1
+            else:
+                failed += 1
+    finally:
+        await client.disconnect()
+    return completed, failed
+
+
+async def measure(
+    url: str, clients: int, duration: float, namespace: str, event: str, payload: dict,
+) -> Tuple[float, int]:
+    """Completed searches per second, and the number that failed."""
+    stop_at = time.monotonic() + duration
+    counts = await asyncio.gather(*(
+        run_client(url, namespace, event, payload, stop_at) for _ in range(clients)
+    ))
+    return sum(completed for completed, _ in counts) / duration, sum(failed for _, failed in counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--message-queue", default="redis://localhost:6379/0")
+    parser.add_argument("--namespace", default="/email")
+    parser.add_argument("--event", default="search_email")
+    parser.add_argument("--query", default="someone@example.com")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    baseline = None
+    print(f"{'workers':>8} {'searches/s':>12} {'speedup':>8} {'failed':>8}")
+    for workers in args.workers:
+        server = start_server(workers, args.port, args.message_queue)
+        try:
+            asyncio.run(wait_for_server(url))
+            rate, failed = asyncio.run(measure(
+                url, args.clients, args.duration, args.namespace, args.event, {"input": args.query},
+            ))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12.1f} {rate / baseline if baseline else 0:>7.2f}x {failed:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+The app as ``wsgi.py`` serves it, with its HTTP client (and its job workers')
+routed to the mock upstreams named in ``OSINT_BENCH_UPSTREAMS`` (see
+``bench/upstreams.py``). ``bench/load_test.py`` runs it under gunicorn as
+``bench.wsgi:app``.
+"""
+
+# The app first: it monkey-patches the standard library.
+from app import _job_workers, app, io  # noqa: F401
+from bench import upstreams
+
+upstreams.install()
+if _job_workers is not None:
+    _job_workers.initializer = upstreams.install
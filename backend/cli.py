@@ -0,0 +1,334 @@
+"""
+Headless bulk runner: module searches over a list of targets, without the web app.
+
+Runs the modules declared in the plugin registry (``dns``, ``subdomains``,
+``whois``, ``ip``, ``wayback``, ...) on every target of the input, on a plain
+asyncio loop with no Flask, Socket.IO or eventlet. Each search gets a
+``LineEmitter`` (see ``core/batch.py``) in place of SocketIO, so the output is
+the same JSON lines ``POST /api/search/batch`` streams:
+
+- ``{"index": 12, "module": "dns", "event": "search_result", "data": {...}}``
+  for every event a module emits, ``index`` being the target's position in
+  the input (blank and ``#`` lines don't count)
+- ``{"index": 12, "module": "dns", "query": "example.com", "status": "success",
+  "duration_ms": 840}`` once that search is finished
+
+Targets are one per line, from files or stdin. ``--modules`` lists the
+searches to run on each of them (``mastodon:searchUsername`` picks a
+namespace's other search), ``--concurrency`` caps the searches in flight and
+``--rate dns=5`` caps a module's searches per second. The modules still
+go through the shared HTTP client, so ``OSINT_RATE_LIMITS`` and the other
+``OSINT_*`` settings apply as in the app.
+
+With ``--checkpoint``, every finished search (whatever its status, except
+cancelled) is appended to that file after its lines are written. Running the
+same command again skips them, so an interrupted sweep resumes where it
+stopped; searches that were in flight run again. Ctrl-C cancels the searches
+in flight and exits once their lines are written.
+
+Usage (from backend/):
+    python cli.py --modules dns subdomains whois --targets domains.txt --output sweep.jsonl \\
+        --checkpoint sweep.checkpoint --concurrency 16 --rate subdomains=1 --rate whois=2
+    cat ips.txt | python cli.py --modules ip > ips.jsonl
+    python cli.py --list
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from core import metrics, socket_events as se
+from core.base_module import CancelToken, SearchCancelled, run_cancellable
+from core.batch import STATUS_CANCELLED, STATUS_ERROR, STATUS_INVALID, STATUS_SUCCESS, LineEmitter, encode
+from core.http_client import http_client
+from core.rate_limit import TokenBucket, parse_rates
+from core.registry import SearchSpec, registry
+
+logger = logging.getLogger("osint.cli")
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PROGRESS_INTERVAL = 30.0
+
+
+@dataclass(frozen=True)
+class Unit:
+    """One search of the sweep: a module on a target."""
+
+    index: int
+    target: str
+    module: str
+    spec: SearchSpec
+
+    @property
+    def key(self) -> str:
+        return f"{self.module}\t{self.target}"
+
+
+def read_targets(paths: List[str]) -> Iterator[str]:
+    """Targets from *paths* (``-`` is stdin), skipping blank and ``#`` lines."""
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def resolve_modules(names: List[str]) -> Dict[str, SearchSpec]:
+    """
+    Look up the registered search behind each ``namespace[:event]`` name.
+
+    Raises:
+        SystemExit: If a name is unknown or isn't backed by a module
+    """
+    specs = {}
+    for name in names:
+        namespace, _, event = name.partition(":")
+        spec = registry.get(namespace, event or "search")
+        if spec is None or spec.target is None:
+            raise SystemExit(f"Unknown module {name!r}; see --list")
+        specs[name] = spec
+    return specs
+
+
+class Checkpoint:
+    """Searches already done, kept in an append-only file of ``module<TAB>target`` lines."""
+
+    def __init__(self, path: Optional[str]):
+        """
+        Args:
+            path: The checkpoint file, created if missing; None keeps nothing
+        """
+        self.path = path
+        self.done: Set[str] = set()
+        self._file: Optional[TextIO] = None
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done.update(line.rstrip("\n") for line in f if line.strip())
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def add(self, key: str) -> None:
+        self.done.add(key)
+        if self._file is not None:
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class BulkRunner:
+    """Runs every module on every target, a bounded number at a time."""
+
+    def __init__(
+        self,
+        specs: Dict[str, SearchSpec],
+        output: TextIO,
+        checkpoint: Checkpoint,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rates: Optional[Dict[str, float]] = None,
+        use_cache: bool = True,
+    ):
+        """
+        Args:
+            specs: Searches to run on each target, by module name
+            output: Where JSON lines are written
+            checkpoint: Searches to skip, and where finished ones are recorded
+            concurrency: Searches in flight at once
+            rates: Searches per second allowed per module name
+            use_cache: False forces fresh searches (results are still cached)
+        """
+        self.specs = specs
+        self.output = output
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.use_cache = use_cache
+        # parse_rates lowercases its keys.
+        rates = rates or {}
+        self.buckets = {name: TokenBucket(rates[name.lower()]) for name in specs if name.lower() in rates}
+        self.counts: Counter = Counter()
+        self._running: Set[CancelToken] = set()
+        self._stopping = False
+        self._started = time.monotonic()
+
+    def stop(self) -> None:
+        """Start no more searches and cancel the ones in flight."""
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.warning("Stopping: cancelling searches in flight")
+        for cancel_event in list(self._running):
+            cancel_event.set()
+
+    async def run(self, targets: Iterable[str], progress_interval: float = DEFAULT_PROGRESS_INTERVAL) -> Counter:
+        """Run the sweep; returns the number of searches per status (and ``skipped``)."""
+        units = self._units(targets)
+        reporter = asyncio.ensure_future(self._report_progress(progress_interval))
+        try:
+            await asyncio.gather(*(self._worker(units) for _ in range(self.concurrency)))
+        finally:
+            reporter.cancel()
+        return self.counts
+
+    def _units(self, targets: Iterable[str]) -> Iterator[Unit]:
+        for index, target in enumerate(targets):
+            for name, spec in self.specs.items():
+                unit = Unit(index, target, name, spec)
+                if unit.key in self.checkpoint:
+                    self.counts["skipped"] += 1
+                    continue
+                yield unit
+
+    async def _worker(self, units: Iterator[Unit]) -> None:
+        # Workers share one generator; it never awaits, so this is safe.
+        for unit in units:
+            if self._stopping:
+                return
+            await self._run_unit(unit)
+
+    async def _run_unit(self, unit: Unit) -> None:
+        started = time.monotonic()
+        details: Dict[str, str] = {}
+        if unit.spec.validator is not None:
+            # Domain validators resolve the name; keep that off the loop.
+            ok, err = await asyncio.to_thread(unit.spec.validator, unit.target)
+            if not ok:
+                self._finish(unit, STATUS_INVALID, started, {"error": err})
+                return
+
+        bucket = self.buckets.get(unit.module)
+        if bucket is not None:
+            await bucket.acquire()
+        cancel_event = CancelToken()
+        self._running.add(cancel_event)
+        if self._stopping:
+            cancel_event.set()
+        namespace = unit.module.partition(":")[0]
+        emitter = LineEmitter(unit.index, unit.module, self.output.write)
+        try:
+            fn = registry.resolve(unit.spec.target)
+            result = await run_cancellable(
+                fn(unit.target, emitter, se.ns(namespace), use_cache=self.use_cache, cancel_event=cancel_event,
+                   **unit.spec.kwargs),
+                cancel_event,
+            )
+            status = STATUS_ERROR if metrics.result_failed(result) else STATUS_SUCCESS
+        except (SearchCancelled, asyncio.CancelledError):
+            status = STATUS_CANCELLED
+        except Exception as exc:
+            logger.exception(f"{unit.module} search failed for {unit.target}: {exc}")
+            status, details = STATUS_ERROR, {"error": str(exc)}
+        finally:
+            self._running.discard(cancel_event)
+        self._finish(unit, status, started, details)
+
+    def _finish(self, unit: Unit, status: str, started: float, details: Dict[str, str]) -> None:
+        self.counts[status] += 1
+        self.output.write(encode({
+            "index": unit.index,
+            "module": unit.module,
+            "query": unit.target,
+            "status": status,
+            "duration_ms": round((time.monotonic() - started) * 1000),
+            **details,
+        }))
+        # Lines first, so a checkpointed search always has its output.
+        self.output.flush()
+        if status != STATUS_CANCELLED:
+            self.checkpoint.add(unit.key)
+
+    async def _report_progress(self, interval: float) -> None:
+        while interval > 0:
+            await asyncio.sleep(interval)
+            print(f"Progress: {self.summary()}", file=sys.stderr)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopping
+
+    def summary(self) -> str:
+        finished = sum(n for status, n in self.counts.items() if status != "skipped")
+        elapsed = time.monotonic() - self._started
+        counts = ", ".join(f"{status} {n}" for status, n in sorted(self.counts.items()))
+        return f"{finished} searches in {elapsed:.0f}s ({finished / elapsed if elapsed else 0:.1f}/s): {counts}"
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    specs = resolve_modules(args.modules)
+    rates: Dict[str, float] = {}
+    for value in args.rate:
+        rates.update(parse_rates(value))
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    checkpoint = Checkpoint(args.checkpoint)
+    runner = BulkRunner(
+        specs,
+        output,
+        checkpoint,
+        concurrency=args.concurrency,
+        rates=rates,
+        use_cache=not args.no_cache,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, runner.stop)
+    try:
+        await runner.run(read_targets(args.targets or ["-"]), progress_interval=args.progress)
+    finally:
+        checkpoint.close()
+        if output is not sys.stdout:
+            output.close()
+        await http_client.close()
+    print(f"Done: {runner.summary()}", file=sys.stderr)
+    return 130 if runner.stopped else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", help="Searches to run on each target, e.g. dns whois")
+    parser.add_argument("--targets", nargs="+", help="Files with one target per line (default: stdin)")
+    parser.add_argument("--output", help="Append JSON lines to this file (default: stdout)")
+    parser.add_argument("--checkpoint", help="Record finished searches here, and skip those already in it")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Searches in flight at once")
+    parser.add_argument("--rate", action="append", default=[], help="Searches per second per module, e.g. whois=2")
+    parser.add_argument("--no-cache", action="store_true", help="Don't serve searches from the result cache")
+    parser.add_argument("--progress", type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help="Seconds between progress lines on stderr (0: none)")
+    parser.add_argument("--list", action="store_true", help="List the available modules and exit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log module activity to stderr")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+    registry.discover()
+    if args.list:
+        for spec in sorted(registry.specs(), key=lambda s: (s.namespace, s.event)):
+            if spec.target is not None:
+                print(f"{spec.name:<26} {spec.target}")
+        return
+    if not args.modules:
+        parser.error("--modules is required")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Admission control: turning new searches away while the worker is overloaded.
+
+Past a point, accepting more searches only makes every search slower,
+including the ones already running. Before a search is validated and
+scheduled, ``AdmissionControl.check`` compares the worker's load with the
+thresholds of the search's cost class:
+
+- ``hub_lag``: how late the eventlet hub's timer last fired (``core.metrics``)
+- ``jobs``: jobs running plus queued in the scheduler
+- ``memory``: the process's resident memory, in MB (off unless set)
+
+Namespaces in the scheduler's bulk lane (fan-out searches: WhatsMyName,
+Mastodon, investigations, ...) are ``heavy`` and are turned away first. The
+rest are ``light``. ``OSINT_ADMISSION_CLASSES`` (``"dns=heavy,github=light"``)
+moves namespaces between classes, and ``OSINT_ADMISSION_LIGHT`` and
+``OSINT_ADMISSION_HEAVY`` (``"lag=0.25,jobs=48,rss_mb=1500"``) set the
+thresholds. A rejected search gets a ``retry_in`` delay that grows with the
+overload, with jitter so retries don't come back all at once. Once a class
+is over a threshold, it stays closed until the load is back under 80% of the
+thresholds, so admission doesn't flap at the boundary.
+"""
+
+import logging
+import math
+import os
+import random
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLASS_LIGHT = "light"
+CLASS_HEAVY = "heavy"
+
+REASON_LAG = "hub_lag"
+REASON_JOBS = "jobs"
+REASON_MEMORY = "memory"
+
+DEFAULT_RETRY_SECONDS = 5.0
+MAX_RETRY_SECONDS = 60
+# A class that is shedding reopens below this fraction of its thresholds.
+REOPEN_FRACTION = 0.8
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Load above which a cost class is turned away (0 disables a check)."""
+
+    lag: float
+    jobs: int
+    rss_mb: float = 0.0
+
+    def parsed(self, raw: Optional[str]) -> "Thresholds":
+        """These thresholds with the ones in ``"lag=0.25,jobs=48,rss_mb=1500"`` overridden."""
+        values = {}
+        for item in (raw or "").split(","):
+            key, _, value = item.partition("=")
+            key = key.strip()
+            if not value or key not in ("lag", "jobs", "rss_mb"):
+                continue
+            try:
+                values[key] = int(value) if key == "jobs" else float(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid admission threshold {item!r}")
+        return replace(self, **values)
+
+
+DEFAULT_THRESHOLDS: Dict[str, Thresholds] = {
+    CLASS_LIGHT: Thresholds(lag=1.0, jobs=96),
+    CLASS_HEAVY: Thresholds(lag=0.25, jobs=48),
+}
+
+
+@dataclass(frozen=True)
+class Load:
+    lag: float
+    jobs: int
+    rss_mb: float
+
+
+@dataclass(frozen=True)
+class Decision:
+    admitted: bool
+    cost_class: str
+    reason: Optional[str] = None
+    retry_in: int = 0
+
+
+def process_rss_mb() -> float:
+    """Resident memory of this process in MB (0 where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0.0
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def parse_classes(raw: Optional[str]) -> Dict[str, str]:
+    """Parse ``"dns=heavy,github=light"`` into ``{"/dns": "heavy", "/github": "light"}``."""
+    classes: Dict[str, str] = {}
+    for item in (raw or "").split(","):
+        key, _, value = item.partition("=")
+        value = value.strip().lower()
+        if not key.strip():
+            continue
+        if value not in (CLASS_LIGHT, CLASS_HEAVY):
+            logger.warning(f"Ignoring invalid admission class {item!r}")
+            continue
+        classes[f"/{key.strip().lstrip('/')}"] = value
+    return classes
+
+
+class AdmissionControl:
+    """Decides, from the worker's current load, whether a new search may start."""
+
+    def __init__(
+        self,
+        sample: Callable[[], Load],
+        heavy_namespaces: Iterable[str] = (),
+        classes: Optional[Dict[str, str]] = None,
+        thresholds: Optional[Dict[str, Thresholds]] = None,
+        retry_seconds: float = DEFAULT_RETRY_SECONDS,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            sample: Returns the worker's current load
+            heavy_namespaces: Namespaces in the heavy class by default
+            classes: Per-namespace class overrides (``"/dns": "heavy"``)
+            thresholds: Thresholds per class
+            retry_seconds: Base delay suggested to rejected clients
+            enabled: False admits everything
+        """
+        self.sample = sample
+        self.heavy_namespaces = set(heavy_namespaces)
+        self.classes = dict(classes or {})
+        self.thresholds = dict(thresholds or DEFAULT_THRESHOLDS)
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self._shedding: Dict[str, bool] = {name: False for name in self.thresholds}
+        self._admitted = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls, sample: Callable[[], Load], heavy_namespaces: Iterable[str] = ()) -> "AdmissionControl":
+        return cls(
+            sample,
+            heavy_namespaces=heavy_namespaces,
+            classes=parse_classes(os.environ.get("OSINT_ADMISSION_CLASSES")),
+            thresholds={
+                name: default.parsed(os.environ.get(f"OSINT_ADMISSION_{name.upper()}"))
+                for name, default in DEFAULT_THRESHOLDS.items()
+            },
+            retry_seconds=float(os.environ.get("OSINT_ADMISSION_RETRY", DEFAULT_RETRY_SECONDS)),
+            enabled=os.environ.get("OSINT_ADMISSION", "1") != "0",
+        )
+
+    def cost_class(self, namespace: str) -> str:
+        default = CLASS_HEAVY if namespace in self.heavy_namespaces else CLASS_LIGHT
+        return self.classes.get(namespace, default)
+
+    def check(self, namespace: str) -> Decision:
+        """
+        Whether a new search on *namespace* may start now.
+
+        Args:
+            namespace: The search's namespace, e.g. ``"/username"``
+
+        Returns:
+            The decision; rejected ones carry the reason and ``retry_in`` seconds
+        """
+        cost_class = self.cost_class(namespace)
+        if not self.enabled:
+            return Decision(True, cost_class)
+        load = self.sample()
+        # A shedding class must get well under its thresholds before it reopens.
+        scale = REOPEN_FRACTION if self._shedding[cost_class] else 1.0
+        reason, overload = self._over(load, self.thresholds[cost_class], scale)
+        if reason is None:
+            if self._shedding[cost_class]:
+                logger.info(f"Admitting {cost_class} searches again")
+            self._shedding[cost_class] = False
+            self._admitted += 1
+            return Decision(True, cost_class)
+
+        if not self._shedding[cost_class]:
+            logger.warning(
+                f"Shedding {cost_class} searches ({reason}): lag {load.lag:.3f}s, "
+                f"{load.jobs} jobs, {load.rss_mb:.0f} MB"
+            )
+        self._shedding[cost_class] = True
+        self._rejected += 1
+        retry_in = self.retry_seconds * max(1.0, overload) * random.uniform(1.0, 1.5)
+        return Decision(False, cost_class, reason, min(MAX_RETRY_SECONDS, math.ceil(retry_in)))
+
+    @staticmethod
+    def _over(load: Load, limits: Thresholds, scale: float) -> Tuple[Optional[str], float]:
+        """The first threshold *load* is over, and by what factor."""
+        for reason, value, limit in (
+            (REASON_LAG, load.lag, limits.lag),
+            (REASON_JOBS, load.jobs, limits.jobs),
+            (REASON_MEMORY, load.rss_mb, limits.rss_mb),
+        ):
+            if limit > 0 and value >= limit * scale:
+                return reason, value / limit
+        return None, 0.0
+
+    def shedding(self) -> Dict[str, bool]:
+        return dict(self._shedding)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "shedding": self.shedding(),
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "thresholds": {name: vars(limits) for name, limits in self.thresholds.items()},
+        }
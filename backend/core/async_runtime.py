@@ -0,0 +1,158 @@
+"""
+Shared asyncio runtime for module jobs.
+
+A single asyncio loop runs in its own native thread for the lifetime of the
+worker process. Searches are submitted to it with ``run_coroutine_threadsafe``
+so aiohttp sessions, DNS caches and TLS contexts built by modules outlive a
+single query.
+
+Socket.IO lives on the eventlet hub, which is not safe to drive from another
+OS thread, so anything the loop thread wants to emit goes through
+``HubBridge``: a native queue drained by a greenthread on the hub.
+"""
+
+import asyncio
+import atexit
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Optional
+
+from eventlet import patcher, tpool
+
+# The app monkey-patches threading/queue; the loop needs a real OS thread and
+# the bridge needs a queue that is safe to share between OS threads.
+_threading = patcher.original("threading")
+_queue = patcher.original("queue")
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``HubBridge.stop`` to end the drain.
+_STOP = object()
+
+
+def use_native_logging_locks() -> None:
+    """
+    Give every configured logging handler a native lock.
+
+    Handlers created after monkey patching get green locks, and a green lock
+    can't be waited on from one OS thread and released from another: a record
+    logged on the hub while the loop thread holds the handler lock fails with
+    "Cannot switch to a different thread" and the hub loses that greenthread.
+    Writing a record never yields to the hub, so a native lock is safe.
+    """
+    loggers = [logging.getLogger()]
+    loggers.extend(obj for obj in logging.Logger.manager.loggerDict.values() if isinstance(obj, logging.Logger))
+    for log in loggers:
+        for handler in log.handlers:
+            handler.lock = _threading.RLock()
+
+
+class AsyncLoopThread:
+    """A long-lived asyncio loop running in a dedicated native thread."""
+
+    def __init__(self, name: str = "osint-asyncio"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._started = _threading.Event()
+        self._lock = _threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    @property
+    def thread_ident(self) -> Optional[int]:
+        return self._thread.ident if self._thread is not None else None
+
+    def start(self) -> None:
+        """Start the loop thread if it isn't running yet (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = _threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._started.set()
+        logger.info(f"Shared asyncio loop started in thread {self.name}")
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule *coro* on the shared loop and return a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, fn: Callable, *args) -> None:
+        """Run a plain callable on the loop thread."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class HubBridge:
+    """Carry calls from foreign threads back onto the eventlet hub.
+
+    Exposes ``emit`` with the same signature as ``SocketIO.emit`` so it can be
+    handed to modules in place of the SocketIO instance.
+    """
+
+    def __init__(self, socketio):
+        self._socketio = socketio
+        self._queue = _queue.SimpleQueue()
+        self._hub_ident: Optional[int] = None
+        self._started = False
+
+    def start(self) -> None:
+        """Start the draining greenthread. Must be called from the hub thread."""
+        if self._started:
+            return
+        self._started = True
+        self._hub_ident = _threading.get_ident()
+        self._socketio.start_background_task(self._drain)
+        # tpool joins its threads at exit, and one of them is parked in the
+        # drain. atexit runs handlers last-registered first, so this wakes it
+        # before tpool (registered on import) waits for it.
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """End the draining greenthread once the calls queued so far have run."""
+        self._queue.put(_STOP)
+
+    def call_soon(self, fn: Callable, *args: Any, **kwargs: Any) -> None:
+        """Run *fn* on the hub; immediately if we are already on it."""
+        if _threading.get_ident() == self._hub_ident:
+            fn(*args, **kwargs)
+            return
+        self._queue.put((fn, args, kwargs))
+
+    def emit(self, *args: Any, **kwargs: Any) -> None:
+        self.call_soon(self._socketio.emit, *args, **kwargs)
+
+    def _drain(self) -> None:
+        while True:
+            # Block in a native tpool thread so the hub keeps serving clients.
+            batch = [tpool.execute(self._queue.get)]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except _queue.Empty:
+                    break
+            for item in batch:
+                if item is _STOP:
+                    return
+                fn, args, kwargs = item
+                try:
+                    fn(*args, **kwargs)
+                except Exception as exc:
+                    logger.exception(f"Bridged call {getattr(fn, '__name__', fn)} failed: {exc}")
@@ -7,14 +7,123 @@ It defines common patterns and interfaces that all modules should implement.
 
 import logging
 import asyncio
+import threading
+import time
 import traceback
 from typing import Dict, Any, Optional, List, Callable, Union, Awaitable
 from abc import ABC, abstractmethod
 
+from eventlet import patcher
+
+from core import metrics, socket_events as se, tracing
+from core.entities import Entity
+from core.circuit_breaker import UpstreamUnavailable, listen_for_unavailable, stop_listening
+from core.emission import EmissionBuffer
+from core.result_cache import result_cache
+
 logger = logging.getLogger(__name__)
 
+# Tokens are set on the hub and registered on from the asyncio loop thread.
+_threading = patcher.original("threading")
+
+
+class SearchCancelled(Exception):
+    """Raised when an awaited operation was aborted because the search was cancelled."""
+
+
+class CancelToken(threading.Event):
+    """
+    Cancellation event that can actively abort work, not just be polled.
+
+    It is a drop-in ``threading.Event`` for modules that only check
+    ``is_set()``, but callbacks registered with ``add_callback`` run as soon as
+    the token is set, so in-flight tasks, greenlets and sockets can be torn
+    down immediately. Callbacks run in the thread that sets the token and must
+    be thread-safe (e.g. ``loop.call_soon_threadsafe``).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks: List[Callable[[], None]] = []
+        self._callbacks_lock = _threading.Lock()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run *callback* when the token is set (immediately if it already is).
+
+        Returns:
+            A function that unregisters the callback
+        """
+        with self._callbacks_lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        self._run_callback(callback)
+        return lambda: None
+
+    def set(self) -> None:
+        with self._callbacks_lock:
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run_callback(callback)
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._callbacks_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @staticmethod
+    def _run_callback(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Cancel callback failed: {e}")
+
+
+def on_cancel(cancel_event, callback: Callable[[], None]) -> Callable[[], None]:
+    """Register *callback* on *cancel_event* if it supports callbacks; return the remover."""
+    if isinstance(cancel_event, CancelToken):
+        return cancel_event.add_callback(callback)
+    return lambda: None
+
+
+async def run_cancellable(aw: Awaitable, cancel_event) -> Any:
+    """
+    Await *aw*, cancelling it the moment *cancel_event* is set.
+
+    Cancelling the task unwinds any in-flight aiohttp request, which closes
+    its connection.
+
+    Raises:
+        SearchCancelled: If the search was cancelled before *aw* completed
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise SearchCancelled()
+
+    task = asyncio.ensure_future(aw)
+    loop = asyncio.get_running_loop()
+    remove = on_cancel(cancel_event, lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if cancel_event is not None and cancel_event.is_set():
+            raise SearchCancelled() from None
+        raise
+    finally:
+        remove()
+
 class OsintModule(ABC):
     """Base class for all OSINT modules."""
+
+    # Seconds a completed search is served from the result cache (0 = never).
+    cache_ttl: int = 0
+    # Seconds it is also kept in the persistent disk cache, if configured.
+    disk_cache_ttl: int = 0
+    # Send result events in batched frames (for modules emitting one per hit).
+    batch_results: bool = False
     
     def __init__(self, module_name: str):
         """
@@ -42,6 +151,77 @@ class OsintModule(ABC):
             Dict containing the search results
         """
         pass
+
+    async def run(self, query: Any, socketio, namespace: str, use_cache: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Entry point used by the app: ``search`` behind the shared result cache,
+        emitting through a per-job ``EmissionBuffer``, counted in the search
+        metrics (see ``core.metrics``) and traced as a span named after the
+        module.
+
+        Args:
+            query: The search term to look up
+            socketio: The SocketIO instance for emitting results
+            namespace: The SocketIO namespace to emit results to
+            use_cache: False forces a fresh search (its result is still cached)
+            kwargs: Passed through to ``search``
+
+        Returns:
+            Dict containing the search results
+        """
+        room = kwargs.get('room')
+        cancel_event = kwargs.get('cancel_event')
+        with tracing.span(self.module_name, module=self.module_name, namespace=namespace, use_cache=use_cache) as span:
+            buffer = EmissionBuffer.from_env(
+                socketio, batch_results=self.batch_results, trace_id=tracing.current_trace_id(),
+            )
+            token = listen_for_unavailable(lambda exc: self.emit_unavailable(buffer, namespace, exc, room=room))
+            started = time.monotonic()
+            failed = True
+            try:
+                result = await result_cache.run(self, query, buffer, namespace, use_cache=use_cache, **kwargs)
+                failed = metrics.result_failed(result)
+                if failed and span is not None:
+                    span.set_status(tracing.STATUS_ERROR, str(result.get('error') or ''))
+                return result
+            finally:
+                stop_listening(token)
+                cancelled = self.is_cancelled(cancel_event)
+                buffer.close(discard=cancelled)
+                metrics.observe_search(namespace, self.module_name, time.monotonic() - started, cancelled, failed)
+                if cancelled and span is not None:
+                    span.set_status(tracing.STATUS_CANCELLED)
+
+    def normalize_query(self, query: Any) -> str:
+        """
+        Canonical form of *query* used in result cache keys.
+
+        Args:
+            query: The search term
+
+        Returns:
+            The query stripped and lowercased; override for case-sensitive inputs
+        """
+        return str(query).strip().lower()
+
+    def entities(self, result: Dict[str, Any]) -> List[Entity]:
+        """
+        Entities found in a successful result, followed by investigations.
+
+        Args:
+            result: What ``search`` returned
+
+        Returns:
+            Entities of the types the module's ``produces`` declares (see
+            ``core/entities.py``); none by default
+        """
+        return []
+
+    @staticmethod
+    def result_data(result: Dict[str, Any]) -> Any:
+        """The ``results`` payload of a ``{"result": {"results": ...}}`` result, or None."""
+        inner = result.get('result') if isinstance(result, dict) else None
+        return inner.get('results') if isinstance(inner, dict) else None
         
     def emit_result(self, socketio, namespace: str, data: Dict[str, Any], room: str = None):
         """
@@ -80,9 +260,32 @@ class OsintModule(ABC):
         except Exception as e:
             self.logger.error(f"Error emitting error: {e}")
     
+    def emit_unavailable(self, socketio, namespace: str, exc: UpstreamUnavailable, room: str = None):
+        """
+        Tell the client an upstream is down and was skipped without waiting.
+
+        Args:
+            socketio: The SocketIO instance
+            namespace: The namespace to emit to
+            exc: The fast failure raised by the HTTP client
+            room: Optional room SID to emit to a specific client
+        """
+        try:
+            socketio.emit(se.SERVER_EVENTS['upstream_unavailable'], {
+                'module': self.module_name,
+                'host': exc.host,
+                'retry_in': round(exc.retry_in),
+                'message': str(exc),
+            }, namespace=namespace, room=room)
+        except Exception as e:
+            self.logger.error(f"Error emitting upstream status: {e}")
+
     def emit_progress(self, socketio, namespace: str, progress: int, message: str = "", room: str = None):
         """
         Emit search progress through SocketIO.
+
+        Within ``run`` updates are merged (latest wins) before they are sent,
+        so modules may report progress as often as they like.
         
         Args:
             socketio: The SocketIO instance
@@ -126,6 +329,22 @@ class OsintModule(ABC):
             self.logger.info(f"{self.module_name} search was cancelled")
             return True
         return False
+
+    async def cancellable(self, aw: Awaitable, cancel_event) -> Any:
+        """
+        Await *aw*, aborting it as soon as the search is cancelled.
+
+        Args:
+            aw: Coroutine or future to await
+            cancel_event: The cancellation event from kwargs
+
+        Returns:
+            The result of *aw*
+
+        Raises:
+            SearchCancelled: If the search was cancelled first
+        """
+        return await run_cancellable(aw, cancel_event)
     
     @staticmethod
     async def safe_request(request_func: Callable[..., Awaitable], *args, **kwargs) -> Union[Dict[str, Any], None]:
@@ -0,0 +1,244 @@
+"""
+Batch searches over HTTP, streamed back as NDJSON.
+
+``POST /api/search/batch`` takes a list of searches, each naming a module by
+its namespace key in socket_events.json and a query::
+
+    {"searches": [{"module": "dns", "query": "example.com"},
+                  {"module": "mastodon", "event": "searchUsername", "query": "alice"}],
+     "concurrency": 8, "no_cache": false}
+
+Each item runs through the same module ``run`` a Socket.IO search uses (result
+cache, emission buffer, metrics and tracing included). A ``LineEmitter``
+stands in for SocketIO. The response is one JSON object per line, written as
+soon as it is produced, so lines come in completion order:
+
+- ``{"index": 3, "module": "dns", "event": "search_result", "data": {...}}``
+  for every event the item's module emits, ``index`` being its position in
+  ``searches``
+- ``{"index": 3, "module": "dns", "status": "success", ...}`` once the item
+  is finished; ``status`` is ``success``, ``error``, ``invalid`` (rejected by
+  the module's validator) or ``cancelled``
+- ``{"summary": {...}}`` last, with counts per status
+
+``SearchBatch`` lives on the eventlet hub. It starts at most ``concurrency``
+items at once through a launcher supplied by the app, which schedules them
+like any other job. Lines produced on the asyncio loop are marshalled back
+through the hub bridge.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from eventlet.queue import LightQueue
+
+from core.base_module import CancelToken
+from core.registry import ModuleRegistry, SearchSpec
+from core.serializers import FastJSON
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ITEMS = 1000
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_CONCURRENCY = 32
+
+STATUS_SUCCESS = "success"
+STATUS_ERROR = "error"
+STATUS_INVALID = "invalid"
+STATUS_CANCELLED = "cancelled"
+
+CONTENT_TYPE = "application/x-ndjson"
+
+
+class BatchError(ValueError):
+    """The request body is not a valid batch; the message says why."""
+
+
+@dataclass(frozen=True)
+class BatchLimits:
+    """Caps on batch requests, from the environment."""
+
+    max_items: int = DEFAULT_MAX_ITEMS
+    concurrency: int = DEFAULT_CONCURRENCY
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+    @classmethod
+    def from_env(cls) -> "BatchLimits":
+        return cls(
+            max_items=int(os.environ.get("OSINT_BATCH_MAX_ITEMS", DEFAULT_MAX_ITEMS)),
+            concurrency=int(os.environ.get("OSINT_BATCH_CONCURRENCY", DEFAULT_CONCURRENCY)),
+            max_concurrency=int(os.environ.get("OSINT_BATCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        )
+
+
+@dataclass
+class BatchItem:
+    """One search of a batch."""
+
+    index: int
+    module: str
+    query: str
+    spec: SearchSpec
+    cancel_event: CancelToken = field(default_factory=CancelToken)
+    started: Optional[float] = None
+
+
+@dataclass
+class BatchRequest:
+    items: List[BatchItem]
+    concurrency: int
+    use_cache: bool
+
+
+def parse_batch(body: Any, registry: ModuleRegistry, limits: BatchLimits) -> BatchRequest:
+    """
+    Check a batch request body and look up the search behind each item.
+
+    Args:
+        body: The decoded JSON body
+        registry: Where searches are declared
+        limits: Item and concurrency caps
+
+    Returns:
+        The items, in request order, and how many may run at once
+
+    Raises:
+        BatchError: If the body is malformed, too large or names an unknown
+            or composed (not module-backed) search
+    """
+    if not isinstance(body, dict) or not isinstance(body.get("searches"), list):
+        raise BatchError('Expected a JSON object with a "searches" list')
+    searches = body["searches"]
+    if not searches:
+        raise BatchError("No searches given")
+    if len(searches) > limits.max_items:
+        raise BatchError(f"Too many searches: {len(searches)} (at most {limits.max_items})")
+
+    items = []
+    for index, entry in enumerate(searches):
+        if not isinstance(entry, dict) or not entry.get("module") or entry.get("query") in (None, ""):
+            raise BatchError(f'Search {index}: expected {{"module": ..., "query": ...}}')
+        module, event = str(entry["module"]), str(entry.get("event") or "search")
+        spec = registry.get(module, event)
+        if spec is None:
+            raise BatchError(f"Search {index}: unknown search {module}:{event}")
+        if spec.target is None:
+            raise BatchError(f"Search {index}: {module} searches can't run in a batch")
+        items.append(BatchItem(index=index, module=module, query=str(entry["query"]), spec=spec))
+
+    try:
+        concurrency = int(body.get("concurrency") or limits.concurrency)
+    except (TypeError, ValueError):
+        raise BatchError('"concurrency" must be a number') from None
+    return BatchRequest(
+        items=items,
+        concurrency=max(1, min(concurrency, limits.max_concurrency)),
+        use_cache=not body.get("no_cache"),
+    )
+
+
+def encode(record: Dict[str, Any]) -> str:
+    return FastJSON.dumps(record) + "\n"
+
+
+class LineEmitter:
+    """Stands in for SocketIO for one search: every emit becomes a line."""
+
+    def __init__(self, index: int, module: str, sink: Callable[[str], None]):
+        """
+        Args:
+            index: The search's position in its input
+            module: The search's module (namespace key)
+            sink: Called with each encoded line, from the thread that emits
+        """
+        self.index = index
+        self.module = module
+        self._sink = sink
+
+    def emit(self, event: str, data: Any = None, namespace: Optional[str] = None, room: Optional[str] = None,
+             **_kwargs: Any) -> None:
+        self._sink(encode({"index": self.index, "module": self.module, "event": event, "data": data}))
+
+
+# Starts an item: launch(item, emitter, finished). It must call
+# finished(status, details) exactly once, on the hub.
+Launcher = Callable[[BatchItem, LineEmitter, Callable[[str, Dict[str, Any]], None]], None]
+
+
+class SearchBatch:
+    """The items of one batch request, run a few at a time, and its output."""
+
+    def __init__(self, request: BatchRequest, launch: Launcher, call_soon: Callable[..., None]):
+        """
+        Args:
+            request: The parsed request
+            launch: Starts one item (see ``Launcher``)
+            call_soon: Runs a callable on the hub from any thread (the hub
+                bridge's ``call_soon``)
+        """
+        self.request = request
+        self._launch = launch
+        self._call_soon = call_soon
+        self._pending = list(reversed(request.items))
+        self._running: Dict[int, BatchItem] = {}
+        self._lines: LightQueue = LightQueue()
+        self._counts: Counter = Counter()
+        self._started = time.monotonic()
+        self._closed = False
+
+    def lines(self) -> Iterator[str]:
+        """The response body. Closing it early cancels the items still running."""
+        try:
+            self._fill()
+            while self._pending or self._running or not self._lines.empty():
+                yield self._lines.get()
+            yield encode({"summary": {
+                "searches": len(self.request.items),
+                **{status: self._counts[status] for status in
+                   (STATUS_SUCCESS, STATUS_ERROR, STATUS_INVALID, STATUS_CANCELLED)},
+                "duration_ms": round((time.monotonic() - self._started) * 1000),
+            }})
+        finally:
+            self.cancel()
+
+    def cancel(self) -> None:
+        """Stop starting items and cancel the running ones (the client went away)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.clear()
+        for item in list(self._running.values()):
+            item.cancel_event.set()
+
+    def _fill(self) -> None:
+        while self._pending and len(self._running) < self.request.concurrency and not self._closed:
+            item = self._pending.pop()
+            self._running[item.index] = item
+            item.started = time.monotonic()
+            emitter = LineEmitter(item.index, item.module, self._put_threadsafe)
+            try:
+                self._launch(item, emitter, lambda status, details, item=item: self._finished(item, status, details))
+            except Exception as exc:
+                logger.exception(f"Batch search {item.index} failed to start: {exc}")
+                self._finished(item, STATUS_ERROR, {"error": str(exc)})
+
+    def _put_threadsafe(self, line: str) -> None:
+        self._call_soon(self._lines.put, line)
+
+    def _finished(self, item: BatchItem, status: str, details: Dict[str, Any]) -> None:
+        if self._running.pop(item.index, None) is None:
+            return
+        self._counts[status] += 1
+        self._lines.put(encode({
+            "index": item.index,
+            "module": item.module,
+            "query": item.query,
+            "status": status,
+            "duration_ms": round((time.monotonic() - item.started) * 1000),
+            **details,
+        }))
+        self._fill()
@@ -0,0 +1,238 @@
+"""
+Per-upstream circuit breakers.
+
+``http_client`` asks the breaker of a request's host before sending it and
+reports every outcome back. A breaker opens when, over the last
+``OSINT_BREAKER_WINDOW`` seconds and at least ``OSINT_BREAKER_MIN_CALLS``
+calls, either the share of failures (transport errors and 5xx) or the share
+of slow calls (over ``OSINT_BREAKER_SLOW_SECONDS``) reaches
+``OSINT_BREAKER_ERROR_RATE``.
+
+While open, requests to the host fail immediately with ``UpstreamUnavailable``
+instead of waiting out a timeout. After ``OSINT_BREAKER_OPEN_SECONDS`` a single
+background probe is sent to the host (half-open); success closes the breaker,
+failure reopens it for twice as long, up to ``MAX_OPEN_SECONDS``.
+
+The search currently running (set by ``OsintModule.run``) is told about a
+fast failure through ``report_unavailable``, once per host, so the client
+gets an explicit "upstream unavailable" event.
+
+Closed breakers without a call for a whole window hold nothing a new breaker
+wouldn't, and are dropped so hosts contacted once don't accumulate.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+MAX_OPEN_SECONDS = 300.0
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Upstream {host} is unavailable (retrying in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+# Callback of the running search, called with an UpstreamUnavailable.
+_unavailable_listener: contextvars.ContextVar[Optional[Callable[[UpstreamUnavailable], None]]] = (
+    contextvars.ContextVar("osint_unavailable_listener", default=None)
+)
+
+
+def listen_for_unavailable(callback: Callable[[UpstreamUnavailable], None]) -> contextvars.Token:
+    """
+    Route fast failures in the current context (and tasks it spawns) to *callback*.
+
+    Each host is reported at most once per listener.
+
+    Returns:
+        A token for ``contextvars.ContextVar.reset``
+    """
+    reported: Set[str] = set()
+
+    def once_per_host(exc: UpstreamUnavailable) -> None:
+        if exc.host not in reported:
+            reported.add(exc.host)
+            callback(exc)
+
+    return _unavailable_listener.set(once_per_host)
+
+
+def stop_listening(token: contextvars.Token) -> None:
+    _unavailable_listener.reset(token)
+
+
+def report_unavailable(exc: UpstreamUnavailable) -> None:
+    listener = _unavailable_listener.get()
+    if listener is None:
+        return
+    try:
+        listener(exc)
+    except Exception as e:
+        logger.error(f"Error reporting unavailable upstream: {e}")
+
+
+class CircuitBreaker:
+    """Breaker for one upstream host."""
+
+    def __init__(
+        self,
+        host: str,
+        probe: Callable[[], Awaitable[bool]],
+        error_rate: float = 0.5,
+        min_calls: int = 5,
+        window: float = 60.0,
+        slow_seconds: float = 10.0,
+        open_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            host: The upstream host
+            probe: Coroutine function returning True if the host looks healthy
+            error_rate: Share of failed (or slow) calls that opens the breaker
+            min_calls: Calls needed in the window before it can open
+            window: Seconds of history considered
+            slow_seconds: Calls slower than this count as slow
+            open_seconds: How long the breaker first stays open
+        """
+        self.host = host
+        self.probe = probe
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._open_for = open_seconds
+        self._open_until = 0.0
+        self._calls: deque = deque()
+        self._probe_task: Optional[asyncio.Task] = None
+        self.last_used = time.monotonic()
+
+    def before_call(self) -> None:
+        """Raise ``UpstreamUnavailable`` if requests to the host must not be sent."""
+        self.last_used = time.monotonic()
+        if self.state == CLOSED:
+            return
+        self.rejected += 1
+        raise UpstreamUnavailable(self.host, max(self._open_until - time.monotonic(), 0.0))
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Record the outcome of a call made while closed."""
+        if self.state != CLOSED:
+            return
+        now = time.monotonic()
+        self._calls.append((now, ok, latency >= self.slow_seconds))
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+        if len(self._calls) < self.min_calls:
+            return
+        total = len(self._calls)
+        failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+        slow = sum(1 for _, _, call_slow in self._calls if call_slow)
+        if failures / total >= self.error_rate or slow / total >= self.error_rate:
+            reason = f"{failures}/{total} failed, {slow}/{total} slow"
+            self._open(reason)
+
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self.opened += 1
+        self._open_until = time.monotonic() + self._open_for
+        self._calls.clear()
+        logger.warning(f"Circuit for {self.host} opened for {self._open_for:.0f}s ({reason})")
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_until_healthy())
+
+    async def _probe_until_healthy(self) -> None:
+        while self.state != CLOSED:
+            await asyncio.sleep(max(self._open_until - time.monotonic(), 0.0))
+            self.state = HALF_OPEN
+            try:
+                healthy = await self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                self.state = CLOSED
+                self._open_for = self.open_seconds
+                logger.info(f"Circuit for {self.host} closed, probe succeeded")
+                return
+            self._open_for = min(self._open_for * 2, MAX_OPEN_SECONDS)
+            self.state = OPEN
+            self._open_until = time.monotonic() + self._open_for
+            logger.warning(f"Probe of {self.host} failed; circuit stays open for {self._open_for:.0f}s")
+
+    def idle(self, now: float) -> bool:
+        """Closed, with no call in the last window."""
+        return self.state == CLOSED and self.last_used < now - self.window
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "retry_in": round(max(self._open_until - time.monotonic(), 0.0), 1) if self.state != CLOSED else 0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "recent_calls": len(self._calls),
+        }
+
+
+class CircuitBreakers:
+    """Breakers keyed by host, created on first use."""
+
+    def __init__(self, **breaker_kwargs: Any):
+        """
+        Args:
+            breaker_kwargs: Thresholds passed to every ``CircuitBreaker``
+        """
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._pruned = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakers":
+        return cls(
+            error_rate=float(os.environ.get("OSINT_BREAKER_ERROR_RATE", 0.5)),
+            min_calls=int(os.environ.get("OSINT_BREAKER_MIN_CALLS", 5)),
+            window=float(os.environ.get("OSINT_BREAKER_WINDOW", 60)),
+            slow_seconds=float(os.environ.get("OSINT_BREAKER_SLOW_SECONDS", 10)),
+            open_seconds=float(os.environ.get("OSINT_BREAKER_OPEN_SECONDS", 30)),
+        )
+
+    def get(self, host: str, probe: Callable[[], Awaitable[bool]]) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            self._prune()
+            breaker = self._breakers[host] = CircuitBreaker(host, probe, **self.breaker_kwargs)
+        return breaker
+
+    def _prune(self) -> None:
+        """Drop idle breakers, at most once per window."""
+        now = time.monotonic()
+        if now - self._pruned < self.breaker_kwargs.get("window", 60.0):
+            return
+        self._pruned = now
+        for host, breaker in list(self._breakers.items()):
+            if breaker.idle(now):
+                del self._breakers[host]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            host: breaker.as_dict()
+            for host, breaker in list(self._breakers.items())
+            if breaker.state != CLOSED or breaker.opened
+        }
@@ -0,0 +1,173 @@
+"""
+Single-flight coalescing of identical concurrent searches.
+
+A search is keyed by (namespace, normalized query, options). The first client
+to ask opens a *flight*: one scheduled job whose events are emitted to a
+Socket.IO room named after the flight. Clients asking for the same key while
+it is in flight join that room instead of starting their own job, after the
+events sent so far are replayed to them.
+
+Each subscriber keeps its own cancel event. Cancelling (or disconnecting)
+only takes that client out of the room; the shared job is cancelled when
+its last subscriber leaves.
+
+Flights are per process, and like the scheduler the coalescer is only
+touched from the eventlet hub thread.
+"""
+
+import itertools
+import logging
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from core import metrics
+from core.base_module import CancelToken, on_cancel
+
+logger = logging.getLogger(__name__)
+
+# Events replayed to a late subscriber; later events still reach it live.
+DEFAULT_MAX_REPLAY_EVENTS = 1000
+
+
+class Flight:
+    """One in-flight search shared by one or more clients."""
+
+    def __init__(self, key: Hashable, namespace: str, room: str):
+        self.key = key
+        self.namespace = namespace
+        self.room = room
+        self.cancel_event = CancelToken()
+        self.subscribers: Dict[str, Callable[[], None]] = {}
+        self.events: List[Tuple[str, Any]] = []
+        self.finished = False
+        # Set once any event of the flight reported an error.
+        self.failed = False
+
+
+class _FlightEmitter:
+    """SocketIO stand-in that records what is emitted to flight rooms."""
+
+    def __init__(self, socketio, coalescer: "SearchCoalescer"):
+        self._socketio = socketio
+        self._coalescer = coalescer
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        self._coalescer._record(kwargs.get("room"), event, args[0] if args else kwargs.get("data"))
+        self._socketio.emit(event, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._socketio, name)
+
+
+class SearchCoalescer:
+    """Deduplicate identical searches that overlap in time."""
+
+    def __init__(
+        self,
+        socketio,
+        on_abandon: Optional[Callable[[str, str], None]] = None,
+        max_replay_events: int = DEFAULT_MAX_REPLAY_EVENTS,
+    ):
+        """
+        Args:
+            socketio: The SocketIO instance (rooms are managed through it)
+            on_abandon: Called as ``on_abandon(namespace, room)`` when the
+                last subscriber of a flight leaves, e.g. to unqueue its job
+            max_replay_events: Cap on events kept per flight for late joiners
+        """
+        self.socketio = socketio
+        self.on_abandon = on_abandon
+        self.max_replay_events = max_replay_events
+        self.emitter = _FlightEmitter(socketio, self)
+        self._flights: Dict[Hashable, Flight] = {}
+        self._by_room: Dict[str, Flight] = {}
+        self._ids = itertools.count(1)
+        self._joined = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "flights": len(self._flights),
+            "subscribers": sum(len(f.subscribers) for f in self._flights.values()),
+            "coalesced": self._joined,
+        }
+
+    # ----- subscription -----------------------------------------------------
+
+    def join(self, key: Hashable, sid: str, cancel_event) -> bool:
+        """
+        Attach *sid* to the flight for *key*, if there is one.
+
+        Args:
+            key: Coalescing key, including the namespace
+            sid: The requesting client
+            cancel_event: The client's own cancel event
+
+        Returns:
+            True if the client joined an existing flight
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            return False
+        self._subscribe(flight, sid, cancel_event)
+        for event, data in flight.events:
+            self.socketio.emit(event, data, namespace=flight.namespace, room=sid)
+        self._joined += 1
+        logger.info(f"Coalesced search on {flight.namespace} into {flight.room} ({len(flight.subscribers)} subscribers)")
+        return True
+
+    def open(self, key: Hashable, namespace: str, sid: str, cancel_event) -> Flight:
+        """Start a new flight for *key* with *sid* as its first subscriber."""
+        flight = Flight(key, namespace, f"flight:{next(self._ids)}")
+        self._flights[key] = flight
+        self._by_room[flight.room] = flight
+        self._subscribe(flight, sid, cancel_event)
+        return flight
+
+    def finish(self, flight: Flight) -> None:
+        """Close a flight once its job is done (idempotent)."""
+        if flight.finished:
+            return
+        flight.finished = True
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        self._by_room.pop(flight.room, None)
+        for sid, remove_cancel in list(flight.subscribers.items()):
+            remove_cancel()
+            self._leave_room(flight, sid)
+        flight.subscribers.clear()
+        flight.events.clear()
+
+    # ----- internals --------------------------------------------------------
+
+    def _subscribe(self, flight: Flight, sid: str, cancel_event) -> None:
+        previous = flight.subscribers.pop(sid, None)
+        if previous is not None:
+            previous()
+        self.socketio.server.enter_room(sid, flight.room, namespace=flight.namespace)
+        flight.subscribers[sid] = on_cancel(cancel_event, lambda: self._unsubscribe(flight, sid))
+
+    def _unsubscribe(self, flight: Flight, sid: str) -> None:
+        if flight.finished or flight.subscribers.pop(sid, None) is None:
+            return
+        self._leave_room(flight, sid)
+        if flight.subscribers:
+            return
+        logger.info(f"Last subscriber left {flight.room}; cancelling shared search")
+        flight.cancel_event.set()
+        if self.on_abandon is not None:
+            self.on_abandon(flight.namespace, flight.room)
+        self.finish(flight)
+
+    def _leave_room(self, flight: Flight, sid: str) -> None:
+        try:
+            self.socketio.server.leave_room(sid, flight.room, namespace=flight.namespace)
+        except (KeyError, ValueError):
+            pass
+
+    def _record(self, room: Optional[str], event: str, data: Any) -> None:
+        flight = self._by_room.get(room) if room is not None else None
+        if flight is None:
+            return
+        if metrics.result_failed(data):
+            flight.failed = True
+        if len(flight.events) < self.max_replay_events:
+            flight.events.append((event, data))
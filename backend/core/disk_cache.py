@@ -0,0 +1,286 @@
+"""
+Persistent result cache backed by SQLite.
+
+Second tier behind the in-memory ``ResultCache`` for lookups that are
+expensive to repeat (crt.sh for large domains, Wayback CDX, GHunt): entries
+survive restarts and are shared by every worker process using the same file.
+
+- WAL journal, so readers in other processes never wait on a writer
+- values stored as zlib-compressed JSON
+- ``OSINT_DISK_CACHE_MAX_MB`` and ``OSINT_DISK_CACHE_MAX_ENTRIES`` are
+  enforced on every write: once a write takes the store over either limit,
+  expired rows are dropped, then least recently used rows. Row count and
+  size are kept by triggers in a ``totals`` row, so the check is exact
+  across worker processes sharing the file and costs one lookup
+- expiry and last-access columns are indexed; a periodic compaction also
+  drops expired rows, and returns freed pages to the filesystem
+
+All SQLite work happens on one dedicated native thread, fed through a native
+queue, so neither the eventlet hub nor the asyncio loop ever blocks on disk.
+Enabled by setting ``OSINT_DISK_CACHE_PATH``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from eventlet import patcher
+
+# Real OS thread and queue even when the app has monkey-patched them.
+_threading = patcher.original("threading")
+_queue = patcher.original("queue")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 512
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_COMPACT_INTERVAL = 300
+
+# Compaction evicts down to this fraction of the limits, so it doesn't run
+# again on the very next write.
+_EVICT_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    module TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_resized AFTER UPDATE OF size ON entries BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+"""
+
+
+class DiskCache:
+    """SQLite store of compressed JSON values with TTLs and bounded size."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        compact_interval: float = DEFAULT_COMPACT_INTERVAL,
+    ):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Upper bound on the compressed size of stored values
+            max_entries: Upper bound on the number of stored values
+            compact_interval: Seconds between background compactions
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.compact_interval = compact_interval
+        self._requests = _queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = _threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counters: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired": 0,
+            "evicted": 0,
+            "errors": 0,
+            "last_compaction": None,
+        }
+
+    @classmethod
+    def from_env(cls) -> Optional["DiskCache"]:
+        path = os.environ.get("OSINT_DISK_CACHE_PATH")
+        if not path:
+            return None
+        return cls(
+            path,
+            max_bytes=int(os.environ.get("OSINT_DISK_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024,
+            max_entries=int(os.environ.get("OSINT_DISK_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            compact_interval=float(os.environ.get("OSINT_DISK_CACHE_COMPACT_INTERVAL", DEFAULT_COMPACT_INTERVAL)),
+        )
+
+    # ----- public API -------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look *key* up without blocking the running loop.
+
+        Returns:
+            ``(value, seconds_left)`` or None if missing or expired
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(outcome) -> None:
+            loop.call_soon_threadsafe(_set_result, future, outcome)
+
+        self._submit(self._get, key, callback=resolve)
+        return await future
+
+    def set(self, key: str, value: Any, ttl: float, module: str = "") -> None:
+        """Store *value* for *ttl* seconds. Returns immediately; the write is queued."""
+        self._submit(self._set, key, value, ttl, module)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, path=self.path, max_bytes=self.max_bytes, max_entries=self.max_entries)
+
+    # ----- worker thread ----------------------------------------------------
+
+    def _submit(self, fn: Callable, *args: Any, callback: Optional[Callable] = None) -> None:
+        self._start()
+        self._requests.put((fn, args, callback))
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = _threading.Thread(target=self._run, name="osint-disk-cache", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._conn = self._connect()
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache disabled, cannot open {self.path}: {e}")
+        next_compaction = time.monotonic() + self.compact_interval
+        while True:
+            if time.monotonic() >= next_compaction:
+                self._safely(self._compact)
+                next_compaction = time.monotonic() + self.compact_interval
+            try:
+                fn, args, callback = self._requests.get(timeout=max(next_compaction - time.monotonic(), 0))
+            except _queue.Empty:
+                continue
+            outcome = self._safely(fn, *args)
+            if callback is not None:
+                try:
+                    callback(outcome)
+                except Exception as e:
+                    # E.g. the waiting loop has closed; the next request must still be served.
+                    logger.error(f"Disk cache callback for {fn.__name__} failed: {e}")
+
+    def _safely(self, fn: Callable, *args: Any) -> Any:
+        if self._conn is None:
+            return None
+        try:
+            return fn(*args)
+        except (sqlite3.Error, ValueError, TypeError, zlib.error) as e:
+            self._counters["errors"] += 1
+            logger.error(f"Disk cache error in {fn.__name__}: {e}")
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        # auto_vacuum only takes effect on a fresh database, before any table exists.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        logger.info(f"Disk cache opened at {self.path}")
+        return conn
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            self._counters["misses"] += 1
+            return None
+        self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._counters["hits"] += 1
+        return json.loads(zlib.decompress(row[0])), row[1] - now
+
+    def _set(self, key: str, value: Any, ttl: float, module: str) -> None:
+        blob = zlib.compress(json.dumps(value, default=str).encode("utf-8"))
+        now = time.time()
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the totals trigger.
+        self._conn.execute(
+            "INSERT INTO entries (key, module, expires_at, accessed_at, size, value) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET module = excluded.module, expires_at = excluded.expires_at, "
+            "accessed_at = excluded.accessed_at, size = excluded.size, value = excluded.value",
+            (key, module, now + ttl, now, len(blob), blob),
+        )
+        self._counters["writes"] += 1
+        if self._over_limits(*self._totals()):
+            self._counters["expired"] += self._delete_expired()
+            self._evict()
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute("SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+
+    def _over_limits(self, count: int, total: int) -> bool:
+        return count > self.max_entries or total > self.max_bytes
+
+    def _delete_expired(self) -> int:
+        return self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _evict(self) -> int:
+        """Drop least recently used rows until the store is back under its limits."""
+        count, total = self._totals()
+        if not self._over_limits(count, total):
+            return 0
+        target_count = int(self.max_entries * _EVICT_TARGET)
+        target_bytes = int(self.max_bytes * _EVICT_TARGET)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            if count <= target_count and total <= target_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._counters["evicted"] += len(doomed)
+        return len(doomed)
+
+    def _compact(self) -> None:
+        started = time.monotonic()
+        expired = self._delete_expired()
+        # Recount, in case rows were changed by a process without the triggers.
+        self._conn.execute(
+            "UPDATE totals SET (entries, bytes) = (SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries) WHERE id = 0"
+        )
+        evicted = self._evict()
+
+        if expired or evicted:
+            self._conn.execute("PRAGMA incremental_vacuum")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        count, total = self._totals()
+        self._counters["expired"] += expired
+        self._counters["entries"] = count
+        self._counters["bytes"] = total
+        self._counters["last_compaction"] = time.time()
+        logger.info(
+            f"Disk cache compacted: {expired} expired, {evicted} evicted, {count} entries "
+            f"({total / 1024 / 1024:.1f} MB) in {time.monotonic() - started:.2f}s"
+        )
+
+
+def _set_result(future: asyncio.Future, value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
@@ -0,0 +1,219 @@
+"""
+Batched, throttled Socket.IO emission.
+
+Two layers sit between modules and the clients:
+
+- ``EmissionBuffer`` wraps the emitter of one search job (``OsintModule.run``
+  creates it). Progress events are merged, the latest value per client and
+  module winning, and flushed every ``OSINT_EMIT_INTERVAL`` seconds. Modules
+  that set ``batch_results`` have their result events collected into
+  ``search_result_batch`` frames (``{"items": [...]}``) sent at the same
+  interval, or sooner once ``OSINT_EMIT_MAX_BATCH`` items are pending. Any
+  other event flushes what is pending first, so clients see events in the
+  order the module sent them. Every frame is stamped with the job's
+  ``trace_id`` (see ``core.tracing``).
+- ``ClientBackpressure`` wraps the server's SocketIO instance on the hub. Before
+  a progress event goes out it looks at each recipient's outgoing packet
+  queue; clients with more than ``OSINT_EMIT_MAX_QUEUE`` packets waiting are
+  skipped. Progress is only ever superseded, so it is the first thing dropped
+  for a client that falls behind; results are always delivered.
+
+The buffer is driven from the asyncio loop the job runs on, the gate from the
+eventlet hub.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core import socket_events as se, tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.25
+DEFAULT_MAX_BATCH = 100
+DEFAULT_MAX_QUEUE = 64
+
+PROGRESS_EVENT = se.SERVER_EVENTS["progress"]
+RESULT_EVENT = se.SERVER_EVENTS["result"]
+BATCH_EVENT = se.SERVER_EVENTS["result_batch"]
+
+# Frames received from modules and sent on, across every buffer in this process.
+_counters: Dict[str, int] = defaultdict(int)
+
+
+def emission_stats() -> Dict[str, int]:
+    return {
+        "events": _counters["events"],
+        "frames": _counters["frames"],
+        "progress_merged": _counters["progress_merged"],
+        "batches": _counters["batches"],
+    }
+
+
+class EmissionBuffer:
+    """Per-job emitter that merges progress and batches result items."""
+
+    def __init__(
+        self,
+        socketio,
+        batch_results: bool = False,
+        interval: float = DEFAULT_INTERVAL,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        trace_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            socketio: The emitter events are finally sent through
+            batch_results: Collect result events into batch frames
+            interval: Seconds between flushes of merged progress and batches
+            max_batch: Pending result items that force an early flush
+            trace_id: Trace id added to every dict payload sent
+        """
+        self._socketio = socketio
+        self.batch_results = batch_results
+        self.trace_id = trace_id
+        self.interval = interval
+        self.max_batch = max_batch
+        self._progress: Dict[Tuple[Optional[str], Optional[str], Any], Dict[str, Any]] = {}
+        self._items: Dict[Tuple[Optional[str], Optional[str]], List[Any]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def from_env(cls, socketio, batch_results: bool = False, trace_id: Optional[str] = None) -> "EmissionBuffer":
+        return cls(
+            socketio,
+            batch_results=batch_results,
+            interval=float(os.environ.get("OSINT_EMIT_INTERVAL", DEFAULT_INTERVAL)),
+            max_batch=int(os.environ.get("OSINT_EMIT_MAX_BATCH", DEFAULT_MAX_BATCH)),
+            trace_id=trace_id,
+        )
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        data = args[0] if args else kwargs.get("data")
+        target = (kwargs.get("namespace"), kwargs.get("room"))
+        _counters["events"] += 1
+        if self.interval <= 0:
+            self._send(event, *args, **kwargs)
+            return
+
+        if event == PROGRESS_EVENT and isinstance(data, dict):
+            key = target + (data.get("module"),)
+            if key in self._progress:
+                _counters["progress_merged"] += 1
+            self._progress[key] = data
+            self._schedule()
+            return
+
+        if event == RESULT_EVENT and self.batch_results and len(args) <= 1 and set(kwargs) <= {"namespace", "room"}:
+            items = self._items.setdefault(target, [])
+            items.append(data)
+            if len(items) >= self.max_batch:
+                self.flush()
+            else:
+                self._schedule()
+            return
+
+        self.flush()
+        self._send(event, *args, **kwargs)
+
+    def flush(self) -> None:
+        """Send pending result batches, then the latest progress per client."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._items = self._items, {}
+        progress, self._progress = self._progress, {}
+        for (namespace, room), batch in items.items():
+            if len(batch) == 1:
+                self._send(RESULT_EVENT, batch[0], namespace=namespace, room=room)
+            else:
+                _counters["batches"] += 1
+                self._send(BATCH_EVENT, {"items": batch}, namespace=namespace, room=room)
+        for (namespace, room, _module), data in progress.items():
+            self._send(PROGRESS_EVENT, data, namespace=namespace, room=room)
+
+    def close(self, discard: bool = False) -> None:
+        """
+        Finish the job's emission.
+
+        Args:
+            discard: Drop whatever is still pending (the search was cancelled)
+        """
+        if discard:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._items.clear()
+            self._progress.clear()
+            return
+        self.flush()
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+    def _send(self, event: str, *args: Any, **kwargs: Any) -> None:
+        _counters["frames"] += 1
+        if self.trace_id is not None and args:
+            args = (tracing.stamp(args[0], self.trace_id),) + args[1:]
+        try:
+            self._socketio.emit(event, *args, **kwargs)
+        except Exception as e:
+            logger.error(f"Error emitting {event}: {e}")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._socketio, name)
+
+
+class ClientBackpressure:
+    """SocketIO stand-in that skips progress for clients whose socket is backed up."""
+
+    def __init__(self, socketio, max_queue: int = DEFAULT_MAX_QUEUE):
+        """
+        Args:
+            socketio: The SocketIO instance
+            max_queue: Outgoing packets a client may have waiting before it
+                stops receiving progress (0 disables the check)
+        """
+        self._socketio = socketio
+        self.max_queue = max_queue
+        self._dropped = 0
+
+    @classmethod
+    def from_env(cls, socketio) -> "ClientBackpressure":
+        return cls(socketio, max_queue=int(os.environ.get("OSINT_EMIT_MAX_QUEUE", DEFAULT_MAX_QUEUE)))
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        if event == PROGRESS_EVENT and self.max_queue > 0:
+            namespace, room = kwargs.get("namespace", "/"), kwargs.get("room")
+            lagging = self._lagging(namespace, room) if room is not None else []
+            if lagging:
+                self._dropped += len(lagging)
+                skip = kwargs.get("skip_sid")
+                if skip:
+                    lagging.extend(skip if isinstance(skip, list) else [skip])
+                kwargs["skip_sid"] = lagging
+        self._socketio.emit(event, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(emission_stats(), max_queue=self.max_queue, progress_dropped=self._dropped)
+
+    def _lagging(self, namespace: str, room: str) -> List[str]:
+        """Sids in *room*, connected to this process, with more than ``max_queue`` packets waiting."""
+        server = self._socketio.server
+        lagging: List[str] = []
+        try:
+            for participant in list(server.manager.get_participants(namespace, room)):
+                sid, eio_sid = participant if isinstance(participant, tuple) else (participant, participant)
+                socket = server.eio.sockets.get(eio_sid)
+                if socket is not None and socket.queue.qsize() > self.max_queue:
+                    lagging.append(sid)
+        except (AttributeError, KeyError, TypeError):
+            return []
+        return lagging
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._socketio, name)
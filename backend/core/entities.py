@@ -0,0 +1,80 @@
+"""
+Entity types that searches take and produce, for the investigation pipeline.
+
+A module declares in its ``plugin.py`` which entity type its search takes
+(``consumes="domain"``) and which ones its results can lead to
+(``produces=("ip",)``), and its ``entities`` method pulls those out of a
+result. ``core/pipeline.py`` chains searches through them: the A records
+found by ``dns`` are looked up by ``ip``, the names found by ``subdomains``
+go back to the domain searches, and so on.
+"""
+
+import ipaddress
+from typing import NamedTuple, Optional
+
+DOMAIN = "domain"
+IP = "ip"
+USERNAME = "username"
+EMAIL = "email"
+URL = "url"
+
+ENTITY_TYPES = (DOMAIN, IP, USERNAME, EMAIL, URL)
+
+
+class Entity(NamedTuple):
+    """Something found during an investigation, e.g. ``Entity("ip", "93.184.215.14")``."""
+
+    type: str
+    value: str
+
+    def to_dict(self):
+        return {"type": self.type, "value": self.value}
+
+
+def normalize(entity_type: str, value: str) -> Optional[str]:
+    """
+    Canonical form of *value*, so the same entity found twice is visited once.
+
+    Args:
+        entity_type: One of ``ENTITY_TYPES``
+        value: The value as found in a result
+
+    Returns:
+        The normalized value, or None if it can't be one of *entity_type*
+    """
+    value = str(value).strip()
+    if entity_type == DOMAIN:
+        # Certificate names come as wildcards; hostnames may be fully qualified.
+        value = value.lower().rstrip(".")
+        if value.startswith("*."):
+            value = value[2:]
+        return value if "." in value and "@" not in value and " " not in value else None
+    if entity_type == IP:
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            return None
+    if entity_type == EMAIL:
+        value = value.lower()
+        return value if "@" in value else None
+    return value or None
+
+
+def make(entity_type: str, value: str) -> Optional[Entity]:
+    """An ``Entity`` with a normalized value, or None if *value* isn't valid for the type."""
+    normalized = normalize(entity_type, value)
+    return Entity(entity_type, normalized) if normalized is not None else None
+
+
+def guess_type(value: str) -> str:
+    """The entity type a bare seed most likely is (an IP, email, URL, domain or else a username)."""
+    value = value.strip()
+    if normalize(IP, value) is not None:
+        return IP
+    if value.lower().startswith(("http://", "https://")):
+        return URL
+    if "@" in value.strip("@"):
+        return EMAIL
+    if "." in value and " " not in value:
+        return DOMAIN
+    return USERNAME
@@ -0,0 +1,481 @@
+"""
+Shared pooled HTTP client for OSINT modules.
+
+Every module talks to its upstreams through the ``http_client`` singleton
+instead of creating its own ``requests``/``urllib3``/``aiohttp`` session per
+call. One aiohttp session is kept per event loop (in practice: the shared
+asyncio loop, or a job-worker's loop), with:
+
+- keep-alive connection pools per host, bounded globally, per host by
+  default, and per named host via ``OSINT_HTTP_HOST_LIMITS``
+- the DNS cache the SSRF validators use, so a host they accepted is
+  connected to on the addresses they checked (see ``core.resolver``)
+- a single SSL context shared by all connections
+- one timeout policy (``OSINT_HTTP_TIMEOUT``) that callers can tighten per request
+- an adaptive per-host rate limiter and per-endpoint retry policies
+  (see ``core.rate_limit``)
+- a circuit breaker per host that fails fast while the host is down
+  (see ``core.circuit_breaker``)
+
+Connection reuse is counted per host and exposed through ``stats()``, for at
+most as many hosts as ``core.metrics`` labels (the rest are counted under
+``other``); the latency and status code of every attempt go to
+``core.metrics``, and each attempt is a client span in the current trace
+(``core.tracing``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import ssl
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from core import metrics, tracing
+from core.circuit_breaker import CircuitBreakers, UpstreamUnavailable, report_unavailable
+from core.rate_limit import NO_RETRY, HostRateLimiter, RetryableStatus, RetryPolicy
+from core.resolver import DnsCache, dns_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class HttpError(Exception):
+    """Raised by ``HttpResponse.raise_for_status`` for 4xx/5xx responses."""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+# What callers should catch around a request.
+REQUEST_ERRORS = (HttpError, UpstreamUnavailable, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def parse_host_limits(raw: Optional[str]) -> Dict[str, int]:
+    """Parse ``"crt.sh=2,web.archive.org=4"`` into a dict."""
+    limits: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        host, value = item.split("=", 1)
+        try:
+            limits[host.strip().lower()] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid host limit {item!r}")
+    return limits
+
+
+class HttpResponse:
+    """A fully-read HTTP response, detached from its connection."""
+
+    __slots__ = ("status", "headers", "url", "body")
+
+    def __init__(self, status: int, headers: Mapping[str, str], url: str, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.url = url
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    def text(self, encoding: Optional[str] = None) -> str:
+        if encoding is None:
+            content_type = self.headers.get("Content-Type", "")
+            encoding = "utf-8"
+            for part in content_type.split(";"):
+                part = part.strip()
+                if part.lower().startswith("charset="):
+                    encoding = part.split("=", 1)[1].strip('"') or encoding
+        try:
+            return self.body.decode(encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HttpError(self.status, self.url)
+
+
+class _HostStats:
+    __slots__ = ("requests", "connections_created", "connections_reused", "errors", "retries")
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.errors = 0
+        self.retries = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _CachedResolver(AbstractResolver):
+    """aiohttp resolver answering from a ``DnsCache``, pinned addresses included."""
+
+    def __init__(self, dns: DnsCache):
+        self.dns = dns
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[ResolveResult]:
+        results = []
+        for address in await self.dns.resolve_async(host):
+            address_family = socket.AF_INET6 if ":" in address else socket.AF_INET
+            if family in (socket.AF_UNSPEC, address_family):
+                results.append(ResolveResult(
+                    hostname=host,
+                    host=address,
+                    port=port,
+                    family=address_family,
+                    proto=0,
+                    flags=socket.AI_NUMERICHOST,
+                ))
+        if not results:
+            raise OSError(f"No {socket.AddressFamily(family).name} address for {host}")
+        return results
+
+    async def close(self) -> None:
+        pass
+
+
+class _LoopState:
+    """Per-event-loop session and semaphores (neither may cross loops)."""
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class HttpClient:
+    """Pooled async HTTP client shared by every module."""
+
+    def __init__(
+        self,
+        limit: int = 200,
+        limit_per_host: int = 10,
+        host_limits: Optional[Dict[str, int]] = None,
+        dns: Optional[DnsCache] = None,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        keepalive_timeout: float = 30.0,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        upstreams: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            limit: Total connections across all hosts (per loop)
+            limit_per_host: Default cap on connections to one host
+            host_limits: Per-host overrides of ``limit_per_host``
+            dns: Where host names are resolved (the shared ``dns_cache`` by default)
+            timeout: Default total timeout for a request in seconds
+            connect_timeout: Default connect timeout in seconds
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            rate_limiter: Per-host limiter consulted before every request
+            breakers: Per-host circuit breakers consulted before every request
+            upstreams: Origins that requests for a host (or ``*.suffix``) are
+                sent to instead; only the benchmarks route requests this way
+                (see ``bench/upstreams.py``)
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.host_limits = {k.lower(): v for k, v in (host_limits or {}).items()}
+        self.dns = dns or dns_cache
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.breakers = breakers or CircuitBreakers()
+        self.upstreams = {k.lower(): v for k, v in (upstreams or {}).items()}
+        self._ssl_context = ssl.create_default_context()
+        self._states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._stats: Dict[str, _HostStats] = defaultdict(_HostStats)
+
+    @classmethod
+    def from_env(cls) -> "HttpClient":
+        return cls(
+            limit=int(os.environ.get("OSINT_HTTP_LIMIT", 200)),
+            limit_per_host=int(os.environ.get("OSINT_HTTP_LIMIT_PER_HOST", 10)),
+            host_limits=parse_host_limits(os.environ.get("OSINT_HTTP_HOST_LIMITS")),
+            timeout=float(os.environ.get("OSINT_HTTP_TIMEOUT", 30)),
+            rate_limiter=HostRateLimiter.from_env(),
+            breakers=CircuitBreakers.from_env(),
+        )
+
+    # ----- session management ----------------------------------------------
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        # Libraries handed the raw session (asyncpraw) don't pass a host.
+        def host_of(ctx) -> str:
+            request_ctx = ctx.trace_request_ctx
+            return request_ctx.get("host", "") if isinstance(request_ctx, dict) else "(direct)"
+
+        async def on_create(_session, ctx, _params):
+            self._host_stats(host_of(ctx)).connections_created += 1
+
+        async def on_reuse(_session, ctx, _params):
+            self._host_stats(host_of(ctx)).connections_reused += 1
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None or state.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                # The DNS cache keeps TTLs and pins; aiohttp's own would hide both.
+                resolver=_CachedResolver(self.dns),
+                use_dns_cache=False,
+                keepalive_timeout=self.keepalive_timeout,
+                ssl=self._ssl_context,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout),
+                trace_configs=[self._trace_config()],
+            )
+            state = _LoopState(session)
+            self._forget_closed_loops()
+            self._states[loop] = state
+        return state
+
+    def _forget_closed_loops(self) -> None:
+        """Drop the sessions of loops that have closed (e.g. one ``asyncio.run`` each).
+
+        Their connections went with the loop, and a session can't be closed
+        without it, so it is detached instead. Keeping the entry would keep the
+        closed loop and its session alive.
+        """
+        for loop in [loop for loop in self._states if loop.is_closed()]:
+            self._states.pop(loop).session.detach()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The pooled session for the running loop, for libraries that take one."""
+        return self._state().session
+
+    def _host_semaphore(self, state: _LoopState, host: str) -> Optional[asyncio.Semaphore]:
+        limit = self.host_limits.get(host)
+        if limit is None:
+            return None
+        semaphore = state.host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = state.host_semaphores[host] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _upstream(self, host: str) -> Optional[str]:
+        origin = self.upstreams.get(host)
+        if origin is None and self.upstreams:
+            for pattern, candidate in self.upstreams.items():
+                if pattern.startswith("*.") and host.endswith(pattern[1:]):
+                    return candidate
+        return origin
+
+    def _host_stats(self, host: str) -> _HostStats:
+        # Keyed like the upstream metrics, so the hosts counted stay bounded.
+        return self._stats[metrics.host_label(host)]
+
+    async def close(self) -> None:
+        """Close the session belonging to the running loop."""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.session.close()
+
+    # ----- requests ---------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = True,
+        retry: Optional[RetryPolicy] = None,
+    ) -> HttpResponse:
+        """
+        Make a request and read the whole body.
+
+        Fails fast if the host's circuit breaker is open, waits for the
+        host's rate limiter, and retries according to *retry*. When retries
+        on a status run out, the last response is returned like any other.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            params: Query string parameters
+            headers: Extra headers (merged over the default User-Agent)
+            json: JSON body
+            data: Raw/form body
+            timeout: Total timeout in seconds, overriding the default
+            retry: The endpoint's retry policy (default: a single attempt)
+
+        Returns:
+            The response; non-2xx statuses are returned, not raised
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: On transport failures
+            UpstreamUnavailable: If the host's circuit breaker is open
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        policy = retry or NO_RETRY
+        client_timeout = None
+        if timeout is not None:
+            client_timeout = aiohttp.ClientTimeout(total=timeout, connect=min(timeout, self.connect_timeout))
+
+        breaker = self.breakers.get(host, self._prober(host, url))
+        attempts = 0
+        try:
+            async for attempt in policy.retrying():
+                with attempt, tracing.span(
+                    f"{method} {host}", kind=tracing.KIND_CLIENT,
+                    **{"http.method": method, "http.host": host, "http.path": tracing.redact(urlsplit(url).path), "attempt": attempts + 1},
+                ) as span:
+                    attempts += 1
+                    if attempts > 1:
+                        self._host_stats(host).retries += 1
+                    try:
+                        breaker.before_call()
+                    except UpstreamUnavailable as exc:
+                        metrics.observe_upstream(host, "unavailable", None)
+                        report_unavailable(exc)
+                        raise
+                    waited = time.monotonic()
+                    await self.rate_limiter.acquire(host)
+                    started = time.monotonic()
+                    if span is not None:
+                        span.set_attribute("rate_limit_wait_ms", round((started - waited) * 1000, 1))
+                    try:
+                        response = await self._send(
+                            host, method, url, params, headers, json, data, client_timeout, allow_redirects,
+                        )
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        elapsed = time.monotonic() - started
+                        breaker.record(False, elapsed)
+                        metrics.observe_upstream(host, "error", elapsed)
+                        raise
+                    elapsed = time.monotonic() - started
+                    breaker.record(response.status < 500, elapsed)
+                    metrics.observe_upstream(host, response.status, elapsed)
+                    if span is not None:
+                        span.set_attribute("http.status_code", response.status)
+                        if response.status >= 500:
+                            span.set_status(tracing.STATUS_ERROR, f"HTTP {response.status}")
+                    retry_after = self.rate_limiter.observe(host, response.status, response.headers)
+                    if response.status in policy.statuses and attempts < policy.attempts:
+                        raise RetryableStatus(response, retry_after)
+        except RetryableStatus as exc:
+            return exc.response
+        return response
+
+    def _prober(self, host: str, url: str):
+        """Health check used by *host*'s breaker: any non-5xx answer from its root."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}/"
+        probe_timeout = aiohttp.ClientTimeout(total=self.connect_timeout)
+
+        async def probe() -> bool:
+            response = await self._send(host, "GET", origin, None, None, None, None, probe_timeout, True)
+            return response.status < 500
+
+        return probe
+
+    async def _send(
+        self,
+        host: str,
+        method: str,
+        url: str,
+        params: Optional[Mapping[str, Any]],
+        headers: Optional[Mapping[str, str]],
+        json: Any,
+        data: Any,
+        client_timeout: Optional[aiohttp.ClientTimeout],
+        allow_redirects: bool,
+    ) -> HttpResponse:
+        state = self._state()
+        stats = self._host_stats(host)
+        stats.requests += 1
+        semaphore = self._host_semaphore(state, host)
+        origin = self._upstream(host) if self.upstreams else None
+        if origin is not None:
+            parts = urlsplit(url)
+            url = origin + parts.path + (f"?{parts.query}" if parts.query else "")
+            headers = dict(headers or {}, Host=parts.netloc)
+        try:
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                async with state.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    json=json,
+                    data=data,
+                    timeout=client_timeout,
+                    allow_redirects=allow_redirects,
+                    trace_request_ctx={"host": host},
+                ) as response:
+                    body = await response.read()
+                    return HttpResponse(response.status, response.headers, str(response.url), body)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            stats.errors += 1
+            raise
+
+    async def get(self, url: str, **kwargs: Any) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> HttpResponse:
+        return await self.request("POST", url, **kwargs)
+
+    # ----- metrics ----------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Request and connection-reuse counters, in total and per host."""
+        hosts = {host: s.as_dict() for host, s in list(self._stats.items())}
+        created = sum(h["connections_created"] for h in hosts.values())
+        reused = sum(h["connections_reused"] for h in hosts.values())
+        return {
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "connections_created": created,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / (created + reused), 3) if created + reused else None,
+            "retries": sum(h["retries"] for h in hosts.values()),
+            "hosts": hosts,
+            "rate_limits": self.rate_limiter.stats(),
+            "breakers": self.breakers.stats(),
+            "dns": self.dns.stats(),
+        }
+
+
+# Create a singleton instance for import
+http_client = HttpClient.from_env()
@@ -0,0 +1,317 @@
+"""
+Dedicated job-worker processes.
+
+With ``OSINT_JOB_WORKERS=N`` module searches run in N separate worker
+processes instead of inside the eventlet process serving Socket.IO. Each
+worker runs its own asyncio loop and pulls jobs from a duplex pipe; emits are
+sent back over the same pipe and relayed by the web process, and cancels
+travel the other way. A job continues the trace of the search that submitted
+it, and its spans (and, for a profiled job, its sampled stacks) are sent back
+with the job's completion. CPU-heavy module work (HTML parsing, socid_extractor,
+subprocess handling) then can't stall heartbeats for connected clients.
+
+Jobs are addressed by an importable target (``"package.module:attr"`` or
+``"package.module:attr.method"``), so only module singletons and module-level
+functions can be offloaded.
+"""
+
+import asyncio
+import contextvars
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from core import metrics, tracing
+from core.profiler import profiler
+from core.base_module import CancelToken, SearchCancelled, on_cancel, run_cancellable
+from core.registry import resolve_target
+
+logger = logging.getLogger(__name__)
+
+# Modules whose callables must never be imported in a worker (the web app).
+_WEB_ONLY_MODULES = {"__main__", "app", "wsgi"}
+
+
+def job_target(fn: Callable) -> Optional[str]:
+    """Return the importable target string for *fn*, or None if it can't be offloaded."""
+    owner = getattr(fn, "__self__", None)
+    if owner is not None:
+        module = importlib.import_module(type(owner).__module__)
+        for name, value in vars(module).items():
+            if value is owner:
+                return f"{module.__name__}:{name}.{fn.__name__}"
+        return None
+    module_name = getattr(fn, "__module__", None)
+    if module_name in _WEB_ONLY_MODULES or module_name is None:
+        return None
+    module = importlib.import_module(module_name)
+    if getattr(module, fn.__name__, None) is not fn:
+        return None
+    return f"{module_name}:{fn.__name__}"
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+class _PipeEmitter:
+    """Stands in for SocketIO inside a worker: forwards emits to the web process."""
+
+    def __init__(self, conn, lock: threading.Lock, job_id: int):
+        self._conn = conn
+        self._lock = lock
+        self._job_id = job_id
+
+    def emit(self, *args: Any, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.send(("emit", self._job_id, args, kwargs))
+
+
+def _worker_main(conn, backend_dir: str, initializer: Optional[Callable[[], None]] = None) -> None:
+    """Entry point of a worker process."""
+    import sys
+
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - worker[{os.getpid()}] %(name)s - %(levelname)s - %(message)s",
+    )
+    if initializer is not None:
+        initializer()
+
+    # The pipe was created by the monkey-patched (green) socket module, which
+    # leaves it non-blocking; this process reads it from a plain thread.
+    os.set_blocking(conn.fileno(), True)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    send_lock = threading.Lock()
+    cancel_events: Dict[int, CancelToken] = {}
+
+    def send(message) -> None:
+        with send_lock:
+            conn.send(message)
+
+    async def run_job(
+        job_id: int, target: str, query: Any, namespace: str, kwargs: Dict[str, Any], trace_context, profile: bool,
+    ) -> None:
+        cancel_event = cancel_events[job_id]
+        emitter = _PipeEmitter(conn, send_lock, job_id)
+        error = None
+        with tracing.continue_trace(trace_context, "job_worker", pid=os.getpid(), target=target) as trace:
+            if profile and trace is not None:
+                profiler.start(trace.trace_id)
+            try:
+                fn = resolve_target(target)
+                call_kwargs = dict(kwargs, cancel_event=cancel_event)
+                if asyncio.iscoroutinefunction(fn):
+                    await run_cancellable(fn(query, emitter, namespace, **call_kwargs), cancel_event)
+                else:
+                    context = contextvars.copy_context()
+                    await loop.run_in_executor(None, lambda: context.run(fn, query, emitter, namespace, **call_kwargs))
+            except (SearchCancelled, asyncio.CancelledError):
+                logger.info(f"Job {job_id} ({target}) cancelled")
+                if trace is not None:
+                    trace.root.set_status(tracing.STATUS_CANCELLED)
+            except Exception as exc:
+                logger.error(f"Job {job_id} ({target}) failed: {exc}")
+                logger.debug(traceback.format_exc())
+                error = str(exc)
+                if trace is not None:
+                    trace.root.set_status(tracing.STATUS_ERROR, error)
+            finally:
+                cancel_events.pop(job_id, None)
+        spans = trace.to_dict()["spans"] if trace is not None else None
+        samples = profiler.collect(trace.trace_id) if profile and trace is not None else None
+        send(("done", job_id, error, spans, samples))
+
+    def reader() -> None:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                loop.call_soon_threadsafe(loop.stop)
+                return
+            kind = message[0]
+            if kind == "run":
+                _, job_id, target, query, namespace, kwargs, trace_context, profile = message
+                cancel_events[job_id] = CancelToken()
+                asyncio.run_coroutine_threadsafe(
+                    run_job(job_id, target, query, namespace, kwargs, trace_context, profile), loop,
+                )
+            elif kind == "cancel":
+                event = cancel_events.get(message[1])
+                if event is not None:
+                    event.set()
+
+    threading.Thread(target=reader, name="job-worker-reader", daemon=True).start()
+    if metrics.loop_lag_monitor.interval > 0:
+        # Blocking module code stalls this loop rather than the web process's.
+        from core.watchdog import watchdog
+
+        loop.create_task(metrics.loop_lag_monitor.watch_asyncio())
+        watchdog.start()
+    logger.info("Job worker ready")
+    loop.run_forever()
+
+
+# ---------------------------------------------------------------------------
+# Web process side
+# ---------------------------------------------------------------------------
+class _Job:
+    __slots__ = ("job_id", "namespace", "room", "on_done", "remove_cancel", "trace_id")
+
+    def __init__(self, job_id: int, namespace: str, room: Optional[str], on_done: Optional[Callable]):
+        self.job_id = job_id
+        self.namespace = namespace
+        self.room = room
+        self.on_done = on_done
+        self.remove_cancel = None
+        self.trace_id = tracing.current_trace_id()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.jobs: Dict[int, _Job] = {}
+
+
+class JobWorkerPool:
+    """Web-side handle on the worker processes. Used only from the eventlet hub."""
+
+    def __init__(self, size: int, socketio, error_event: str, initializer: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            size: Number of worker processes
+            socketio: The SocketIO instance emits are relayed to
+            error_event: Event name used to report a job that crashed its worker
+            initializer: Called in each worker before it takes jobs; must be
+                importable (a module-level function), as workers are spawned
+        """
+        self.size = size
+        self.socketio = socketio
+        self.error_event = error_event
+        self.initializer = initializer
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: list = []
+        self._ids = itertools.count(1)
+        self._backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    @classmethod
+    def from_env(cls, socketio, error_event: str) -> Optional["JobWorkerPool"]:
+        size = int(os.environ.get("OSINT_JOB_WORKERS", "0"))
+        return cls(size, socketio, error_event) if size > 0 else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "jobs": sum(len(w.jobs) for w in self._workers),
+        }
+
+    def start(self) -> None:
+        while len(self._workers) < self.size:
+            self._workers.append(self._spawn_worker())
+
+    def submit(
+        self,
+        target: str,
+        query: Any,
+        namespace: str,
+        room: Optional[str] = None,
+        cancel_event=None,
+        on_done: Optional[Callable] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Send a job to the least busy worker and return its id."""
+        self.start()
+        worker = min(self._workers, key=lambda w: len(w.jobs))
+        job = _Job(next(self._ids), namespace, room, on_done)
+        worker.jobs[job.job_id] = job
+        payload = dict(kwargs or {}, room=room)
+        profile = profiler.profiling(job.trace_id)
+        worker.conn.send(("run", job.job_id, target, query, namespace, payload, tracing.current_context(), profile))
+        job.remove_cancel = on_cancel(cancel_event, lambda: self._send_cancel(worker, job.job_id))
+        return job.job_id
+
+    def _spawn_worker(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._backend_dir, self.initializer),
+            name="osint-job-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self.socketio.start_background_task(self._relay, worker)
+        logger.info(f"Started job worker pid={process.pid}")
+        return worker
+
+    @staticmethod
+    def _send_cancel(worker: _Worker, job_id: int) -> None:
+        if job_id in worker.jobs:
+            worker.conn.send(("cancel", job_id))
+
+    def _finish(self, worker: _Worker, job_id: int) -> None:
+        job = worker.jobs.pop(job_id, None)
+        if job is None:
+            return
+        if job.remove_cancel is not None:
+            job.remove_cancel()
+        if job.on_done is not None:
+            job.on_done()
+
+    def _relay(self, worker: _Worker) -> None:
+        """Relay messages from one worker onto the hub until its pipe closes."""
+        from eventlet.hubs import trampoline
+
+        fd = worker.conn.fileno()
+        while True:
+            try:
+                trampoline(fd, read=True)
+                while worker.conn.poll():
+                    message = worker.conn.recv()
+                    kind = message[0]
+                    if kind == "emit":
+                        _, _job_id, args, kwargs = message
+                        self.socketio.emit(*args, **kwargs)
+                    elif kind == "done":
+                        _, job_id, error, spans, samples = message
+                        job = worker.jobs.get(job_id)
+                        if job is not None and spans and job.trace_id is not None:
+                            tracing.tracer.add_remote_spans(job.trace_id, spans)
+                        if job is not None and samples and job.trace_id is not None:
+                            profiler.add_samples(job.trace_id, samples)
+                        if job is not None and error is not None:
+                            self.socketio.emit(
+                                self.error_event,
+                                tracing.stamp({"error": error}, job.trace_id),
+                                namespace=job.namespace,
+                                room=job.room,
+                            )
+                        self._finish(worker, job_id)
+            except (EOFError, OSError):
+                break
+            except Exception as exc:
+                logger.exception(f"Error relaying worker message: {exc}")
+        self._handle_exit(worker)
+
+    def _handle_exit(self, worker: _Worker) -> None:
+        logger.error(f"Job worker pid={worker.process.pid} exited")
+        if worker in self._workers:
+            self._workers.remove(worker)
+        for job_id, job in list(worker.jobs.items()):
+            self.socketio.emit(
+                self.error_event,
+                tracing.stamp({"error": "Search worker crashed"}, job.trace_id),
+                namespace=job.namespace,
+                room=job.room,
+            )
+            self._finish(worker, job_id)
+        self.start()
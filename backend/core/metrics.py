@@ -0,0 +1,338 @@
+"""
+Prometheus metrics, served by the app at ``GET /metrics``.
+
+Instrumented at the edges the app already owns, so modules don't need to
+know about it:
+
+- ``OsintModule.run``: searches per module and outcome, and their duration
+- the handler glue in ``app.py``: jobs per namespace and outcome, time spent
+  queued and running
+- ``http_client.request``: latency and status codes per upstream host (at
+  most ``OSINT_METRICS_MAX_HOSTS`` host labels; the rest are ``other``)
+- the Socket.IO packet class: packets and bytes encoded per event
+- ``LoopLag``: how late timers fire on the eventlet hub and the asyncio loop
+- the stall watchdog (``core.watchdog``): stalls per loop and their length
+
+Values that already live in the app's components (cache hits and misses,
+``_active_tasks``, the scheduler queue) are read when scraped, through
+collectors registered with ``register_collector``.
+
+Metrics are per process. When ``PROMETHEUS_MULTIPROC_DIR`` is set, counters
+and histograms from gunicorn and job-worker processes are written there and
+aggregated on scrape; collector values still come from the scraped process.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import prometheus_client.metrics
+import prometheus_client.registry
+import prometheus_client.values
+from eventlet import patcher
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+logger = logging.getLogger(__name__)
+
+# Metrics are updated from the eventlet hub and the asyncio loop thread alike.
+# prometheus_client picks up the app's monkey-patched (green) Lock, which
+# breaks when contended across OS threads; its critical sections never yield,
+# so native locks are safe.
+_threading = patcher.original("threading")
+for _module in (prometheus_client.metrics, prometheus_client.registry, prometheus_client.values):
+    _module.Lock = _threading.Lock
+
+DEFAULT_MAX_HOSTS = 100
+DEFAULT_LAG_INTERVAL = 0.1
+
+OTHER_HOST = "other"
+
+# Searches range from a DNS lookup to a WhatsMyName sweep of every site.
+SEARCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+REQUEST_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+registry = CollectorRegistry(auto_describe=True)
+
+# ----- jobs (app glue) ------------------------------------------------------
+
+jobs = Counter(
+    "osint_jobs", "Search jobs finished, by namespace and outcome",
+    ["namespace", "outcome"], registry=registry,
+)
+job_duration = Histogram(
+    "osint_job_duration_seconds", "Time from a job starting to it finishing",
+    ["namespace"], buckets=SEARCH_BUCKETS, registry=registry,
+)
+job_queue_wait = Histogram(
+    "osint_job_queue_wait_seconds", "Time a job waited in the scheduler queue before starting",
+    ["namespace"], buckets=SEARCH_BUCKETS, registry=registry,
+)
+
+admission_rejected = Counter(
+    "osint_admission_rejected", "Searches turned away by admission control, by namespace and reason",
+    ["namespace", "reason"], registry=registry,
+)
+
+# ----- module searches (OsintModule.run) ------------------------------------
+
+searches = Counter(
+    "osint_module_searches", "Module searches finished, by module and outcome",
+    ["namespace", "module", "outcome"], registry=registry,
+)
+search_duration = Histogram(
+    "osint_module_search_duration_seconds", "Duration of module searches, cache hits included",
+    ["namespace", "module"], buckets=SEARCH_BUCKETS, registry=registry,
+)
+
+# ----- upstreams (http_client) ----------------------------------------------
+
+upstream_latency = Histogram(
+    "osint_upstream_request_seconds", "Latency of requests to upstream hosts, per attempt",
+    ["host"], buckets=REQUEST_BUCKETS, registry=registry,
+)
+upstream_responses = Counter(
+    "osint_upstream_responses", "Upstream request attempts by host and status code (or error)",
+    ["host", "code"], registry=registry,
+)
+
+# ----- Socket.IO (packet class) ---------------------------------------------
+
+socketio_packets = Counter(
+    "osint_socketio_packets", "Socket.IO packets encoded for sending, by event",
+    ["event"], registry=registry,
+)
+socketio_bytes = Counter(
+    "osint_socketio_bytes", "Bytes of Socket.IO packets encoded for sending, by event",
+    ["event"], registry=registry,
+)
+
+# ----- event loops (LoopLag) ------------------------------------------------
+
+loop_lag = Histogram(
+    "osint_event_loop_lag_seconds", "How late a periodic timer fired, per event loop",
+    ["loop"], buckets=LAG_BUCKETS, registry=registry,
+)
+loop_lag_latest = Gauge(
+    "osint_event_loop_lag_latest_seconds", "Most recent timer lateness, per event loop",
+    ["loop"], registry=registry, multiprocess_mode="max",
+)
+loop_stalls = Counter(
+    "osint_event_loop_stalls", "Times an event loop was blocked for longer than the stall threshold",
+    ["loop"], registry=registry,
+)
+loop_stall_duration = Histogram(
+    "osint_event_loop_stall_seconds", "How long stalled event loops stayed blocked",
+    ["loop"], buckets=LAG_BUCKETS + (10, 30, 60), registry=registry,
+)
+
+
+# ---------------------------------------------------------------------------
+# Label helpers
+# ---------------------------------------------------------------------------
+_hosts_lock = _threading.Lock()
+_hosts: set = set()
+_max_hosts = int(os.environ.get("OSINT_METRICS_MAX_HOSTS", DEFAULT_MAX_HOSTS))
+
+
+def host_label(host: str) -> str:
+    """*host* as a label value, or ``other`` once ``OSINT_METRICS_MAX_HOSTS`` are in use."""
+    if host in _hosts:
+        return host
+    with _hosts_lock:
+        if len(_hosts) < _max_hosts:
+            _hosts.add(host)
+            return host
+    return OTHER_HOST
+
+
+def outcome(cancelled: bool, failed: bool) -> str:
+    if cancelled:
+        return "cancelled"
+    return "error" if failed else "success"
+
+
+def result_failed(result: Any) -> bool:
+    """True for a module result (or emitted payload) that reports an error."""
+    if not isinstance(result, dict):
+        return False
+    if result.get("error"):
+        return True
+    items = result.get("items")
+    return isinstance(items, list) and any(isinstance(item, dict) and item.get("error") for item in items)
+
+
+def observe_search(namespace: str, module: str, seconds: float, cancelled: bool, failed: bool) -> None:
+    searches.labels(namespace, module, outcome(cancelled, failed)).inc()
+    search_duration.labels(namespace, module).observe(seconds)
+
+
+def observe_job(namespace: str, seconds: Optional[float], cancelled: bool, failed: bool) -> None:
+    """Count a finished job; *seconds* is None for one cancelled before it started."""
+    jobs.labels(namespace, outcome(cancelled, failed)).inc()
+    if seconds is not None:
+        job_duration.labels(namespace).observe(seconds)
+
+
+def observe_upstream(host: str, code: Any, seconds: Optional[float]) -> None:
+    """
+    Record one request attempt.
+
+    Args:
+        host: The upstream host
+        code: HTTP status, ``"error"`` (transport failure) or ``"unavailable"``
+            (circuit breaker open, no request made)
+        seconds: Time spent on the request, None if none was sent
+    """
+    label = host_label(host)
+    upstream_responses.labels(label, str(code)).inc()
+    if seconds is not None:
+        upstream_latency.labels(label).observe(seconds)
+
+
+def observe_packet(event: str, encoded: Any) -> None:
+    socketio_packets.labels(event).inc()
+    socketio_bytes.labels(event).inc(_encoded_size(encoded))
+
+
+def _encoded_size(encoded: Any) -> int:
+    if isinstance(encoded, list):
+        return sum(_encoded_size(part) for part in encoded)
+    if isinstance(encoded, str):
+        return len(encoded.encode("utf-8"))
+    return len(encoded)
+
+
+# ---------------------------------------------------------------------------
+# Scrape-time collectors
+# ---------------------------------------------------------------------------
+class _CallbackCollector:
+    def __init__(self, callback: Callable[[], Iterable[Any]]):
+        self._callback = callback
+
+    def collect(self):
+        try:
+            yield from self._callback()
+        except Exception as e:
+            logger.error(f"Metrics collector failed: {e}")
+
+    def describe(self):
+        # Nothing up front: the families depend on the app's state when scraped.
+        return []
+
+
+_collectors = []
+
+
+def register_collector(callback: Callable[[], Iterable[Any]]) -> None:
+    """
+    Add metrics read from app state at scrape time.
+
+    Args:
+        callback: Returns metric families (see ``gauge`` and ``counter``)
+    """
+    collector = _CallbackCollector(callback)
+    _collectors.append(collector)
+    registry.register(collector)
+
+
+def gauge(name: str, documentation: str, values: Any, label: Optional[str] = None) -> GaugeMetricFamily:
+    """A gauge family: one value, or ``{label_value: value}`` when *label* is given."""
+    return _family(GaugeMetricFamily, name, documentation, values, label)
+
+
+def counter(name: str, documentation: str, values: Any, label: Optional[str] = None) -> CounterMetricFamily:
+    """A counter family: one value, or ``{label_value: value}`` when *label* is given."""
+    return _family(CounterMetricFamily, name, documentation, values, label)
+
+
+def _family(cls, name: str, documentation: str, values: Any, label: Optional[str]):
+    if label is None:
+        return cls(name, documentation, value=values)
+    family = cls(name, documentation, labels=[label])
+    for key, value in values.items():
+        family.add_metric([str(key)], value)
+    return family
+
+
+def render() -> Tuple[bytes, str]:
+    """The exposition text for ``/metrics`` and its content type."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        scrape = CollectorRegistry()
+        MultiProcessCollector(scrape)
+        for collector in _collectors:
+            scrape.register(collector)
+        return generate_latest(scrape), CONTENT_TYPE_LATEST
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ---------------------------------------------------------------------------
+# Event loop lag
+# ---------------------------------------------------------------------------
+class LoopLag:
+    """Event loop lag, measured as how much later than asked a sleep returns."""
+
+    def __init__(self, interval: float = DEFAULT_LAG_INTERVAL):
+        """
+        Args:
+            interval: Seconds between measurements (0 disables them)
+        """
+        self.interval = interval
+        self._latest: Dict[str, float] = {}
+        # For the stall watchdog: when each loop last woke up, and its OS thread.
+        self.ticks: Dict[str, float] = {}
+        self.threads: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "LoopLag":
+        return cls(interval=float(os.environ.get("OSINT_LAG_INTERVAL", DEFAULT_LAG_INTERVAL)))
+
+    def latest(self, loop: Optional[str] = None) -> float:
+        """Last lag measured on *loop*, or the worst across loops."""
+        if loop is not None:
+            return self._latest.get(loop, 0.0)
+        return max(self._latest.values(), default=0.0)
+
+    def stats(self) -> Dict[str, float]:
+        return {loop: round(lag, 4) for loop, lag in self._latest.items()}
+
+    def watch_hub(self, sleep: Callable[[float], Any]) -> None:
+        """Measure the eventlet hub forever; run as a background task."""
+        self.threads["hub"] = _threading.get_ident()
+        while self.interval > 0:
+            started = self._tick("hub")
+            sleep(self.interval)
+            self._observe("hub", time.monotonic() - started - self.interval)
+
+    async def watch_asyncio(self) -> None:
+        """Measure the running asyncio loop forever."""
+        self.threads["asyncio"] = _threading.get_ident()
+        while self.interval > 0:
+            started = self._tick("asyncio")
+            await asyncio.sleep(self.interval)
+            self._observe("asyncio", time.monotonic() - started - self.interval)
+
+    def _tick(self, loop: str) -> float:
+        now = self.ticks[loop] = time.monotonic()
+        return now
+
+    def _observe(self, loop: str, lag: float) -> None:
+        lag = max(lag, 0.0)
+        self._latest[loop] = lag
+        loop_lag.labels(loop).observe(lag)
+        loop_lag_latest.labels(loop).set(lag)
+
+
+# Create a singleton instance for import
+loop_lag_monitor = LoopLag.from_env()
@@ -0,0 +1,352 @@
+"""
+Investigations: module searches chained through the entities they find.
+
+Starting from a seed, every module search that consumes the seed's entity
+type runs (``consumes``/``produces`` in each ``plugin.py``, see
+``core/entities.py``), and the entities each result yields are searched in
+turn. A domain fans out like::
+
+    example.com -+- dns -------- 93.184.215.14 ----- ip
+                 +- subdomains - www.example.com -+- dns, subdomains, ...
+                 +- whois ------ admin@example.com - google
+                 +- wayback ---- http://example.com/about (nothing consumes URLs)
+
+A search starts as soon as its entity is found, up to ``concurrency`` at a
+time, so an investigation takes about as long as its slowest chain rather than
+the sum of its searches. Entities are visited once, by normalized value;
+``max_depth`` caps the pivots followed from the seed (0 runs the seed's
+searches only), ``max_fanout`` the new entities one result contributes and
+``max_searches`` the searches of the whole investigation.
+
+``Investigation`` runs on an asyncio loop and has no Socket.IO of its own:
+the caller gives each search the socketio-like emitter it writes its events
+to, and is told of every entity found and search finished.
+``parse_investigation`` reads the body of ``POST /api/investigate``::
+
+    {"seed": "example.com", "type": "domain", "modules": ["dns", "ip"],
+     "max_depth": 1, "max_fanout": 10, "no_cache": false}
+
+``type`` is guessed from the seed when left out, ``modules`` restricts the
+searches run (all module searches that declare ``consumes`` by default) and
+the limits can only be lowered from the server's ``OSINT_PIPELINE_*``.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core import entities, metrics
+from core.base_module import CancelToken, OsintModule, SearchCancelled, run_cancellable
+from core.batch import STATUS_CANCELLED, STATUS_ERROR, STATUS_INVALID, STATUS_SUCCESS
+from core.entities import Entity
+from core.registry import ModuleRegistry, SearchSpec, registry
+from core.validators import is_valid_domain, is_valid_email, is_valid_ip, is_valid_url, is_valid_username
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_FANOUT = 20
+DEFAULT_MAX_SEARCHES = 100
+DEFAULT_CONCURRENCY = 8
+
+# Seeds are checked like the inputs of the searches that take them.
+SEED_VALIDATORS: Dict[str, Callable] = {
+    entities.DOMAIN: is_valid_domain,
+    entities.IP: is_valid_ip,
+    entities.USERNAME: is_valid_username,
+    entities.EMAIL: is_valid_email,
+    entities.URL: is_valid_url,
+}
+
+
+class PipelineError(ValueError):
+    """The request body is not a valid investigation; the message says why."""
+
+
+@dataclass(frozen=True)
+class PipelineLimits:
+    """Bounds on one investigation, from the environment."""
+
+    max_depth: int = DEFAULT_MAX_DEPTH
+    max_fanout: int = DEFAULT_MAX_FANOUT
+    max_searches: int = DEFAULT_MAX_SEARCHES
+    concurrency: int = DEFAULT_CONCURRENCY
+
+    @classmethod
+    def from_env(cls) -> "PipelineLimits":
+        return cls(
+            max_depth=int(os.environ.get("OSINT_PIPELINE_MAX_DEPTH", DEFAULT_MAX_DEPTH)),
+            max_fanout=int(os.environ.get("OSINT_PIPELINE_MAX_FANOUT", DEFAULT_MAX_FANOUT)),
+            max_searches=int(os.environ.get("OSINT_PIPELINE_MAX_SEARCHES", DEFAULT_MAX_SEARCHES)),
+            concurrency=int(os.environ.get("OSINT_PIPELINE_CONCURRENCY", DEFAULT_CONCURRENCY)),
+        )
+
+    def narrowed(self, **requested: Optional[int]) -> "PipelineLimits":
+        """These limits, lowered (never raised) to the values a request asks for."""
+        values = {
+            name: max(0, min(int(value), getattr(self, name)))
+            for name, value in requested.items() if value is not None
+        }
+        if "concurrency" in values:
+            values["concurrency"] = max(1, values["concurrency"])
+        return replace(self, **values)
+
+
+@dataclass
+class InvestigationRequest:
+    seed: Entity
+    limits: PipelineLimits
+    specs: Optional[List[SearchSpec]]
+    use_cache: bool
+
+
+def parse_investigation(body: Any, registry: ModuleRegistry, limits: PipelineLimits) -> InvestigationRequest:
+    """
+    Check an investigation request body and validate its seed.
+
+    Args:
+        body: The decoded JSON body
+        registry: Where searches are declared
+        limits: The server's caps, which the request may lower
+
+    Returns:
+        The seed, the limits and searches to use
+
+    Raises:
+        PipelineError: If the body is malformed, names an unknown search or
+            entity type, or the seed is invalid or has no search to start from
+    """
+    if not isinstance(body, dict) or not str(body.get("seed") or "").strip():
+        raise PipelineError('Expected a JSON object with a "seed"')
+    value = str(body["seed"]).strip()
+    entity_type = str(body.get("type") or entities.guess_type(value))
+    if entity_type not in entities.ENTITY_TYPES:
+        raise PipelineError(f"Unknown entity type {entity_type!r} (one of {', '.join(entities.ENTITY_TYPES)})")
+    specs = None
+    if body.get("modules") is not None:
+        if not isinstance(body["modules"], list):
+            raise PipelineError('"modules" must be a list of module names')
+        specs = []
+        for name in body["modules"]:
+            namespace, _, event = str(name).partition(":")
+            spec = registry.get(namespace, event or "search")
+            if spec is None or spec.consumes is None or spec.target is None:
+                raise PipelineError(f"Unknown module {name!r}, or one that can't run in an investigation")
+            specs.append(spec)
+    if not [spec for spec in (specs if specs is not None else registry.consumers(entity_type))
+            if spec.consumes == entity_type]:
+        raise PipelineError(f"No module search takes a {entity_type} to start from")
+
+    try:
+        limits = limits.narrowed(**{name: body.get(name) for name in
+                                    ("max_depth", "max_fanout", "max_searches", "concurrency")})
+    except (TypeError, ValueError):
+        raise PipelineError('"max_depth", "max_fanout", "max_searches" and "concurrency" must be numbers') from None
+
+    # Last: domain validators resolve the name.
+    ok, err = SEED_VALIDATORS[entity_type](value)
+    seed = entities.make(entity_type, value) if ok else None
+    if seed is None:
+        raise PipelineError(f"Invalid {entity_type} seed: {err or value}")
+    return InvestigationRequest(seed=seed, limits=limits, specs=specs, use_cache=not body.get("no_cache"))
+
+
+@dataclass
+class SearchNode:
+    """One module search of an investigation, on one entity."""
+
+    index: int
+    spec: SearchSpec
+    entity: Entity
+    depth: int
+    status: Optional[str] = None
+    duration_ms: Optional[int] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "module": self.spec.name,
+            "entity": self.entity.to_dict(),
+            "depth": self.depth,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            **self.details,
+        }
+
+
+# emitter_for(node) -> the socketio-like object the node's search emits through.
+EmitterFactory = Callable[[SearchNode], Any]
+# on_entity(entity, depth, source): source is the search that found it (None for the seed).
+EntityCallback = Callable[[Entity, int, Optional[SearchNode]], None]
+SearchCallback = Callable[[SearchNode], None]
+
+
+class Investigation:
+    """The searches fanning out from one seed, run concurrently within limits."""
+
+    def __init__(
+        self,
+        namespace: str,
+        emitter_for: EmitterFactory,
+        cancel_event: CancelToken,
+        limits: Optional[PipelineLimits] = None,
+        specs: Optional[List[SearchSpec]] = None,
+        on_entity: Optional[EntityCallback] = None,
+        on_search: Optional[SearchCallback] = None,
+        room: Optional[str] = None,
+        use_cache: bool = True,
+    ):
+        """
+        Args:
+            namespace: Namespace passed to every module search
+            emitter_for: Gives each search its emitter (see ``EmitterFactory``)
+            cancel_event: Cancels every search of the investigation
+            limits: Depth, fan-out, search and concurrency caps
+            specs: Searches the investigation may run; None for every module
+                search that declares ``consumes``
+            on_entity: Called for each entity visited, the seed included
+            on_search: Called for each search once it has finished
+            room: Passed to every module search
+            use_cache: False forces fresh searches (results are still cached)
+        """
+        self.namespace = namespace
+        self.limits = limits or PipelineLimits()
+        self.cancel_event = cancel_event
+        self.room = room
+        self.use_cache = use_cache
+        self._emitter_for = emitter_for
+        self._specs = specs
+        self._on_entity = on_entity
+        self._on_search = on_search
+        self._slots = asyncio.Semaphore(self.limits.concurrency)
+        self._seen: Set[Entity] = set()
+        self._tasks: Set[asyncio.Future] = set()
+        self._checks: Dict[Tuple[Callable, str], asyncio.Future] = {}
+        self._searches = 0
+        self._started = time.monotonic()
+        self.counts: Counter = Counter()
+        self.entities: Counter = Counter()
+
+    async def run(self, seed: Entity) -> Dict[str, Any]:
+        """
+        Investigate *seed*, which the caller has already validated.
+
+        Returns:
+            The summary (see ``summary``)
+        """
+        self._started = time.monotonic()
+        self._visit(seed, 0, None)
+        try:
+            while self._tasks:
+                done, _ = await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                self._tasks -= done
+        finally:
+            for task in self._tasks:
+                task.cancel()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "searches": self._searches,
+            **{status: self.counts[status] for status in
+               (STATUS_SUCCESS, STATUS_ERROR, STATUS_INVALID, STATUS_CANCELLED)},
+            # Searches over max_searches, and entities over a result's max_fanout.
+            "skipped": self.counts["skipped"],
+            "dropped_entities": self.counts["dropped"],
+            "entities": dict(self.entities),
+            "duration_ms": round((time.monotonic() - self._started) * 1000),
+        }
+
+    def _consumers(self, entity_type: str) -> List[SearchSpec]:
+        if self._specs is None:
+            return registry.consumers(entity_type)
+        return [spec for spec in self._specs if spec.consumes == entity_type]
+
+    def _visit(self, entity: Entity, depth: int, source: Optional[SearchNode]) -> None:
+        """Record *entity* and start the searches that consume it."""
+        self._seen.add(entity)
+        self.entities[entity.type] += 1
+        if self._on_entity is not None:
+            self._on_entity(entity, depth, source)
+        for spec in self._consumers(entity.type):
+            if self._searches >= self.limits.max_searches:
+                self.counts["skipped"] += 1
+                continue
+            node = SearchNode(self._searches, spec, entity, depth)
+            self._searches += 1
+            self._tasks.add(asyncio.ensure_future(self._search(node)))
+
+    async def _search(self, node: SearchNode) -> None:
+        started = time.monotonic()
+        status, result, fn = STATUS_ERROR, None, None
+        try:
+            async with self._slots:
+                if self.cancel_event.is_set():
+                    raise SearchCancelled()
+                if node.depth > 0 and node.spec.validator is not None:
+                    ok, err = await self._validate(node.spec.validator, node.entity.value)
+                    if not ok:
+                        self._finish(node, STATUS_INVALID, started, {"error": err})
+                        return
+                fn = registry.resolve(node.spec.target)
+                result = await run_cancellable(
+                    fn(node.entity.value, self._emitter_for(node), self.namespace, use_cache=self.use_cache,
+                       cancel_event=self.cancel_event, room=self.room, **node.spec.kwargs),
+                    self.cancel_event,
+                )
+            if self.cancel_event.is_set():
+                status = STATUS_CANCELLED
+            else:
+                status = STATUS_ERROR if metrics.result_failed(result) else STATUS_SUCCESS
+            self._finish(node, status, started, {})
+        except (SearchCancelled, asyncio.CancelledError):
+            self._finish(node, STATUS_CANCELLED, started, {})
+            return
+        except Exception as exc:
+            logger.exception(f"{node.spec.name} search failed for {node.entity.value}: {exc}")
+            self._finish(node, STATUS_ERROR, started, {"error": str(exc)})
+            return
+
+        if status == STATUS_SUCCESS and node.depth < self.limits.max_depth:
+            self._expand(node, fn, result)
+
+    async def _validate(self, validator: Callable, value: str) -> Tuple[bool, str]:
+        """Check a found entity once for all the searches that take it."""
+        check = self._checks.get((validator, value))
+        if check is None:
+            # Domain validators resolve the name; keep that off the loop.
+            check = self._checks[(validator, value)] = asyncio.ensure_future(asyncio.to_thread(validator, value))
+        return await asyncio.shield(check)
+
+    def _expand(self, node: SearchNode, fn: Callable, result: Dict[str, Any]) -> None:
+        """Visit the entities *node*'s result yields, at most ``max_fanout`` new ones."""
+        module = getattr(fn, "__self__", None)
+        if not isinstance(module, OsintModule):
+            return
+        try:
+            found = module.entities(result)
+        except Exception as exc:
+            logger.exception(f"Could not extract entities from the {node.spec.name} result: {exc}")
+            return
+        added = 0
+        for entity in found:
+            if entity.type not in node.spec.produces or entity in self._seen:
+                continue
+            if added >= self.limits.max_fanout:
+                self.counts["dropped"] += 1
+                continue
+            self._visit(entity, node.depth + 1, node)
+            added += 1
+
+    def _finish(self, node: SearchNode, status: str, started: float, details: Dict[str, Any]) -> None:
+        node.status = status
+        node.duration_ms = round((time.monotonic() - started) * 1000)
+        node.details = details
+        self.counts[status] += 1
+        if self._on_search is not None:
+            self._on_search(node)
@@ -0,0 +1,368 @@
+"""
+Opt-in sampling profiler for single search jobs.
+
+Admins profile one search by adding ``"profile": true`` and
+``"admin_token": "<OSINT_ADMIN_TOKEN>"`` to its payload. While the job runs, a
+native thread samples the stacks of every thread in the process
+(``sys._current_frames``) every ``OSINT_PROFILE_INTERVAL`` seconds and keeps
+the ones that belong to the job. A stack belongs to the job when one of its
+frames holds the job's trace (``core.tracing``): a span or trace local, or the
+context of the asyncio task, greenthread or executor call running it. Jobs
+run in job-worker processes are sampled there and their stacks sent back with
+the job's completion.
+
+Samples are only taken while the job's code is on a thread's stack, running
+or blocking it. Time spent awaiting I/O is shown by the trace instead.
+
+When the job finishes, its stacks are written to ``OSINT_PROFILE_DIR`` in the
+collapsed ("folded") format read by speedscope, flamegraph.pl and most
+flamegraph tools, named after the job's trace id. ``/api/profiles/<job_id>``
+serves the file (``?format=speedscope`` for speedscope's JSON). Only the
+newest ``OSINT_PROFILE_KEEP`` profiles are kept.
+
+Without ``OSINT_ADMIN_TOKEN`` profiling is off, and nothing runs unless a job
+is being profiled.
+"""
+
+import asyncio.events
+import concurrent.futures.thread
+import contextvars
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from eventlet import patcher
+
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+_threading = patcher.original("threading")
+_time = patcher.original("time")
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_KEEP = 50
+MAX_STACK_DEPTH = 128
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Job ids are trace ids; anything else never names a profile file.
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Locals that can hold the job's span, trace or context (``function`` is
+# ``context.run`` in the eventlet greenthread running ``app._spawn_sync``).
+_MARKER_LOCALS = ("span", "trace", "context", "function")
+# Frames that run a callback in a saved context: an asyncio task step, and an
+# executor call made by asyncio.to_thread.
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+_WORK_ITEM_RUN = concurrent.futures.thread._WorkItem.run.__code__
+
+
+class _Profile:
+    __slots__ = ("job_id", "attributes", "started", "samples")
+
+    def __init__(self, job_id: str, attributes: Dict[str, Any]):
+        self.job_id = job_id
+        self.attributes = attributes
+        self.started = time.time()
+        self.samples: Counter = Counter()
+
+
+class JobProfiler:
+    """Samples the stacks of profiled jobs and stores them as flamegraph files."""
+
+    def __init__(
+        self,
+        admin_token: Optional[str] = None,
+        interval: float = DEFAULT_INTERVAL,
+        directory: Optional[str] = None,
+        keep: int = DEFAULT_KEEP,
+    ):
+        """
+        Args:
+            admin_token: Token a search must carry to be profiled (None
+                disables profiling)
+            interval: Seconds between samples
+            directory: Where profiles are written
+            keep: How many profiles to keep on disk
+        """
+        self.admin_token = admin_token
+        self.interval = interval
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "osint-profiles")
+        self.keep = keep
+        self._active: Dict[str, _Profile] = {}
+        self._lock = _threading.Lock()
+        self._thread = None
+        self._markers: Dict[Any, tuple] = {}
+
+    @classmethod
+    def from_env(cls) -> "JobProfiler":
+        return cls(
+            admin_token=os.environ.get("OSINT_ADMIN_TOKEN") or None,
+            interval=float(os.environ.get("OSINT_PROFILE_INTERVAL", DEFAULT_INTERVAL)),
+            directory=os.environ.get("OSINT_PROFILE_DIR"),
+            keep=int(os.environ.get("OSINT_PROFILE_KEEP", DEFAULT_KEEP)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def authorized(self, token: Any) -> bool:
+        """True if *token* is the admin token."""
+        if not self.enabled or not isinstance(token, str):
+            return False
+        return hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def requested(self, data: Any) -> bool:
+        """True if a search payload asks to be profiled and carries the admin token."""
+        if not self.enabled or not isinstance(data, dict) or not data.get("profile"):
+            return False
+        if not self.authorized(data.get("admin_token")):
+            logger.warning("Profiling requested without a valid admin token")
+            return False
+        return True
+
+    def profiling(self, job_id: Optional[str]) -> bool:
+        return job_id is not None and job_id in self._active
+
+    def start(self, job_id: str, **attributes: Any) -> None:
+        """
+        Start sampling the stacks of a job.
+
+        Args:
+            job_id: The job's trace id
+            attributes: Stored with the profile, e.g. namespace and query
+        """
+        with self._lock:
+            self._active[job_id] = _Profile(job_id, attributes)
+            if self._thread is None:
+                self._thread = _threading.Thread(target=self._run, name="osint-job-profiler", daemon=True)
+                self._thread.start()
+
+    def add_samples(self, job_id: str, samples: Dict[str, int]) -> None:
+        """Merge stacks sampled elsewhere (a job-worker process) into a job's profile."""
+        profile = self._active.get(job_id)
+        if profile is not None and samples:
+            with self._lock:
+                profile.samples.update(samples)
+
+    def collect(self, job_id: str) -> Dict[str, int]:
+        """Stop sampling a job and return its stacks, without writing them."""
+        with self._lock:
+            profile = self._active.pop(job_id, None)
+        return dict(profile.samples) if profile is not None else {}
+
+    def finish(self, job_id: str) -> Optional[str]:
+        """
+        Stop sampling a job and write its profile.
+
+        Returns:
+            The profile's path, or None if the job wasn't profiled
+        """
+        with self._lock:
+            profile = self._active.pop(job_id, None)
+        if profile is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(job_id, ".folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in profile.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        meta = dict(
+            profile.attributes,
+            job_id=job_id,
+            started=profile.started,
+            duration_ms=round((time.time() - profile.started) * 1000, 1),
+            samples=sum(profile.samples.values()),
+            interval=self.interval,
+        )
+        with open(self._path(job_id, ".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        logger.info(f"Profile of job {job_id}: {meta['samples']} samples written to {path}")
+        self._prune()
+        return path
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A stored profile's metadata plus its collapsed stacks (``"folded"``)."""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id, ".json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(job_id, ".folded"), encoding="utf-8") as f:
+                meta["folded"] = f.read()
+        except FileNotFoundError:
+            return None
+        return meta
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first."""
+        profiles = []
+        for name in self._stored()[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    # ----- sampling ---------------------------------------------------------
+
+    def _run(self) -> None:
+        own = _threading.get_ident()
+        while True:
+            _time.sleep(self.interval)
+            if not self._active:
+                continue
+            try:
+                self.sample(own)
+            except Exception as e:
+                logger.error(f"Profiler sample failed: {e}")
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        """Record the stack of every thread currently running a profiled job."""
+        # Threads started through the monkey-patched module are only listed there.
+        names = {thread.ident: thread.name for thread in (*threading.enumerate(), *_threading.enumerate())}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            job_id = self._job_of(frame)
+            profile = self._active.get(job_id) if job_id is not None else None
+            if profile is None:
+                continue
+            stack = self._stack(frame, names.get(ident, f"thread-{ident}"))
+            with self._lock:
+                profile.samples[stack] += 1
+
+    def _job_of(self, frame) -> Optional[str]:
+        """Trace id of the job the innermost marked frame of the stack belongs to."""
+        depth = 0
+        while frame is not None and depth < MAX_STACK_DEPTH:
+            span = self._marked_span(frame)
+            if span is not None:
+                return span.trace_id
+            frame = frame.f_back
+            depth += 1
+        return None
+
+    def _marked_span(self, frame):
+        code = frame.f_code
+        if code is _HANDLE_RUN:
+            context = getattr(frame.f_locals.get("self"), "_context", None)
+            return tracing.span_in(context) if isinstance(context, contextvars.Context) else None
+        if code is _WORK_ITEM_RUN:
+            # asyncio.to_thread runs functools.partial(context.run, ...).
+            fn = getattr(frame.f_locals.get("self"), "fn", None)
+            context = getattr(getattr(fn, "func", None), "__self__", None)
+            return tracing.span_in(context) if isinstance(context, contextvars.Context) else None
+        names = self._markers.get(code)
+        if names is None:
+            local_names = code.co_varnames + code.co_cellvars + code.co_freevars
+            names = self._markers[code] = tuple(n for n in _MARKER_LOCALS if n in local_names)
+        if not names:
+            return None
+        local_vars = frame.f_locals
+        for name in names:
+            value = local_vars.get(name)
+            if isinstance(value, tracing.Span):
+                return value
+            if isinstance(value, tracing.Trace):
+                return value.root
+            context = value if isinstance(value, contextvars.Context) else getattr(value, "__self__", None)
+            if isinstance(context, contextvars.Context):
+                span = tracing.span_in(context)
+                if span is not None:
+                    return span
+        return None
+
+    @staticmethod
+    def _stack(frame, thread_name: str) -> str:
+        """Collapsed stack, outermost frame first, rooted at the thread's name."""
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            path = code.co_filename
+            if path.startswith(BACKEND_DIR):
+                path = os.path.relpath(path, BACKEND_DIR)
+            else:
+                path = os.path.basename(path)
+            frames.append(f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":"))
+            frame = frame.f_back
+        frames.append(thread_name.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(frames))
+
+    # ----- storage ----------------------------------------------------------
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, job_id + suffix)
+
+    def _stored(self) -> List[str]:
+        """Metadata files of stored profiles, newest first."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except FileNotFoundError:
+            return []
+        mtimes = {}
+        for name in names:
+            try:
+                mtimes[name] = os.path.getmtime(os.path.join(self.directory, name))
+            except OSError:
+                continue
+        return sorted(mtimes, key=mtimes.get, reverse=True)
+
+    def _prune(self) -> None:
+        for name in self._stored()[self.keep:]:
+            for suffix in (".json", ".folded"):
+                try:
+                    os.remove(self._path(name[:-len(".json")], suffix))
+                except OSError:
+                    pass
+
+
+def to_speedscope(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a stored profile (see ``JobProfiler.get``) to speedscope's JSON format."""
+    frames: List[Dict[str, str]] = []
+    index: Dict[str, int] = {}
+    samples, weights = [], []
+    interval = profile.get("interval") or DEFAULT_INTERVAL
+    for line in profile["folded"].splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        sample = []
+        for name in stack.split(";"):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            sample.append(index[name])
+        samples.append(sample)
+        weights.append(int(count) * interval)
+    name = f"{profile.get('namespace', '')} {profile.get('query', '')} ({profile['job_id']})".strip()
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "osint-job-profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+# Create a singleton instance for import
+profiler = JobProfiler.from_env()
@@ -0,0 +1,352 @@
+"""
+Per-upstream adaptive rate limiting and retry policies.
+
+``HostRateLimiter`` keeps a token bucket per upstream host and is consulted by
+``http_client`` before every request. Hosts start at the rate configured in
+``OSINT_RATE_LIMITS`` (``"crt.sh=1,api.blockcypher.com=3"``), or unlimited.
+Every response is fed back:
+
+- 429 (or 503 with ``Retry-After``) pauses the host until the advertised time
+  and halves its rate; an unlimited host first gets a rate learned from its
+  recent request rate
+- ``X-RateLimit-Remaining: 0`` / ``RateLimit-Remaining: 0`` pauses the host
+  until the matching ``*-Reset``
+- successes slowly raise the rate again, up to the configured ceiling
+
+At most ``OSINT_RATE_LIMIT_MAX_HOSTS`` buckets are kept; past that, the least
+recently used ones that aren't paused are dropped, and their hosts start over
+at the configured rate on their next request.
+
+``RetryPolicy`` describes how one endpoint is retried (attempts, which
+statuses and errors, backoff). Modules declare a policy per endpoint and pass
+it to ``http_client``; waits use jittered exponential backoff and never
+undercut a server's ``Retry-After``.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+import aiohttp
+from eventlet import patcher
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+logger = logging.getLogger(__name__)
+
+# Buckets are used on the asyncio loop thread and read by /api/status on the hub.
+_threading = patcher.original("threading")
+
+# Window over which an unlimited host's request rate is measured.
+_OBSERVE_WINDOW = 10.0
+# Requests needed in that window before a rate is learned from it.
+_MIN_OBSERVED = 5
+
+DEFAULT_MAX_HOSTS = 1000
+# Share of OSINT_RATE_LIMIT_MAX_HOSTS kept when buckets are dropped, so a
+# crawl over many hosts prunes once per batch instead of on every new host.
+_PRUNE_TARGET = 0.9
+
+# Documented provider limits, used unless OSINT_RATE_LIMITS overrides them.
+DEFAULT_HOST_RATES: Dict[str, float] = {
+    "api.blockcypher.com": 3.0,
+}
+
+
+def parse_rates(raw: Optional[str]) -> Dict[str, float]:
+    """Parse ``"crt.sh=1,api.blockcypher.com=3"`` into requests per second by host."""
+    rates: Dict[str, float] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        host, value = item.split("=", 1)
+        try:
+            rates[host.strip().lower()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit {item!r}")
+    return rates
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until a ``*-Reset`` header's reset (epoch seconds or a delta)."""
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # Values this large are Unix timestamps rather than deltas.
+    if reset > 1e9:
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+class TokenBucket:
+    """Token bucket whose rate adapts to throttling signals (AIMD)."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        ceiling: Optional[float] = None,
+        min_rate: float = 0.2,
+        increase: float = 0.02,
+    ):
+        """
+        Args:
+            rate: Requests per second, or None for unlimited until throttled
+            ceiling: Highest rate recovery may climb back to (None = unbounded)
+            min_rate: Lowest rate a host is throttled down to
+            increase: Fraction of the rate added back per successful response
+        """
+        self.rate = rate
+        self.ceiling = ceiling if ceiling is not None else rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.tokens = 1.0
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self.last_used = self._updated
+        self._recent: deque = deque()
+        self._lock = _threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            burst = max(self.rate, 1.0)
+            self.tokens = min(burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.last_used = now
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    self._refill(now)
+                    if self.rate is None or self.tokens >= 1:
+                        if self.rate is not None:
+                            self.tokens -= 1
+                        self._recent.append(now)
+                        while self._recent and self._recent[0] < now - _OBSERVE_WINDOW:
+                            self._recent.popleft()
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def throttle(self, pause: Optional[float]) -> None:
+        """Back off after the upstream signalled it is over its limit."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            if self.rate is None and len(self._recent) >= _MIN_OBSERVED:
+                self.rate = len(self._recent) / _OBSERVE_WINDOW
+            if self.rate is not None:
+                # With too little traffic to learn from, only the pause applies.
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+            if pause:
+                self.blocked_until = max(self.blocked_until, now + pause)
+
+    def pause(self, seconds: float) -> None:
+        """Hold requests for *seconds* without changing the rate."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def recover(self) -> None:
+        """Additive increase after a successful response."""
+        with self._lock:
+            if self.rate is None:
+                return
+            rate = self.rate + max(self.rate * self.increase, 0.01)
+            self.rate = min(rate, self.ceiling) if self.ceiling is not None else rate
+
+    def paused(self, now: float) -> bool:
+        return self.blocked_until > now
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 3) if self.rate is not None else None,
+            "paused_for": round(max(self.blocked_until - time.monotonic(), 0.0), 1),
+            "throttled": self.throttled,
+        }
+
+
+class HostRateLimiter:
+    """Token buckets keyed by upstream host."""
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        default_rate: Optional[float] = None,
+        max_hosts: int = DEFAULT_MAX_HOSTS,
+    ):
+        """
+        Args:
+            rates: Starting (and ceiling) rate per host, in requests per second
+            default_rate: Rate for hosts not listed, or None for unlimited
+            max_hosts: Most buckets kept before the least recently used are dropped
+        """
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.max_hosts = max(max_hosts, 1)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = _threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "HostRateLimiter":
+        default = float(os.environ.get("OSINT_RATE_LIMIT_DEFAULT", 0))
+        rates = dict(DEFAULT_HOST_RATES)
+        rates.update(parse_rates(os.environ.get("OSINT_RATE_LIMITS")))
+        return cls(
+            rates=rates,
+            default_rate=default if default > 0 else None,
+            max_hosts=int(os.environ.get("OSINT_RATE_LIMIT_MAX_HOSTS", DEFAULT_MAX_HOSTS)),
+        )
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    if len(self._buckets) >= self.max_hosts:
+                        self._prune()
+                    bucket = self._buckets[host] = TokenBucket(self.rates.get(host, self.default_rate))
+        return bucket
+
+    def _prune(self) -> None:
+        """Drop the least recently used buckets that aren't paused. Called with the lock held."""
+        now = time.monotonic()
+        keep = int(self.max_hosts * _PRUNE_TARGET)
+        idle = sorted(
+            (bucket.last_used, host) for host, bucket in self._buckets.items() if not bucket.paused(now)
+        )
+        for _, host in idle[: max(len(self._buckets) - keep, 0)]:
+            del self._buckets[host]
+
+    async def acquire(self, host: str) -> None:
+        await self.bucket(host).acquire()
+
+    def observe(self, host: str, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Learn from a response.
+
+        Returns:
+            The ``Retry-After`` delay in seconds, if the response carried one
+        """
+        bucket = self.bucket(host)
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if status == 429 or (status == 503 and retry_after is not None):
+            bucket.throttle(retry_after)
+            rate = f"{bucket.rate:.2f} req/s" if bucket.rate is not None else "unlimited"
+            logger.warning(f"Upstream {host} is rate limiting (HTTP {status}); pausing {retry_after or 0:.1f}s, rate {rate}")
+            return retry_after
+
+        remaining = headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining"))
+        if remaining is not None and remaining.strip() in ("0", "0.0"):
+            reset = _parse_reset(headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset")))
+            if reset:
+                bucket.pause(reset)
+        elif status < 400:
+            bucket.recover()
+        return retry_after
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            host: bucket.as_dict()
+            for host, bucket in list(self._buckets.items())
+            if bucket.rate is not None or bucket.throttled
+        }
+
+
+# ---------------------------------------------------------------------------
+# Retry policies
+# ---------------------------------------------------------------------------
+class RetryableStatus(Exception):
+    """Raised inside a retry loop for a response whose status should be retried."""
+
+    def __init__(self, response: Any, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {response.status} for {response.url}")
+        self.response = response
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """How requests to one endpoint are retried."""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base: float = 0.5,
+        max_delay: float = 30.0,
+        statuses: FrozenSet[int] = frozenset({429, 502, 503, 504}),
+        retry_errors: bool = True,
+        retry_timeouts: bool = True,
+    ):
+        """
+        Args:
+            attempts: Total tries, including the first
+            base: Backoff multiplier in seconds (waits grow as base * 2^n, jittered)
+            max_delay: Cap on a single wait
+            statuses: Response statuses that are retried
+            retry_errors: Retry connection-level errors
+            retry_timeouts: Retry timeouts (off for slow endpoints where a
+                retry would only multiply the wait)
+        """
+        self.attempts = attempts
+        self.base = base
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+        self.retry_errors = retry_errors
+        self.retry_timeouts = retry_timeouts
+        self._backoff = wait_random_exponential(multiplier=base, max=max_delay)
+
+    def _should_retry(self, exc: BaseException) -> bool:
+        if isinstance(exc, RetryableStatus):
+            # Don't hold a search for longer than we would ever back off.
+            return exc.retry_after is None or exc.retry_after <= self.max_delay
+        if isinstance(exc, asyncio.TimeoutError):
+            return self.retry_timeouts
+        return self.retry_errors and isinstance(exc, aiohttp.ClientError)
+
+    def _wait(self, retry_state) -> float:
+        delay = self._backoff(retry_state)
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, RetryableStatus) and exc.retry_after is not None:
+            delay = max(delay, exc.retry_after)
+        return delay
+
+    def retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.attempts),
+            wait=self._wait,
+            retry=retry_if_exception(self._should_retry),
+            reraise=True,
+        )
+
+
+# Single attempt: the default for requests that don't declare a policy.
+NO_RETRY = RetryPolicy(attempts=1)
+
+# Reasonable policy for idempotent JSON APIs.
+DEFAULT_RETRY = RetryPolicy(attempts=3, base=0.5, max_delay=10.0)
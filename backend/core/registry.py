@@ -0,0 +1,179 @@
+"""
+Registry of search modules, loaded lazily.
+
+Each module package ships a small ``plugin.py`` that declares the Socket.IO
+searches it serves: namespace, event, validator and an importable target
+(``"package.module:attr"`` or ``"package.module:attr.method"``, the same form
+job workers use). ``discover`` imports only those declarations, so startup
+never pays for asyncpraw, bs4, dnspython, python-whois and the like; a
+module's code is imported by ``resolve`` on the first search that needs it.
+
+``warm_up`` resolves every target ahead of time. The app runs it in a
+background task once it is serving (disable with ``OSINT_WARM_UP=0``), so
+cold containers accept connections immediately and the first searches rarely
+wait on an import.
+"""
+
+import importlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core import entities, validators
+
+logger = logging.getLogger(__name__)
+
+# Top-level packages searched for ``<package>.<name>.plugin`` declarations.
+PLUGIN_PACKAGES = ("domain", "network", "social_networks", "username")
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """One Socket.IO search event and what serves it.
+
+    Modules give a ``target`` that is imported on first use; searches composed
+    in the app itself give a ready ``runner`` instead. ``consumes`` and
+    ``produces`` place the search in investigation pipelines (see
+    ``core/entities.py``).
+    """
+
+    namespace: str
+    event: str
+    validator: Optional[Callable] = None
+    target: Optional[str] = None
+    runner: Optional[Callable] = None
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    consumes: Optional[str] = None
+    produces: Tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        """``"dns"``, or ``"mastodon:searchUsername"`` for a namespace's other searches."""
+        return self.namespace if self.event == "search" else f"{self.namespace}:{self.event}"
+
+
+def resolve_target(target: str) -> Any:
+    """Import ``"package.module:attr.path"`` and return the attribute."""
+    module_name, _, path = target.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for part in path.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class ModuleRegistry:
+    """Search declarations, and their lazily imported targets."""
+
+    def __init__(self):
+        self._specs: Dict[Tuple[str, str], SearchSpec] = {}
+        self._resolved: Dict[str, Any] = {}
+        self._import_seconds: Dict[str, float] = {}
+        self._discovered = False
+
+    def register(
+        self,
+        namespace: str,
+        event: str,
+        validator: Optional[Callable] = None,
+        target: Optional[str] = None,
+        runner: Optional[Callable] = None,
+        consumes: Optional[str] = None,
+        produces: Tuple[str, ...] = (),
+        **kwargs: Any,
+    ) -> SearchSpec:
+        """
+        Declare a search.
+
+        Args:
+            namespace: Namespace key in socket_events.json (e.g. ``"whois"``)
+            event: Event key within that namespace (e.g. ``"search"``)
+            validator: Input validator, or None to accept any input
+            target: Importable module entry point, called as
+                ``target(query, socketio, namespace, **kwargs)``
+            runner: App-level runner, for searches not backed by one module
+            consumes: Entity type the search takes in investigations (e.g.
+                ``"domain"``), or None to leave it out of them
+            produces: Entity types the module's ``entities`` finds in its results
+            kwargs: Extra keyword arguments passed to the target
+
+        Returns:
+            The registered spec
+        """
+        if (target is None) == (runner is None):
+            raise ValueError(f"{namespace}:{event} needs exactly one of target or runner")
+        unknown = {consumes, *produces} - {None, *entities.ENTITY_TYPES}
+        if unknown:
+            raise ValueError(f"{namespace}:{event} declares unknown entity types: {sorted(unknown)}")
+        spec = SearchSpec(namespace, event, validator, target, runner, dict(kwargs), consumes, tuple(produces))
+        previous = self._specs.get((namespace, event))
+        if previous is not None and previous != spec:
+            logger.warning(f"Search {namespace}:{event} registered twice; keeping the latest")
+        self._specs[(namespace, event)] = spec
+        return spec
+
+    def specs(self) -> List[SearchSpec]:
+        return list(self._specs.values())
+
+    def get(self, namespace: str, event: str) -> Optional[SearchSpec]:
+        """The search declared for (namespace, event), e.g. ``("whois", "search")``."""
+        return self._specs.get((namespace, event))
+
+    def consumers(self, entity_type: str) -> List[SearchSpec]:
+        """Module searches that take *entity_type* in investigations."""
+        return [spec for spec in self._specs.values() if spec.consumes == entity_type and spec.target]
+
+    def discover(self, packages: Tuple[str, ...] = PLUGIN_PACKAGES) -> None:
+        """Import every ``<package>.<name>.plugin`` declaration (idempotent)."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for package in packages:
+            # Module folders are namespace packages, which pkgutil doesn't list.
+            for directory in importlib.import_module(package).__path__:
+                for name in sorted(os.listdir(directory)):
+                    if os.path.isfile(os.path.join(directory, name, "plugin.py")):
+                        importlib.import_module(f"{package}.{name}.plugin")
+
+    def resolve(self, target: str) -> Any:
+        """Return the object behind *target*, importing its module on first use."""
+        obj = self._resolved.get(target)
+        if obj is None:
+            started = time.monotonic()
+            obj = self._resolved[target] = resolve_target(target)
+            self._import_seconds[target] = time.monotonic() - started
+            logger.info(f"Loaded {target} in {self._import_seconds[target] * 1000:.0f} ms")
+        return obj
+
+    def warm_up(self, pause: Optional[Callable[[], None]] = None) -> None:
+        """
+        Import every registered target and preload validator data.
+
+        Args:
+            pause: Called between imports, e.g. to yield to the event loop
+        """
+        started = time.monotonic()
+        steps: List[Callable[[], Any]] = [validators.warm_up]
+        steps.extend(lambda t=spec.target: self.resolve(t) for spec in self.specs() if spec.target)
+        for step in steps:
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"Warm-up step failed: {e}")
+            if pause is not None:
+                pause()
+        logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        targets = sorted({spec.target for spec in self._specs.values() if spec.target})
+        return {
+            "searches": len(self._specs),
+            "loaded": [t for t in targets if t in self._resolved],
+            "pending": [t for t in targets if t not in self._resolved],
+            "import_ms": {t: round(s * 1000) for t, s in self._import_seconds.items()},
+        }
+
+
+# Create a singleton instance for import
+registry = ModuleRegistry()
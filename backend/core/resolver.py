@@ -0,0 +1,245 @@
+"""
+Cached DNS resolution shared by the SSRF validators and the HTTP client.
+
+``is_valid_domain`` and ``is_valid_url`` resolve the host to check that it is
+public, and the module then connects to it. Both go through ``dns_cache``,
+so a host is resolved once per TTL rather than once per check and once per
+connection. Answers are cached for their DNS TTL, clamped to
+``OSINT_DNS_MIN_TTL``/``OSINT_DNS_MAX_TTL`` (30 s/300 s), and failures for
+``OSINT_DNS_NEGATIVE_TTL`` (30 s).
+
+A validator that accepts a host pins the addresses it checked for
+``OSINT_DNS_PIN_SECONDS`` (300 s). Until the pin runs out, the HTTP client
+connects to those addresses and no others, even if the record changes or
+its TTL is 0. A name that resolves to a public address for the check and to
+an internal one for the connection (DNS rebinding) can't get past the
+validator that way.
+
+Lookups use dnspython, which gives TTLs, and fall back to ``getaddrinfo`` for
+names only the system knows (``/etc/hosts``), which are cached for the minimum
+TTL. Under eventlet the sockets are green, so a lookup on the hub yields to
+other greenlets. ``resolve_async`` answers cached hosts on the asyncio loop
+directly and sends misses to a thread.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from eventlet import patcher
+
+logger = logging.getLogger(__name__)
+
+# Entries are read and written from the hub and the asyncio loop thread alike.
+_threading = patcher.original("threading")
+
+DEFAULT_MIN_TTL = 30
+DEFAULT_MAX_TTL = 300
+DEFAULT_NEGATIVE_TTL = 30
+DEFAULT_PIN_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TIMEOUT = 5.0
+
+
+class ResolutionError(OSError):
+    """The host has no addresses, or couldn't be resolved in time."""
+
+
+@dataclass
+class _Entry:
+    addresses: Tuple[str, ...]
+    expires: float
+    pinned_until: float = 0.0
+    error: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def _dns():
+    """dnspython, imported on first lookup to keep startup fast."""
+    import dns.exception
+    import dns.resolver
+
+    return dns
+
+
+class DnsCache:
+    """Resolved addresses by host name, kept for their TTL or while pinned."""
+
+    def __init__(
+        self,
+        min_ttl: int = DEFAULT_MIN_TTL,
+        max_ttl: int = DEFAULT_MAX_TTL,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+        pin_seconds: int = DEFAULT_PIN_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """
+        Args:
+            min_ttl: Seconds an answer is kept at least, whatever its TTL
+            max_ttl: Seconds an answer is kept at most
+            negative_ttl: Seconds a failed lookup is remembered
+            pin_seconds: Seconds the addresses a validator checked are kept
+            max_entries: Hosts kept; the least recently used are dropped
+            timeout: Seconds a lookup may take
+        """
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.pin_seconds = pin_seconds
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = _threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._failures = 0
+
+    @classmethod
+    def from_env(cls) -> "DnsCache":
+        return cls(
+            min_ttl=int(os.environ.get("OSINT_DNS_MIN_TTL", DEFAULT_MIN_TTL)),
+            # OSINT_HTTP_DNS_TTL capped the HTTP client's own DNS cache before this one.
+            max_ttl=int(os.environ.get("OSINT_DNS_MAX_TTL", os.environ.get("OSINT_HTTP_DNS_TTL", DEFAULT_MAX_TTL))),
+            negative_ttl=int(os.environ.get("OSINT_DNS_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+            pin_seconds=int(os.environ.get("OSINT_DNS_PIN_SECONDS", DEFAULT_PIN_SECONDS)),
+            max_entries=int(os.environ.get("OSINT_DNS_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+            timeout=float(os.environ.get("OSINT_DNS_TIMEOUT", DEFAULT_TIMEOUT)),
+        )
+
+    def resolve(self, host: str) -> Tuple[str, ...]:
+        """
+        The addresses of *host*, from the cache or a fresh lookup.
+
+        Args:
+            host: A host name (IP literals are returned as they are)
+
+        Returns:
+            The IPv4 and IPv6 addresses, pinned ones if a pin is live
+
+        Raises:
+            ResolutionError: If the name doesn't resolve (also when cached)
+        """
+        host = host.lower().rstrip(".")
+        entry = self._cached(host)
+        if entry is None:
+            entry = self._lookup(host)
+        if entry.error is not None:
+            raise ResolutionError(entry.error)
+        return entry.addresses
+
+    async def resolve_async(self, host: str) -> Tuple[str, ...]:
+        """``resolve`` for the asyncio loop: cached hosts are answered without leaving it."""
+        entry = self._cached(host.lower().rstrip("."))
+        if entry is None:
+            return await asyncio.to_thread(self.resolve, host)
+        if entry.error is not None:
+            raise ResolutionError(entry.error)
+        return entry.addresses
+
+    def pin(self, host: str, addresses: Tuple[str, ...]) -> None:
+        """Keep *host* on the *addresses* a validator checked for ``pin_seconds``."""
+        host = host.lower().rstrip(".")
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry.addresses != addresses:
+                entry = self._entries[host] = _Entry(addresses, now + self.min_ttl)
+            entry.pinned_until = now + self.pin_seconds
+            entry.expires = max(entry.expires, entry.pinned_until)
+            self._entries.move_to_end(host)
+
+    def pinned(self, host: str) -> Optional[Tuple[str, ...]]:
+        """The addresses *host* is pinned to, if a pin is live."""
+        with self._lock:
+            entry = self._entries.get(host.lower().rstrip("."))
+        if entry is not None and entry.pinned_until > time.monotonic():
+            return entry.addresses
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "hosts": len(entries),
+            "pinned": sum(1 for entry in entries if entry.pinned_until > now),
+            "hits": self._hits,
+            "misses": self._misses,
+            "failures": self._failures,
+        }
+
+    def _cached(self, host: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry.expires <= time.monotonic():
+                return None
+            self._entries.move_to_end(host)
+            self._hits += 1
+            return entry
+
+    def _lookup(self, host: str) -> _Entry:
+        self._misses += 1
+        try:
+            addresses, ttl = self._query(host)
+            entry = _Entry(addresses, time.monotonic() + max(self.min_ttl, min(ttl, self.max_ttl)))
+        except ResolutionError as exc:
+            self._failures += 1
+            entry = _Entry((), time.monotonic() + self.negative_ttl, error=str(exc))
+        with self._lock:
+            previous = self._entries.get(host)
+            if previous is not None and previous.pinned_until > time.monotonic():
+                # Pinned while this lookup ran: the pin wins.
+                return previous
+            self._entries[host] = entry
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _query(self, host: str) -> Tuple[Tuple[str, ...], float]:
+        """The addresses of *host* and the seconds they may be cached."""
+        try:
+            socket.inet_pton(socket.AF_INET6 if ":" in host else socket.AF_INET, host)
+            return (host,), self.max_ttl
+        except OSError:
+            pass
+
+        dns = _dns()
+        addresses, ttl = [], float(self.max_ttl)
+        try:
+            for rdtype in ("A", "AAAA"):
+                try:
+                    answer = dns.resolver.resolve(host, rdtype, lifetime=self.timeout, search=False)
+                except dns.resolver.NoAnswer:
+                    continue
+                addresses.extend(rdata.to_text() for rdata in answer)
+                ttl = min(ttl, answer.rrset.ttl)
+        except dns.exception.DNSException as exc:
+            logger.debug(f"DNS lookup of {host} failed ({exc!r}); trying the system resolver")
+        if addresses:
+            return tuple(dict.fromkeys(addresses)), ttl
+
+        # Names only the system resolver knows, e.g. from /etc/hosts.
+        try:
+            infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+        except (socket.gaierror, UnicodeError) as exc:
+            raise ResolutionError(f"Host could not be resolved: {host}") from exc
+        addresses = [info[4][0] for info in infos]
+        if not addresses:
+            raise ResolutionError(f"Host could not be resolved: {host}")
+        return tuple(dict.fromkeys(addresses)), self.min_ttl
+
+
+# Create a singleton instance for import
+dns_cache = DnsCache.from_env()
@@ -0,0 +1,261 @@
+"""
+Result cache shared by all OSINT modules.
+
+``OsintModule.run`` looks a search up here before calling ``search``. Entries
+are keyed by (module, normalized query, options) and hold every event the
+search emitted to its client plus its return value; a hit replays those
+events through the caller's socketio, so clients see exactly what a live
+search would have sent.
+
+Each module opts in with a ``cache_ttl`` (seconds, 0 = never cached), which
+``OSINT_CACHE_TTLS`` can override per module (``"dns=60,whois=0"``). The cache
+is bounded by ``OSINT_CACHE_SIZE`` entries and evicts least recently used
+entries first. Only searches that completed without an error are stored.
+
+The memory tier lives in process memory: with job workers enabled each
+worker process has its own. Modules whose searches are expensive also set a
+``disk_cache_ttl`` (overridable via ``OSINT_DISK_CACHE_TTLS``); their results
+are additionally written to the persistent ``DiskCache`` when one is
+configured, and a memory miss falls back to it.
+"""
+
+import copy
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TLRUCache
+from eventlet import patcher
+
+from core import socket_events as se
+from core.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Looked up on the asyncio loop thread, read by /api/status and /metrics on the hub.
+_threading = patcher.original("threading")
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Per-call kwargs that never affect a module's result.
+_NON_OPTION_KWARGS = {"cancel_event", "room"}
+
+_PROGRESS_EVENT = se.SERVER_EVENTS["progress"]
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+def parse_ttls(raw: Optional[str]) -> Dict[str, int]:
+    """Parse ``"dns=60,whois=0"`` into ``{"dns": 60, "whois": 0}``."""
+    ttls: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            ttls[name.strip()] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid cache TTL {item!r}")
+    return ttls
+
+
+class _CacheEntry:
+    __slots__ = ("events", "result", "ttl")
+
+    def __init__(self, events: List[Tuple[str, Any]], result: Any, ttl: int):
+        self.events = events
+        self.result = result
+        self.ttl = ttl
+
+
+class _RecordingEmitter:
+    """Wraps a socketio-like emitter and records what is sent to one room."""
+
+    def __init__(self, socketio, room: Optional[str]):
+        self._socketio = socketio
+        self._room = room
+        self.events: List[Tuple[str, Any]] = []
+        self.failed = False
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        self._socketio.emit(event, *args, **kwargs)
+        # Progress is superseded by the result itself; not worth replaying.
+        if kwargs.get("room") != self._room or event == _PROGRESS_EVENT:
+            return
+        data = args[0] if args else kwargs.get("data")
+        if isinstance(data, dict) and data.get("error"):
+            self.failed = True
+        self.events.append((event, copy.deepcopy(data)))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._socketio, name)
+
+
+class ResultCache:
+    """TTL + LRU cache of module search results."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl_overrides: Optional[Dict[str, int]] = None,
+        disk: Optional[DiskCache] = None,
+        disk_ttl_overrides: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of cached searches (0 disables the memory tier)
+            ttl_overrides: Per-module TTLs replacing the modules' ``cache_ttl``
+            disk: Optional persistent tier
+            disk_ttl_overrides: Per-module TTLs replacing ``disk_cache_ttl``
+        """
+        self.maxsize = maxsize
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.disk = disk
+        self.disk_ttl_overrides = dict(disk_ttl_overrides or {})
+        self._cache = TLRUCache(maxsize=max(maxsize, 1), ttu=lambda _key, entry, now: now + entry.ttl, timer=time.monotonic)
+        self._lock = _threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+        self._bypassed = 0
+        self._disk_hits = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            maxsize=int(os.environ.get("OSINT_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+            ttl_overrides=parse_ttls(os.environ.get("OSINT_CACHE_TTLS")),
+            disk=DiskCache.from_env(),
+            disk_ttl_overrides=parse_ttls(os.environ.get("OSINT_DISK_CACHE_TTLS")),
+        )
+
+    def ttl_for(self, module) -> int:
+        if self.maxsize <= 0:
+            return 0
+        return self.ttl_overrides.get(module.module_name, getattr(module, "cache_ttl", 0))
+
+    def disk_ttl_for(self, module) -> int:
+        if self.disk is None:
+            return 0
+        return self.disk_ttl_overrides.get(module.module_name, getattr(module, "disk_cache_ttl", 0))
+
+    @staticmethod
+    def make_key(module, query: Any, kwargs: Dict[str, Any]) -> CacheKey:
+        options = tuple(sorted(
+            (name, repr(value)) for name, value in kwargs.items() if name not in _NON_OPTION_KWARGS
+        ))
+        return module.module_name, module.normalize_query(query), options
+
+    async def run(self, module, query: Any, socketio, namespace: str, use_cache: bool = True, **kwargs: Any) -> Any:
+        """
+        Serve ``module.search`` from the cache, or run it and cache the outcome.
+
+        Args:
+            module: The OsintModule to search with
+            query: The search term
+            socketio: Emitter the search (or the replay) sends events through
+            namespace: The SocketIO namespace
+            use_cache: False skips the lookup (the fresh result is still stored)
+            kwargs: Passed through to ``search``
+
+        Returns:
+            The (possibly cached) return value of ``search``
+        """
+        ttl = self.ttl_for(module)
+        disk_ttl = self.disk_ttl_for(module)
+        if ttl <= 0 and disk_ttl <= 0:
+            return await module.search(query, socketio, namespace, **kwargs)
+
+        key = self.make_key(module, query, kwargs)
+        room = kwargs.get("room")
+        if use_cache:
+            entry = await self._lookup(key, ttl, disk_ttl)
+            if entry is not None:
+                self._hits[module.module_name] += 1
+                module.logger.info(f"Serving {module.module_name} search from cache")
+                for event, data in entry.events:
+                    socketio.emit(event, copy.deepcopy(data), namespace=namespace, room=room)
+                return copy.deepcopy(entry.result)
+            self._misses[module.module_name] += 1
+        else:
+            self._bypassed += 1
+
+        recorder = _RecordingEmitter(socketio, room)
+        result = await module.search(query, recorder, namespace, **kwargs)
+        if self._cacheable(result, recorder, kwargs.get("cancel_event")):
+            entry = _CacheEntry(recorder.events, copy.deepcopy(result), ttl)
+            if ttl > 0:
+                with self._lock:
+                    self._cache[key] = entry
+            if disk_ttl > 0:
+                self.disk.set(
+                    self._disk_key(key),
+                    {"events": entry.events, "result": entry.result},
+                    disk_ttl,
+                    module=module.module_name,
+                )
+        return result
+
+    async def _lookup(self, key: CacheKey, ttl: int, disk_ttl: int) -> Optional[_CacheEntry]:
+        if ttl > 0:
+            with self._lock:
+                entry = self._cache.get(key)
+            if entry is not None:
+                return entry
+        if disk_ttl <= 0:
+            return None
+        found = await self.disk.get(self._disk_key(key))
+        if found is None:
+            return None
+        value, seconds_left = found
+        self._disk_hits += 1
+        entry = _CacheEntry([tuple(event) for event in value["events"]], value["result"], 0)
+        if ttl > 0:
+            # Promote to memory, but never past the disk entry's own expiry.
+            entry.ttl = min(ttl, seconds_left)
+            with self._lock:
+                self._cache[key] = entry
+        return entry
+
+    @staticmethod
+    def _disk_key(key: CacheKey) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    @staticmethod
+    def _cacheable(result: Any, recorder: _RecordingEmitter, cancel_event) -> bool:
+        if recorder.failed or (cancel_event is not None and cancel_event.is_set()):
+            return False
+        if isinstance(result, dict) and (result.get("error") or result.get("cancelled")):
+            return False
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(self._hits.values())
+        misses = sum(self._misses.values())
+        with self._lock:
+            self._cache.expire()
+            size = len(self._cache)
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "bypassed": self._bypassed,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "disk_hits": self._disk_hits,
+            "disk": self.disk.stats() if self.disk is not None else None,
+            "modules": {
+                name: {"hits": self._hits.get(name, 0), "misses": self._misses.get(name, 0)}
+                for name in sorted(set(self._hits) | set(self._misses))
+            },
+        }
+
+
+# Create a singleton instance for import
+result_cache = ResultCache.from_env()
@@ -0,0 +1,253 @@
+"""
+Central job scheduler with per-namespace quotas and priority lanes.
+
+Every search goes through ``JobScheduler.submit`` instead of straight to a
+background task. A job starts immediately when both the global cap and its
+namespace cap have room; otherwise it waits in a queue ordered by lane
+(interactive before bulk) and arrival. Waiting clients get a queue-position
+event whenever their position changes.
+
+The scheduler is only touched from the eventlet hub thread (handlers, and
+completion callbacks marshalled through the hub bridge), so it needs no lock.
+"""
+
+import itertools
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = 0
+LANE_BULK = 1
+
+DEFAULT_MAX_JOBS = 32
+
+# Fan-out jobs: hundreds of upstream requests or a subprocess per search.
+DEFAULT_BULK_NAMESPACES = {"/username", "/mastodon", "/dns", "/domain", "/github", "/google", "/investigate"}
+
+DEFAULT_NAMESPACE_LIMITS: Dict[str, int] = {
+    "/username": 2,
+    "/mastodon": 4,
+    "/github": 2,
+    "/google": 2,
+    # Each investigation runs several searches at once (OSINT_PIPELINE_CONCURRENCY).
+    "/investigate": 2,
+}
+
+
+def parse_limits(raw: Optional[str]) -> Dict[str, int]:
+    """Parse ``"username=2,mastodon=4"`` into ``{"/username": 2, "/mastodon": 4}``."""
+    limits: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        key, value = item.split("=", 1)
+        try:
+            limits[f"/{key.strip().lstrip('/')}"] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid job limit {item!r}")
+    return limits
+
+
+def parse_namespaces(raw: Optional[str]) -> set:
+    return {f"/{item.strip().lstrip('/')}" for item in (raw or "").split(",") if item.strip()}
+
+
+@dataclass
+class Job:
+    """A unit of work waiting for, or holding, a scheduler slot.
+
+    ``start`` is called with a ``done`` callback that the job must invoke
+    exactly once, on the hub, when it finishes. A job that leaves the queue
+    without starting (it was cancelled while waiting) gets ``on_drop``
+    instead, so whatever was set up for it can be closed.
+    """
+
+    namespace: str
+    room: str
+    start: Callable[[Callable[[], None]], None]
+    cancel_event: object = None
+    lane: int = LANE_INTERACTIVE
+    seq: int = 0
+    position: int = field(default=0, compare=False)
+    trace_id: Optional[str] = field(default=None, compare=False)
+    on_drop: Optional[Callable[[], None]] = field(default=None, compare=False)
+
+
+class JobScheduler:
+    """Admit jobs under a global cap and per-namespace caps."""
+
+    def __init__(
+        self,
+        notify: Callable[[Job, int, int], None],
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        namespace_limits: Optional[Dict[str, int]] = None,
+        bulk_namespaces: Optional[set] = None,
+    ):
+        """
+        Args:
+            notify: Called as ``notify(job, position, queued)`` when a waiting
+                job's queue position changes (position is 1-based)
+            max_jobs: Global cap on jobs in flight
+            namespace_limits: Per-namespace caps; namespaces not listed are
+                only bound by the global cap
+            bulk_namespaces: Namespaces scheduled in the bulk lane
+        """
+        self.notify = notify
+        self.max_jobs = max_jobs
+        self.namespace_limits = dict(DEFAULT_NAMESPACE_LIMITS if namespace_limits is None else namespace_limits)
+        self.bulk_namespaces = set(DEFAULT_BULK_NAMESPACES if bulk_namespaces is None else bulk_namespaces)
+        self._seq = itertools.count()
+        self._queue: List[Job] = []
+        self._running: Dict[str, int] = {}
+        self._in_flight = 0
+        self._dispatching = False
+        self._redispatch = False
+
+    @classmethod
+    def from_env(cls, notify: Callable[[Job, int, int], None]) -> "JobScheduler":
+        limits = dict(DEFAULT_NAMESPACE_LIMITS)
+        limits.update(parse_limits(os.environ.get("OSINT_JOB_LIMITS")))
+        bulk = os.environ.get("OSINT_BULK_NAMESPACES")
+        return cls(
+            notify,
+            max_jobs=int(os.environ.get("OSINT_MAX_JOBS", DEFAULT_MAX_JOBS)),
+            namespace_limits=limits,
+            bulk_namespaces=parse_namespaces(bulk) if bulk is not None else None,
+        )
+
+    # ----- introspection ----------------------------------------------------
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def lane_for(self, namespace: str) -> int:
+        return LANE_BULK if namespace in self.bulk_namespaces else LANE_INTERACTIVE
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "in_flight": self._in_flight,
+            "queued": len(self._queue),
+            "max_jobs": self.max_jobs,
+            "running": dict(self._running),
+        }
+
+    # ----- submission -------------------------------------------------------
+
+    def submit(self, job: Job) -> None:
+        job.lane = self.lane_for(job.namespace)
+        job.seq = next(self._seq)
+        if not self._queue and self._has_room(job.namespace):
+            self._start(job)
+            return
+        self._queue.append(job)
+        self._queue.sort(key=lambda j: (j.lane, j.seq))
+        self._dispatch()
+
+    def cancel(self, namespace: str, room: str) -> bool:
+        """Drop a queued job for (namespace, room). Returns True if one was removed."""
+        dropped = [j for j in self._queue if j.namespace == namespace and j.room == room]
+        if not dropped:
+            return False
+        self._queue = [j for j in self._queue if not (j.namespace == namespace and j.room == room)]
+        for job in dropped:
+            self._drop(job)
+        self._notify_positions()
+        return True
+
+    # ----- internals --------------------------------------------------------
+
+    def _has_room(self, namespace: str) -> bool:
+        if self._in_flight >= self.max_jobs:
+            return False
+        limit = self.namespace_limits.get(namespace)
+        return limit is None or self._running.get(namespace, 0) < limit
+
+    def _start(self, job: Job) -> None:
+        job.position = 0
+        self._in_flight += 1
+        self._running[job.namespace] = self._running.get(job.namespace, 0) + 1
+        released = False
+
+        def done() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._release(job)
+
+        try:
+            job.start(done)
+        except Exception as exc:
+            logger.exception(f"Failed to start job on {job.namespace}: {exc}")
+            done()
+            raise
+
+    def _release(self, job: Job) -> None:
+        self._in_flight -= 1
+        self._running[job.namespace] -= 1
+        if not self._running[job.namespace]:
+            del self._running[job.namespace]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # A job that finishes inside its own start() releases back into here.
+        # Rather than walk the queue again from within the outer pass, it
+        # asks that pass to make another round once it is done.
+        if self._dispatching:
+            self._redispatch = True
+            return
+        self._dispatching = True
+        try:
+            self._redispatch = True
+            while self._redispatch:
+                self._redispatch = False
+                self._dispatch_pass()
+        finally:
+            self._dispatching = False
+        self._notify_positions()
+
+    def _dispatch_pass(self) -> None:
+        for job in list(self._queue):
+            if self._in_flight >= self.max_jobs:
+                break
+            if job not in self._queue:
+                # Cancelled while an earlier job was starting.
+                continue
+            if job.cancel_event is not None and job.cancel_event.is_set():
+                self._queue.remove(job)
+                self._drop(job)
+                continue
+            if self._has_room(job.namespace):
+                self._queue.remove(job)
+                try:
+                    self._start(job)
+                except Exception:
+                    continue
+
+    @staticmethod
+    def _drop(job: Job) -> None:
+        if job.on_drop is None:
+            return
+        try:
+            job.on_drop()
+        except Exception as exc:
+            logger.exception(f"Error dropping job on {job.namespace}: {exc}")
+
+    def _notify_positions(self) -> None:
+        total = len(self._queue)
+        for position, job in enumerate(self._queue, start=1):
+            if job.position == position:
+                continue
+            job.position = position
+            try:
+                self.notify(job, position, total)
+            except Exception as exc:
+                logger.error(f"Error notifying queue position: {exc}")
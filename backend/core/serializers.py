@@ -0,0 +1,113 @@
+"""
+Serializers for Socket.IO payloads.
+
+python-socketio encodes every event with a module-level ``json``. ``FastJSON``
+is a drop-in replacement backed by ujson, falling back to the standard
+library for the values ujson rejects (integers beyond 64 bits, ...), so any
+payload that serialized before still does.
+
+``OSINT_SOCKET_SERIALIZER`` picks the wire format for the whole server:
+
+- ``json`` (default): text frames, encoded with ``FastJSON``
+- ``msgpack``: binary MessagePack frames. Smaller for large result lists, but
+  every client must then use ``socket.io-msgpack-parser``.
+
+The format can't differ per client: python-socketio encodes an event once and
+sends the same packet to every client in a room. Clients discover the format
+from ``GET /api/socket-config`` before connecting.
+
+Either way the server uses a packet class that counts the packets and bytes
+it encodes per event, for ``/metrics``.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict
+
+import ujson
+from socketio import msgpack_packet, packet
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+SERIALIZERS = ("json", "msgpack")
+
+# Parser a socket.io client needs for each wire format (None = built in).
+CLIENT_PARSERS = {
+    "json": None,
+    "msgpack": "socket.io-msgpack-parser",
+}
+
+
+class FastJSON:
+    """``json``-compatible namespace for python-socketio, backed by ujson."""
+
+    @staticmethod
+    def dumps(obj: Any, *args: Any, **kwargs: Any) -> str:
+        try:
+            # Compact, and non-ASCII is sent as UTF-8 rather than \\u escapes.
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        except (TypeError, OverflowError, ValueError):
+            return json.dumps(obj, *args, **kwargs)
+
+    @staticmethod
+    def loads(s: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return ujson.loads(s)
+        except ValueError:
+            return json.loads(s, *args, **kwargs)
+
+
+class _CountedPacket:
+    """Packet mixin reporting each encoded packet to ``core.metrics``."""
+
+    def encode(self):
+        encoded = super().encode()
+        if self.packet_type in (packet.EVENT, packet.BINARY_EVENT) and self.data:
+            event = str(self.data[0])
+        else:
+            event = packet.packet_names[self.packet_type].lower()
+        metrics.observe_packet(event, encoded)
+        return encoded
+
+
+class CountedPacket(_CountedPacket, packet.Packet):
+    pass
+
+
+class CountedMsgPackPacket(_CountedPacket, msgpack_packet.MsgPackPacket):
+    pass
+
+
+def serializer_from_env() -> str:
+    serializer = os.environ.get("OSINT_SOCKET_SERIALIZER", "json").strip().lower()
+    if serializer not in SERIALIZERS:
+        logger.warning(f"Unknown OSINT_SOCKET_SERIALIZER {serializer!r}; using json")
+        return "json"
+    return serializer
+
+
+def socketio_options(serializer: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for ``SocketIO`` selecting *serializer*.
+
+    Args:
+        serializer: One of ``SERIALIZERS``
+
+    Returns:
+        Options to pass to the ``SocketIO`` constructor
+    """
+    return {
+        "json": FastJSON,
+        "serializer": CountedMsgPackPacket if serializer == "msgpack" else CountedPacket,
+    }
+
+
+def client_config(serializer: str) -> Dict[str, Any]:
+    """What a client needs to know to talk to this server."""
+    return {
+        "serializer": serializer,
+        "parser": CLIENT_PARSERS[serializer],
+    }
@@ -0,0 +1,174 @@
+"""
+Per-client task registry.
+
+Tracks the cancel event of the running search for each (namespace, sid) so
+two clients on the same namespace don't cancel each other. Modules cooperate
+via the event we hand them.
+
+``LocalTaskRegistry`` keeps everything in process memory and is what a single
+worker uses. ``RedisTaskRegistry`` additionally records which worker owns each
+task in Redis and broadcasts cancels over pub/sub, so ``cancel_search_*`` and
+disconnects work no matter which worker receives them. A task is forgotten
+once it is cancelled or its job is done (``finish``).
+"""
+
+import json
+import logging
+import os
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+from core.base_module import CancelToken
+
+logger = logging.getLogger(__name__)
+
+TaskKey = Tuple[str, str]
+
+# One hash per client, namespace -> owning worker.
+_TASKS_PREFIX = "osint:tasks:"
+_CANCEL_CHANNEL = "osint:cancel"
+
+
+class LocalTaskRegistry:
+    """In-process registry of cancel events keyed by (namespace, sid)."""
+
+    def __init__(self, on_cancel: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            on_cancel: Called as ``on_cancel(namespace, sid)`` after a local
+                task was cancelled, e.g. to drop it from the scheduler queue
+        """
+        self.on_cancel = on_cancel
+        self._tasks: Dict[TaskKey, CancelToken] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def register(self, namespace: str, sid: str) -> CancelToken:
+        """Cancel any running task for (namespace, sid) and register a new one."""
+        self.cancel(namespace, sid)
+        event = CancelToken()
+        self._tasks[(namespace, sid)] = event
+        return event
+
+    def cancel(self, namespace: str, sid: str) -> bool:
+        return self._cancel_local(namespace, sid)
+
+    def finish(self, namespace: str, sid: str, event: Optional[CancelToken] = None) -> bool:
+        """
+        Forget the task for (namespace, sid) once its job is done.
+
+        Args:
+            namespace: The task's namespace
+            sid: The client that started it
+            event: Only forget the task if it is still this one, not a newer
+                search the client started since
+
+        Returns:
+            True if a task was forgotten
+        """
+        current = self._tasks.get((namespace, sid))
+        if current is None or (event is not None and current is not event):
+            return False
+        del self._tasks[(namespace, sid)]
+        return True
+
+    def clear_client(self, sid: str) -> None:
+        for namespace, key_sid in [k for k in self._tasks if k[1] == sid]:
+            self.cancel(namespace, key_sid)
+
+    def _cancel_local(self, namespace: str, sid: str) -> bool:
+        event = self._tasks.pop((namespace, sid), None)
+        if event is None:
+            return False
+        logger.info(f"Cancelling task for {namespace} sid={sid}")
+        event.set()
+        if self.on_cancel is not None:
+            self.on_cancel(namespace, sid)
+        return True
+
+
+class RedisTaskRegistry(LocalTaskRegistry):
+    """Task registry shared between workers through Redis.
+
+    Cancel events stay local to the worker running the job (they are handed
+    to module code), but ownership is recorded in a Redis hash per client and
+    cancels for tasks owned elsewhere are broadcast on a pub/sub channel.
+    """
+
+    def __init__(self, url: str, spawn: Callable, on_cancel: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            url: Redis URL, e.g. redis://redis:6379/0
+            spawn: Starts a background task, e.g. ``SocketIO.start_background_task``
+            on_cancel: See ``LocalTaskRegistry``
+        """
+        import redis
+
+        super().__init__(on_cancel=on_cancel)
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._redis = redis.Redis.from_url(url)
+        self._spawn = spawn
+        self._listening = False
+
+    def start(self) -> None:
+        """Start listening for cancels broadcast by other workers (idempotent)."""
+        if self._listening:
+            return
+        self._listening = True
+        self._spawn(self._listen)
+
+    def register(self, namespace: str, sid: str) -> CancelToken:
+        self.start()
+        event = super().register(namespace, sid)
+        self._redis.hset(self._key(sid), namespace, self.worker_id)
+        return event
+
+    def cancel(self, namespace: str, sid: str) -> bool:
+        if self._cancel_local(namespace, sid):
+            self._redis.hdel(self._key(sid), namespace)
+            return True
+        owner = self._redis.hget(self._key(sid), namespace)
+        if owner is None:
+            return False
+        self._redis.publish(_CANCEL_CHANNEL, json.dumps({"namespace": namespace, "sid": sid}))
+        return True
+
+    def finish(self, namespace: str, sid: str, event: Optional[CancelToken] = None) -> bool:
+        if not super().finish(namespace, sid, event):
+            return False
+        self._redis.hdel(self._key(sid), namespace)
+        return True
+
+    def clear_client(self, sid: str) -> None:
+        super().clear_client(sid)
+        for namespace in self._redis.hkeys(self._key(sid)):
+            self.cancel(namespace.decode(), sid)
+
+    @staticmethod
+    def _key(sid: str) -> str:
+        return f"{_TASKS_PREFIX}{sid}"
+
+    def _listen(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(_CANCEL_CHANNEL)
+        logger.info(f"Worker {self.worker_id} listening for shared cancels")
+        for message in pubsub.listen():
+            try:
+                payload = json.loads(message["data"])
+                namespace, sid = payload["namespace"], payload["sid"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if self._cancel_local(namespace, sid):
+                self._redis.hdel(self._key(sid), namespace)
+
+
+def create_task_registry(
+    message_queue: Optional[str],
+    spawn: Callable,
+    on_cancel: Optional[Callable[[str, str], None]] = None,
+) -> LocalTaskRegistry:
+    """Return a Redis-backed registry when a message queue is configured."""
+    if message_queue:
+        return RedisTaskRegistry(message_queue, spawn=spawn, on_cancel=on_cancel)
+    return LocalTaskRegistry(on_cancel=on_cancel)
@@ -0,0 +1,499 @@
+"""
+Lightweight per-job tracing.
+
+Every search job gets a trace: a root ``job`` span opened by the app when the
+search is requested, a ``queued`` span for its time in the scheduler, a span
+per module search (``OsintModule.run``), per upstream request
+(``http_client.request``) and per stage wherever a module opens one::
+
+    from core.tracing import span
+
+    with span("dmarc"):
+        dmarc = await asyncio.to_thread(self._query_dmarc, domain)
+
+The current span is carried in a context variable, so it follows the job onto
+the shared asyncio loop, into ``asyncio.to_thread`` and into job-worker
+processes (which send their spans back with the job's result). Outside a
+trace ``span`` does nothing, so modules can open spans unconditionally.
+
+Events emitted for a job carry its ``trace_id``. Finished traces are kept in
+a ring buffer of ``OSINT_TRACE_BUFFER`` entries, served by ``/api/traces``,
+and sent as OTLP/HTTP JSON to ``OSINT_TRACE_OTLP_ENDPOINT`` when that is set
+(e.g. ``http://localhost:4318/v1/traces``). ``OSINT_TRACING=0`` turns it off.
+
+Traces name what analysts searched for, so ``/api/traces`` is only served to
+holders of ``OSINT_ADMIN_TOKEN``. Secrets never reach a span: upstream paths
+and error messages go through ``redact``, which masks Telegram bot tokens and
+drops query strings.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from eventlet import patcher
+
+logger = logging.getLogger(__name__)
+
+# Spans are added from the hub and the asyncio loop thread alike.
+_threading = patcher.original("threading")
+
+DEFAULT_BUFFER_SIZE = 200
+SERVICE_NAME = "osint-toolkit"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+
+KIND_INTERNAL = "internal"
+KIND_CLIENT = "client"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("osint_span", default=None)
+
+
+# Telegram puts the bot token in the path: /bot<token>/getChat, /file/bot<token>/...
+_BOT_TOKEN = re.compile(r"/bot[^/?#\s]+")
+_URL_QUERY = re.compile(r"(https?://[^\s?#]*)[?#]\S*")
+
+
+def redact(text: str) -> str:
+    """*text* with bot tokens in URL paths masked and URL query strings dropped."""
+    return _BOT_TOKEN.sub("/bot***", _URL_QUERY.sub(r"\1", text))
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "trace", "span_id", "parent_id", "name", "kind", "attributes",
+        "start_ns", "end_ns", "status", "message",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_OK
+        self.message: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.message = redact(message) if message else message
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "message": self.message,
+            "attributes": dict(self.attributes),
+        }
+
+    @classmethod
+    def from_dict(cls, trace: "Trace", data: Dict[str, Any]) -> "Span":
+        span = cls(trace, data["name"], data["parent_id"], data["kind"], dict(data["attributes"]))
+        span.span_id = data["span_id"]
+        span.start_ns = data["start_ns"]
+        span.end_ns = data["end_ns"]
+        span.status = data["status"]
+        span.message = data["message"]
+        return span
+
+
+class Trace:
+    """The spans of one job."""
+
+    def __init__(
+        self,
+        name: str,
+        attributes: Dict[str, Any],
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            name: Name of the root span
+            attributes: Attributes of the root span
+            trace_id: Continue this trace (in a job worker) instead of starting one
+            parent_id: Span the root span hangs under, for a continued trace
+        """
+        self.trace_id = trace_id or _new_id(16)
+        self._lock = _threading.Lock()
+        self.spans: List[Span] = []
+        self.root = self.start_span(name, parent_id, KIND_INTERNAL, attributes)
+        self.finished = False
+
+    def start_span(self, name: str, parent_id: Optional[str], kind: str, attributes: Dict[str, Any]) -> Span:
+        span = Span(self, name, parent_id, kind, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def add_spans(self, spans: List[Dict[str, Any]]) -> None:
+        """Add spans recorded elsewhere (in a job worker) under this trace."""
+        with self._lock:
+            self.spans.extend(Span.from_dict(self, data) for data in spans)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "attributes": dict(self.root.attributes),
+            "start_ns": self.root.start_ns,
+            "duration_ms": self.root.duration_ms,
+            "status": self.root.status,
+            "spans": len(self.spans),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return dict(self.summary(), spans=[s.to_dict() for s in spans])
+
+
+# ---------------------------------------------------------------------------
+# Tracer
+# ---------------------------------------------------------------------------
+class Tracer:
+    """Starts traces, keeps the finished ones and hands them to exporters."""
+
+    def __init__(self, enabled: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Args:
+            enabled: False makes every trace and span a no-op
+            buffer_size: Finished traces kept for ``/api/traces``
+        """
+        self.enabled = enabled
+        self._finished: Deque[Trace] = deque(maxlen=max(buffer_size, 1))
+        self._live: Dict[str, Trace] = {}
+        self._exporters: List[Callable[[Trace], None]] = []
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(
+            enabled=os.environ.get("OSINT_TRACING", "1") != "0",
+            buffer_size=int(os.environ.get("OSINT_TRACE_BUFFER", DEFAULT_BUFFER_SIZE)),
+        )
+
+    def add_exporter(self, exporter: Callable[[Trace], None]) -> None:
+        """Call *exporter* with every trace the web process finishes."""
+        self._exporters.append(exporter)
+
+    def start_trace(self, name: str, **attributes: Any) -> Optional[Trace]:
+        """Start a trace (None when tracing is disabled). Finish it with ``finish``."""
+        if not self.enabled:
+            return None
+        trace = Trace(name, attributes)
+        self._live[trace.trace_id] = trace
+        return trace
+
+    def finish(self, trace: Optional[Trace], status: str = STATUS_OK, message: Optional[str] = None) -> None:
+        """End *trace*'s root span, keep the trace and export it (idempotent)."""
+        if trace is None or trace.finished:
+            return
+        trace.root.set_status(status, message)
+        trace.root.end()
+        trace.finished = True
+        self._live.pop(trace.trace_id, None)
+        self._finished.append(trace)
+        for exporter in self._exporters:
+            try:
+                exporter(trace)
+            except Exception as e:
+                logger.error(f"Trace exporter failed: {e}")
+
+    def add_remote_spans(self, trace_id: str, spans: List[Dict[str, Any]]) -> None:
+        trace = self._live.get(trace_id)
+        if trace is not None:
+            trace.add_spans(spans)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        trace = self._live.get(trace_id)
+        if trace is not None:
+            return trace
+        return next((t for t in self._finished if t.trace_id == trace_id), None)
+
+    def recent(
+        self,
+        limit: int = 50,
+        namespace: Optional[str] = None,
+        min_ms: float = 0,
+    ) -> List[Dict[str, Any]]:
+        """Summaries of finished traces, newest first."""
+        found = []
+        for trace in reversed(self._finished):
+            if namespace is not None and trace.root.attributes.get("namespace") != namespace:
+                continue
+            if (trace.root.duration_ms or 0) < min_ms:
+                continue
+            found.append(trace.summary())
+            if len(found) >= limit:
+                break
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "live": len(self._live),
+            "finished": len(self._finished),
+            "buffer_size": self._finished.maxlen,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Context helpers
+# ---------------------------------------------------------------------------
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.trace_id if span is not None else None
+
+
+def span_in(context: contextvars.Context) -> Optional[Span]:
+    """The current span of another context, e.g. an asyncio task's."""
+    return context.get(_current)
+
+
+def current_context() -> Optional[Tuple[str, str]]:
+    """``(trace_id, span_id)`` of the current span, to continue the trace elsewhere."""
+    span = _current.get()
+    return (span.trace_id, span.span_id) if span is not None else None
+
+
+@contextmanager
+def activate(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Make *span* the current span for the code inside the block."""
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _reset(token, None)
+
+
+@contextmanager
+def span(name: str, kind: str = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the block as a child of the current span.
+
+    Args:
+        name: Span name, e.g. the stage (``"dkim"``) or ``"GET crt.sh"``
+        kind: ``"internal"``, or ``"client"`` for calls to an upstream
+        attributes: Span attributes
+
+    Yields:
+        The span, or None outside a trace
+    """
+    parent = _current.get()
+    if parent is None or parent.trace.finished:
+        yield None
+        return
+    child = parent.trace.start_span(name, parent.span_id, kind, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except asyncio.CancelledError:
+        child.set_status(STATUS_CANCELLED)
+        raise
+    except Exception as e:
+        from core.base_module import SearchCancelled
+
+        if isinstance(e, SearchCancelled):
+            child.set_status(STATUS_CANCELLED)
+        else:
+            child.set_status(STATUS_ERROR, str(e))
+        raise
+    finally:
+        child.end()
+        _reset(token, parent)
+
+
+def _reset(token: contextvars.Token, fallback: Optional[Span]) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Exited in a different context than it was entered in (a greenthread
+        # switch); fall back to restoring the parent.
+        _current.set(fallback)
+
+
+def outcome_status(cancelled: bool, failed: bool) -> str:
+    if cancelled:
+        return STATUS_CANCELLED
+    return STATUS_ERROR if failed else STATUS_OK
+
+
+def stamp(payload: Any, trace_id: Optional[str] = None) -> Any:
+    """
+    Attach a trace id to an event payload.
+
+    Args:
+        payload: The event data; only dicts are stamped
+        trace_id: Trace to attach, defaulting to the current one
+
+    Returns:
+        A stamped copy of *payload*, or *payload* itself
+    """
+    trace_id = trace_id or current_trace_id()
+    if trace_id is None or not isinstance(payload, dict):
+        return payload
+    return dict(payload, trace_id=trace_id)
+
+
+@contextmanager
+def continue_trace(context: Optional[Tuple[str, str]], name: str, **attributes: Any) -> Iterator[Optional[Trace]]:
+    """
+    Record spans under a trace started in another process.
+
+    Used by job workers: the spans collected inside the block are read from
+    the yielded trace afterwards and sent back to the web process.
+
+    Args:
+        context: ``current_context()`` from the web process, or None
+        name: Name of the span covering the block
+        attributes: Its attributes
+    """
+    if context is None:
+        yield None
+        return
+    trace_id, parent_id = context
+    trace = Trace(name, attributes, trace_id=trace_id, parent_id=parent_id)
+    token = _current.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.end()
+        trace.finished = True
+        _reset(token, None)
+
+
+# ---------------------------------------------------------------------------
+# OTLP export
+# ---------------------------------------------------------------------------
+_OTLP_KINDS = {KIND_INTERNAL: 1, KIND_CLIENT: 3}
+_OTLP_STATUS = {STATUS_OK: 1, STATUS_ERROR: 2, STATUS_CANCELLED: 0}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(traces: List[Trace], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """Encode *traces* as an OTLP/HTTP JSON ``ExportTraceServiceRequest``."""
+    spans = []
+    for trace in traces:
+        for s in trace.to_dict()["spans"]:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": s["span_id"],
+                "name": s["name"],
+                "kind": _OTLP_KINDS.get(s["kind"], 1),
+                "startTimeUnixNano": str(s["start_ns"]),
+                "endTimeUnixNano": str(s["end_ns"] or s["start_ns"]),
+                "attributes": _otlp_attributes(dict(s["attributes"], **{"osint.status": s["status"]})),
+                "status": {"code": _OTLP_STATUS[s["status"]], "message": s["message"] or ""},
+            }
+            if s["parent_id"]:
+                otlp_span["parentSpanId"] = s["parent_id"]
+            spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": "osint.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class OtlpExporter:
+    """Posts finished traces to an OTLP/HTTP collector as JSON."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0, service_name: str = SERVICE_NAME):
+        """
+        Args:
+            endpoint: Collector URL, e.g. ``http://localhost:4318/v1/traces``
+            timeout: Seconds to wait for the collector
+            service_name: ``service.name`` resource attribute
+        """
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.service_name = service_name
+        self._exported = 0
+        self._failed = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["OtlpExporter"]:
+        endpoint = os.environ.get("OSINT_TRACE_OTLP_ENDPOINT", "").strip()
+        if not endpoint:
+            return None
+        return cls(endpoint, service_name=os.environ.get("OSINT_TRACE_SERVICE_NAME", SERVICE_NAME))
+
+    async def export(self, trace: Trace) -> None:
+        # The collector call itself must not be traced.
+        _current.set(None)
+        from core.http_client import REQUEST_ERRORS, http_client
+
+        try:
+            response = await http_client.post(
+                self.endpoint, json=to_otlp([trace], self.service_name), timeout=self.timeout,
+            )
+            response.raise_for_status()
+            self._exported += 1
+        except REQUEST_ERRORS as e:
+            self._failed += 1
+            logger.warning(f"Exporting trace {trace.trace_id} to {self.endpoint} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"endpoint": self.endpoint, "exported": self._exported, "failed": self._failed}
+
+
+# Create a singleton instance for import
+tracer = Tracer.from_env()
@@ -10,7 +10,7 @@ import logging
 import asyncio
 from typing import Dict, Any, List, Tuple, Optional
 import aiohttp
-from aiohttp import ClientSession, ClientTimeout
+from core.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -57,35 +57,21 @@ async def make_http_request(url: str, method: str = 'GET', headers: Dict = None,
     Returns:
         Tuple of (success, response_data)
     """
-    if headers is None:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    
-    client_timeout = ClientTimeout(total=timeout)
-    
+    if method.upper() not in ('GET', 'POST'):
+        return False, f"Unsupported HTTP method: {method}"
+
     try:
-        async with ClientSession(headers=headers, timeout=client_timeout) as session:
-            if method.upper() == 'GET':
-                async with session.get(url) as response:
-                    if not response.ok:
-                        return False, f"HTTP error: {response.status}"
-                    
-                    if json_response:
-                        return True, await response.json()
-                    return True, await response.text()
-                    
-            elif method.upper() == 'POST':
-                async with session.post(url, data=data) as response:
-                    if not response.ok:
-                        return False, f"HTTP error: {response.status}"
-                    
-                    if json_response:
-                        return True, await response.json()
-                    return True, await response.text()
-            else:
-                return False, f"Unsupported HTTP method: {method}"
-                
+        response = await http_client.request(
+            method.upper(), url, headers=headers,
+            data=data if method.upper() == 'POST' else None, timeout=timeout
+        )
+        if not response.ok:
+            return False, f"HTTP error: {response.status}"
+
+        if json_response:
+            return True, response.json()
+        return True, response.text()
+
     except aiohttp.ClientError as e:
         logger.error(f"HTTP request error: {str(e)}")
         return False, f"Request error: {str(e)}"
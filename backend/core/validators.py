@@ -5,24 +5,39 @@ Each validator returns (is_valid: bool, error_message: str).
 
 `is_valid_url` and `is_valid_domain` reject private/loopback/link-local hosts
 so modules that fetch the URL/domain server-side can't be coerced into SSRF.
+Host names are resolved through the shared DNS cache, and the addresses
+checked are pinned for the HTTP client's connections (see core/resolver.py).
 """
 
 import ipaddress
 import re
-import socket
+from functools import lru_cache
 from typing import Tuple
 from urllib.parse import urlparse
 
-import tldextract
+from core.resolver import ResolutionError, dns_cache
 
 _EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
 _PHONE_RE = re.compile(r"^\+?[1-9]\d{1,14}$")
 _HOSTNAME_LABEL_RE = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
 _ALLOWED_URL_SCHEMES = {"http", "https"}
 
-# Use a tldextract instance with the bundled snapshot so it works offline
-# in containers without reaching out to publicsuffix.org on first call.
-_tld = tldextract.TLDExtract(suffix_list_urls=())
+
+@lru_cache(maxsize=None)
+def _tld():
+    """The tldextract instance, imported on first use to keep startup fast.
+
+    Uses the bundled snapshot so it works offline in containers without
+    reaching out to publicsuffix.org on first call.
+    """
+    import tldextract
+
+    return tldextract.TLDExtract(suffix_list_urls=())
+
+
+def warm_up() -> None:
+    """Import tldextract and load its suffix list ahead of the first domain search."""
+    _tld().extract_str("example.com")
 
 
 def is_valid_email(email: str) -> Tuple[bool, str]:
@@ -46,7 +61,8 @@ def is_valid_username(username: str) -> Tuple[bool, str]:
 
 
 def _hostname_is_public(hostname: str) -> Tuple[bool, str]:
-    """Reject IPs and hostnames that resolve to private/loopback/link-local ranges."""
+    """Reject IPs and hostnames that resolve to private/loopback/link-local ranges,
+    and pin the addresses of the hostnames accepted."""
     try:
         ip = ipaddress.ip_address(hostname)
         if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
@@ -59,19 +75,20 @@ def _hostname_is_public(hostname: str) -> Tuple[bool, str]:
         return False, "Host resolves to a non-public address"
 
     try:
-        infos = socket.getaddrinfo(hostname, None)
-    except socket.gaierror:
+        addresses = dns_cache.resolve(hostname)
+    except ResolutionError:
         return False, "Host could not be resolved"
 
-    for info in infos:
-        addr = info[4][0]
+    for addr in addresses:
         try:
             ip = ipaddress.ip_address(addr)
         except ValueError:
-            continue
+            # Scoped IPv6 (fe80::1%eth0) and the like: link-local, and they'd be pinned unchecked.
+            return False, "Host resolves to a non-public address"
         if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
             return False, "Host resolves to a non-public address"
 
+    dns_cache.pin(hostname, addresses)
     return True, ""
 
 
@@ -79,7 +96,7 @@ def is_valid_domain(domain: str) -> Tuple[bool, str]:
     if not isinstance(domain, str) or not domain or len(domain) > 253:
         return False, "Invalid domain format"
 
-    extracted = _tld.extract_str(domain)
+    extracted = _tld().extract_str(domain)
     if not extracted.domain or not extracted.suffix:
         return False, "Invalid domain format"
 
@@ -138,7 +155,7 @@ def is_valid_url(url: str) -> Tuple[bool, str]:
     if not parsed.hostname:
         return False, "Invalid URL format"
 
-    # If host is an IP literal, validate it directly; otherwise resolve via getaddrinfo.
+    # If host is an IP literal, validate it directly; otherwise resolve it.
     ok, err = _hostname_is_public(parsed.hostname)
     if not ok:
         return False, err
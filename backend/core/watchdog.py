@@ -0,0 +1,213 @@
+"""
+Event loop stall watchdog.
+
+``LoopLag`` (``core.metrics``) wakes up on the eventlet hub and the asyncio
+loop every ``OSINT_LAG_INTERVAL`` seconds. The watchdog is a native thread
+that checks those wake-ups: when a loop is more than
+``OSINT_STALL_THRESHOLD`` seconds overdue, something is blocking it, and the
+watchdog captures that thread's stack while the call is still running. It
+logs the stack with the innermost backend frame (the blocking call) and the
+job it belongs to, read from the locals of the blocked frames: the
+``namespace``/``room``/``query`` arguments every search entry point has, and
+the span ``OsintModule.run`` holds. When the job is traced
+(``core.tracing``), the stall is also added to its trace as a span.
+
+Stalls are counted in ``osint_event_loop_stalls_total`` and their length in
+``osint_event_loop_stall_seconds``; the latest ones are listed in
+``/api/status``.
+"""
+
+import logging
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from eventlet import patcher
+
+from core import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+_threading = patcher.original("threading")
+_time = patcher.original("time")
+
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_POLL = 0.05
+DEFAULT_HISTORY = 20
+MAX_STACK_FRAMES = 30
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Frame locals that identify the search a blocked frame belongs to.
+_JOB_LOCALS = ("namespace", "room", "query")
+
+
+class _Stall:
+    __slots__ = ("loop", "tick", "started", "culprit", "job", "stack", "span")
+
+    def __init__(self, loop: str, tick: float, started: float):
+        self.loop = loop
+        self.tick = tick
+        self.started = started
+        self.culprit: Optional[str] = None
+        self.job: Dict[str, Any] = {}
+        self.stack: List[str] = []
+        self.span: Optional[tracing.Span] = None
+
+    def to_dict(self, ended: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "loop": self.loop,
+            "seconds": round((ended or time.monotonic()) - self.started, 3),
+            "culprit": self.culprit,
+            "job": self.job,
+            "stack": self.stack,
+        }
+
+
+class StallWatchdog:
+    """Native thread that names whatever blocks the hub or the asyncio loop."""
+
+    def __init__(
+        self,
+        lag: metrics.LoopLag,
+        threshold: float = DEFAULT_THRESHOLD,
+        poll: float = DEFAULT_POLL,
+        history: int = DEFAULT_HISTORY,
+    ):
+        """
+        Args:
+            lag: The loop-lag sampler whose wake-ups are watched
+            threshold: Seconds a loop may be overdue before it counts as
+                stalled (0 disables the watchdog)
+            poll: Seconds between checks
+            history: Finished stalls kept for ``stats()``
+        """
+        self.lag = lag
+        self.threshold = threshold
+        self.poll = poll
+        self._stalls: Dict[str, _Stall] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, lag: metrics.LoopLag) -> "StallWatchdog":
+        return cls(lag, threshold=float(os.environ.get("OSINT_STALL_THRESHOLD", DEFAULT_THRESHOLD)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0 and self.lag.interval > 0
+
+    def start(self) -> None:
+        """Start the watchdog thread (idempotent)."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = _threading.Thread(target=self._run, name="osint-stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "stalled": [stall.to_dict() for stall in list(self._stalls.values())],
+            "recent": list(self._recent),
+        }
+
+    # ----- internals --------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            _time.sleep(self.poll)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Stall watchdog check failed: {e}")
+
+    def check(self) -> None:
+        now = time.monotonic()
+        for loop, tick in list(self.lag.ticks.items()):
+            stall = self._stalls.get(loop)
+            if stall is not None and stall.tick != tick:
+                self._finish(stall, tick)
+                stall = None
+            overdue = now - tick - self.lag.interval
+            if stall is None and overdue > self.threshold:
+                self._begin(loop, tick, now - overdue)
+
+    def _begin(self, loop: str, tick: float, started: float) -> None:
+        stall = self._stalls[loop] = _Stall(loop, tick, started)
+        frame = sys._current_frames().get(self.lag.threads.get(loop))
+        if frame is not None:
+            stall.stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:]
+            stall.culprit = self._culprit(frame)
+            stall.job, trace_span = self._frame_job(frame)
+            if trace_span is not None and not trace_span.trace.finished:
+                stall.span = trace_span.trace.start_span(
+                    "stall", trace_span.span_id, tracing.KIND_INTERNAL, {"loop": loop, "culprit": stall.culprit},
+                )
+                stall.span.start_ns -= int((time.monotonic() - started) * 1e9)
+        logger.warning(
+            f"{loop} loop blocked for over {self.threshold:.2f}s in {stall.culprit or 'unknown code'}"
+            f"{self._describe(stall.job)}\n{''.join(stall.stack)}"
+        )
+
+    def _finish(self, stall: _Stall, tick: float) -> None:
+        del self._stalls[stall.loop]
+        # The loop woke up at *tick*: that is when the blocking call returned.
+        seconds = tick - stall.started
+        metrics.loop_stalls.labels(stall.loop).inc()
+        metrics.loop_stall_duration.labels(stall.loop).observe(seconds)
+        if stall.span is not None:
+            stall.span.set_attribute("seconds", round(seconds, 3))
+            stall.span.end_ns = stall.span.start_ns + int(seconds * 1e9)
+        self._recent.append(stall.to_dict(ended=tick))
+        logger.warning(
+            f"{stall.loop} loop was blocked for {seconds:.2f}s in {stall.culprit or 'unknown code'}"
+            f"{self._describe(stall.job)}"
+        )
+
+    @staticmethod
+    def _culprit(frame) -> Optional[str]:
+        """Innermost frame in backend code, with the call it was making."""
+        callee = None
+        while frame is not None:
+            path = frame.f_code.co_filename
+            if path.startswith(BACKEND_DIR) and os.path.abspath(path) != os.path.abspath(__file__):
+                where = f"{os.path.relpath(path, BACKEND_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+                return f"{where} -> {callee}" if callee else where
+            callee = f"{frame.f_code.co_name} ({os.path.basename(path)})"
+            frame = frame.f_back
+        return None
+
+    @staticmethod
+    def _frame_job(frame):
+        """Search arguments and innermost span found in the locals of *frame* and its callers."""
+        job: Dict[str, Any] = {}
+        trace_span = None
+        while frame is not None:
+            try:
+                local_vars = dict(frame.f_locals)
+            except Exception:
+                break
+            for name in _JOB_LOCALS:
+                value = local_vars.get(name)
+                if name not in job and isinstance(value, (str, int, float)):
+                    job[name] = value
+            if trace_span is None:
+                trace_span = next((v for v in local_vars.values() if isinstance(v, tracing.Span)), None)
+            frame = frame.f_back
+        if trace_span is not None:
+            job.update(trace_id=trace_span.trace_id, span=trace_span.name)
+            job.setdefault("namespace", trace_span.trace.root.attributes.get("namespace"))
+        return job, trace_span
+
+    @staticmethod
+    def _describe(job: Dict[str, Any]) -> str:
+        if not job:
+            return ""
+        return " (" + ", ".join(f"{key}={value}" for key, value in job.items() if value is not None) + ")"
+
+
+# Create a singleton instance for import
+watchdog = StallWatchdog.from_env(metrics.loop_lag_monitor)
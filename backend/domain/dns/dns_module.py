@@ -16,7 +16,9 @@ import dns.zone
 import dns.rdatatype
 import dns.name
 
+from core import entities
 from core.base_module import OsintModule
+from core.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -141,6 +143,8 @@ RECORD_TYPES: List[str] = [
 class DnsModule(OsintModule):
     """Module for deep DNS analysis of a domain."""
 
+    cache_ttl = 600
+
     def __init__(self):
         super().__init__("dns")
 
@@ -329,6 +333,15 @@ class DnsModule(OsintModule):
                 continue
         return results
 
+    # ----- investigation pivots ---------------------------------------------
+
+    def entities(self, result: Dict[str, Any]) -> List[entities.Entity]:
+        """The addresses in the A and AAAA records."""
+        data = self.result_data(result) or {}
+        records = data.get("records") or {}
+        found = (entities.make(entities.IP, value) for rtype in ("A", "AAAA") for value in records.get(rtype, []))
+        return [entity for entity in found if entity is not None]
+
     # ----- main search ------------------------------------------------------
 
     async def search(self, domain: str, socketio, namespace: str, **kwargs) -> Dict[str, Any]:
@@ -342,44 +355,50 @@ class DnsModule(OsintModule):
         try:
             # -- Stage 1: Standard records -----------------------------------
             self.emit_progress(socketio, namespace, 10, "Querying DNS records...", room=room)
-            records = await asyncio.to_thread(self._query_records, domain)
+            with span("records"):
+                records = await asyncio.to_thread(self._query_records, domain)
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
 
             # -- Stage 2: SPF parsing ----------------------------------------
             self.emit_progress(socketio, namespace, 30, "Analysing SPF record...", room=room)
-            spf = self._parse_spf(records.get("TXT", []))
+            with span("spf"):
+                spf = self._parse_spf(records.get("TXT", []))
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
 
             # -- Stage 3: DMARC ----------------------------------------------
             self.emit_progress(socketio, namespace, 45, "Querying DMARC record...", room=room)
-            dmarc = await asyncio.to_thread(self._query_dmarc, domain)
+            with span("dmarc"):
+                dmarc = await asyncio.to_thread(self._query_dmarc, domain)
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
 
             # -- Stage 4: DKIM probing ---------------------------------------
             self.emit_progress(socketio, namespace, 60, "Probing DKIM selectors...", room=room)
-            dkim = await asyncio.to_thread(self._probe_dkim, domain)
+            with span("dkim", selectors=len(DKIM_SELECTORS)):
+                dkim = await asyncio.to_thread(self._probe_dkim, domain)
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
 
             # -- Stage 5: TXT service detection ------------------------------
             self.emit_progress(socketio, namespace, 75, "Detecting services from TXT records...", room=room)
-            services = self._detect_services(records.get("TXT", []))
+            with span("txt_services"):
+                services = self._detect_services(records.get("TXT", []))
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
 
             # -- Stage 6: Zone transfer attempt ------------------------------
             self.emit_progress(socketio, namespace, 85, "Attempting zone transfer...", room=room)
-            zone_transfer = await asyncio.to_thread(
-                self._attempt_zone_transfer, domain, records.get("NS", [])
-            )
+            with span("zone_transfer", nameservers=len(records.get("NS", []))):
+                zone_transfer = await asyncio.to_thread(
+                    self._attempt_zone_transfer, domain, records.get("NS", [])
+                )
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
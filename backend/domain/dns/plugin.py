@@ -0,0 +1,13 @@
+"""Searches served by the DNS module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_domain
+
+registry.register(
+    "dns",
+    "search",
+    validator=is_valid_domain,
+    target="domain.dns.dns_module:dns_module.run",
+    consumes="domain",
+    produces=("ip",),
+)
@@ -1,14 +1,27 @@
-import requests
 import logging
-import asyncio
-from core.base_module import OsintModule
+from core import entities
+from core.base_module import OsintModule, SearchCancelled
+from core.http_client import REQUEST_ERRORS, http_client
+from core.rate_limit import RetryPolicy
+
+# crt.sh sheds load with 502/503; timeouts mean a huge result set, so don't repeat those.
+CRTSH_RETRY = RetryPolicy(attempts=3, base=2.0, max_delay=20.0, retry_timeouts=False)
+
 
 class CrtshModule(OsintModule):
     """Module for subdomain enumeration using crt.sh"""
+
+    cache_ttl = 3600
+    disk_cache_ttl = 86400
     
     def __init__(self):
         super().__init__("crtsh")
         self.api_url = 'https://crt.sh/?q={}&output=json'
+
+    def entities(self, result: dict) -> list:
+        """The certificate names, wildcards folded into their base name."""
+        found = (entities.make(entities.DOMAIN, name) for name in self.result_data(result) or [])
+        return [entity for entity in found if entity is not None]
     
     async def search(self, domain: str, socketio, namespace: str, **kwargs) -> dict:
         """
@@ -24,16 +37,15 @@ class CrtshModule(OsintModule):
         """
         self.logger.info(f"Starting crt.sh lookup for domain: {domain}")
         room = kwargs.get('room')
+        cancel_event = kwargs.get('cancel_event')
 
         try:
             self.logger.info("Contacting crt.sh API...")
             
             url = self.api_url.format(domain)
             
-            # Use asyncio.to_thread to run blocking code
-            response = await asyncio.to_thread(
-                lambda: requests.get(url, timeout=10)
-            )
+            # A cancel aborts the request and closes its connection
+            response = await self.cancellable(http_client.get(url, timeout=10, retry=CRTSH_RETRY), cancel_event)
             
             response.raise_for_status()
             
@@ -59,8 +71,11 @@ class CrtshModule(OsintModule):
             self.logger.info("crt.sh lookup completed")
             
             return result
-            
-        except requests.exceptions.RequestException as e:
+
+        except SearchCancelled:
+            self.logger.info("crt.sh lookup cancelled")
+            return {'cancelled': True}
+        except REQUEST_ERRORS as e:
             error_msg = f"Error in crt.sh lookup: {str(e)}"
             self.logger.error(error_msg)
             self.emit_error(socketio, namespace, error_msg, room=room)
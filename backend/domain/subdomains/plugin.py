@@ -0,0 +1,13 @@
+"""Searches served by the crt.sh subdomain module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_domain
+
+registry.register(
+    "subdomains",
+    "search",
+    validator=is_valid_domain,
+    target="domain.subdomains.crtsh_module:crtsh_module.run",
+    consumes="domain",
+    produces=("domain",),
+)
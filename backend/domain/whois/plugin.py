@@ -0,0 +1,13 @@
+"""Searches served by the WHOIS module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_domain
+
+registry.register(
+    "whois",
+    "search",
+    validator=is_valid_domain,
+    target="domain.whois.whois_module:whois_module.run",
+    consumes="domain",
+    produces=("email",),
+)
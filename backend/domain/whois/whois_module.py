@@ -3,13 +3,24 @@ import json
 from datetime import datetime
 import logging
 import asyncio
+from core import entities
 from core.base_module import OsintModule
 
 class WhoisModule(OsintModule):
     """Module for WHOIS domain lookups"""
+
+    cache_ttl = 3600
     
     def __init__(self):
         super().__init__("whois")
+
+    def entities(self, result: dict) -> list:
+        """The contact addresses in the record (python-whois gives one or a list)."""
+        emails = (self.result_data(result) or {}).get('emails') or []
+        if isinstance(emails, str):
+            emails = [emails]
+        found = (entities.make(entities.EMAIL, email) for email in emails)
+        return [entity for entity in found if entity is not None]
     
     async def search(self, domain: str, socketio, namespace: str, **kwargs) -> dict:
         """
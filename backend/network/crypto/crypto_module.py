@@ -1,14 +1,19 @@
 import re
-import requests
 import asyncio
 import logging
+import aiohttp
 from datetime import datetime, timezone
 from core.base_module import OsintModule
+from core.http_client import http_client
+from core.rate_limit import RetryPolicy
 
 BTC_LEGACY_RE = re.compile(r"^[13][a-km-zA-HJ-NP-Z1-9]{25,34}$")
 BTC_BECH32_RE = re.compile(r"^bc1[a-zA-HJ-NP-Z0-9]{25,62}$")
 ETH_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
 
+# BlockCypher answers bursts with 429 + Retry-After; wait and try again.
+BLOCKCYPHER_RETRY = RetryPolicy(attempts=3, base=1.0, max_delay=15.0)
+
 BLOCKCYPHER_BTC = "https://api.blockcypher.com/v1/btc/main"
 BLOCKCYPHER_ETH = "https://api.blockcypher.com/v1/eth/main"
 
@@ -23,9 +28,17 @@ def detect_address_type(address: str) -> str | None:
 
 class CryptoModule(OsintModule):
 
+    # Balances move, so keep lookups short-lived.
+    cache_ttl = 120
+
     def __init__(self):
         super().__init__("crypto")
 
+    def normalize_query(self, query) -> str:
+        # Base58 (legacy BTC) addresses are case-sensitive; hex ETH addresses are not.
+        address = str(query).strip()
+        return address.lower() if ETH_RE.match(address) else address
+
     def _parse_btc(self, address: str, data: dict) -> dict:
         balance_sat = data.get("final_balance", 0)
         received_sat = data.get("total_received", 0)
@@ -114,21 +127,19 @@ class CryptoModule(OsintModule):
             url = f"{base}/addrs/{address}"
             self.emit_progress(socketio, namespace, 30, f"Querying BlockCypher for {chain_label} data...", room=room)
 
-            response = await asyncio.to_thread(
-                lambda: requests.get(url, timeout=15)
-            )
+            response = await http_client.get(url, timeout=15, retry=BLOCKCYPHER_RETRY)
 
             if self.handle_cancellation(cancel_event):
                 return {"error": "Search cancelled"}
 
             self.emit_progress(socketio, namespace, 60, "Processing results...", room=room)
 
-            if response.status_code == 429:
+            if response.status == 429:
                 error_msg = "Rate limit reached. Please wait a moment and try again."
                 self.emit_error(socketio, namespace, error_msg, room=room)
                 return {"error": error_msg}
 
-            if response.status_code == 404:
+            if response.status == 404:
                 result = {
                     "result": {
                         "module": "crypto",
@@ -164,12 +175,12 @@ class CryptoModule(OsintModule):
             self.emit_result(socketio, namespace, result, room=room)
             return result
 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             error_msg = "Request timed out"
             self.emit_error(socketio, namespace, error_msg, room=room)
             return {"error": error_msg}
 
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
             error_msg = "Could not connect to BlockCypher API"
             self.emit_error(socketio, namespace, error_msg, room=room)
             return {"error": error_msg}
@@ -0,0 +1,11 @@
+"""Searches served by the crypto address module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_crypto_address
+
+registry.register(
+    "crypto",
+    "search",
+    validator=is_valid_crypto_address,
+    target="network.crypto.crypto_module:crypto_module.run",
+)
@@ -1,15 +1,26 @@
-import requests
 import asyncio
 import logging
+import aiohttp
+from core import entities
 from core.base_module import OsintModule
+from core.http_client import http_client
+from core.rate_limit import DEFAULT_RETRY
 
 class IpModule(OsintModule):
     """Module for IP intelligence lookups using Shodan InternetDB"""
 
+    cache_ttl = 1800
+
     def __init__(self):
         super().__init__("ip")
         self.api_url = "https://internetdb.shodan.io"
 
+    def entities(self, result: dict) -> list:
+        """The hostnames InternetDB knows for the address."""
+        hostnames = (self.result_data(result) or {}).get('hostnames') or []
+        found = (entities.make(entities.DOMAIN, name) for name in hostnames)
+        return [entity for entity in found if entity is not None]
+
     async def search(self, ip: str, socketio, namespace: str, **kwargs) -> dict:
         """
         Search for IP intelligence information using Shodan InternetDB.
@@ -32,17 +43,14 @@ class IpModule(OsintModule):
             if self.handle_cancellation(cancel_event):
                 return {'error': 'Search cancelled'}
 
-            # Use asyncio.to_thread to run blocking requests call
-            response = await asyncio.to_thread(
-                requests.get, f"{self.api_url}/{ip}", timeout=15
-            )
+            response = await http_client.get(f"{self.api_url}/{ip}", timeout=15, retry=DEFAULT_RETRY)
 
             if self.handle_cancellation(cancel_event):
                 return {'error': 'Search cancelled'}
 
             self.emit_progress(socketio, namespace, 60, "Processing results...", room=room)
 
-            if response.status_code == 404:
+            if response.status == 404:
                 # No information available for this IP
                 result = {
                     'result': {
@@ -89,13 +97,13 @@ class IpModule(OsintModule):
 
             return result
 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             error_msg = "Request timed out while querying Shodan InternetDB"
             self.logger.error(error_msg)
             self.emit_error(socketio, namespace, error_msg, room=room)
             return {'error': error_msg}
 
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
             error_msg = "Could not connect to Shodan InternetDB"
             self.logger.error(error_msg)
             self.emit_error(socketio, namespace, error_msg, room=room)
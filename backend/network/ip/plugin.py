@@ -0,0 +1,13 @@
+"""Searches served by the IP module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_ip
+
+registry.register(
+    "ip",
+    "search",
+    validator=is_valid_ip,
+    target="network.ip.ip_module:ip_module.run",
+    consumes="ip",
+    produces=("domain",),
+)
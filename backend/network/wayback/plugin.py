@@ -0,0 +1,13 @@
+"""Searches served by the Wayback Machine module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_domain
+
+registry.register(
+    "wayback",
+    "search",
+    validator=is_valid_domain,
+    target="network.wayback.wayback_module:wayback_module.run",
+    consumes="domain",
+    produces=("url",),
+)
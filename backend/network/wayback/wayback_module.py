@@ -1,13 +1,22 @@
-import requests
 import logging
 import asyncio
 from datetime import datetime
+from core import entities
 from core.base_module import OsintModule
+from core.http_client import REQUEST_ERRORS, http_client
+from core.rate_limit import RetryPolicy
+from core.tracing import span
+
+# The CDX API is slow rather than flaky: retry overload statuses, not timeouts.
+CDX_RETRY = RetryPolicy(attempts=3, base=2.0, max_delay=20.0, retry_timeouts=False)
 
 
 class WaybackModule(OsintModule):
     """Module for querying the Internet Archive Wayback Machine CDX API."""
 
+    cache_ttl = 3600
+    disk_cache_ttl = 86400
+
     def __init__(self):
         super().__init__("wayback")
         self.cdx_url = "https://web.archive.org/cdx/search/cdx"
@@ -21,10 +30,13 @@ class WaybackModule(OsintModule):
         except (ValueError, TypeError):
             return ts
 
-    async def search(self, query, socketio, namespace, **kwargs):
-        return self.search_sync(query, socketio, namespace, **kwargs)
+    def entities(self, result: dict) -> list:
+        """The distinct archived URLs."""
+        urls = (self.result_data(result) or {}).get("unique_urls") or []
+        found = (entities.make(entities.URL, url) for url in urls)
+        return [entity for entity in found if entity is not None]
 
-    def search_sync(self, query: str, socketio, namespace: str, **kwargs) -> dict:
+    async def search(self, query: str, socketio, namespace: str, **kwargs) -> dict:
         """
         Search the Wayback Machine for archived snapshots of a domain.
 
@@ -57,7 +69,8 @@ class WaybackModule(OsintModule):
                 "filter": "statuscode:200",
             }
 
-            response = requests.get(self.cdx_url, params=params, timeout=30)
+            with span("cdx_query"):
+                response = await http_client.get(self.cdx_url, params=params, timeout=30, retry=CDX_RETRY)
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
@@ -67,7 +80,8 @@ class WaybackModule(OsintModule):
             # --- Stage 2: Parse the response ---
             self.emit_progress(socketio, namespace, 40, "Parsing CDX response...", room=room)
 
-            data = response.json()
+            with span("parse", bytes=len(response.body)):
+                data = response.json()
 
             if not data or len(data) < 2:
                 self.emit_error(
@@ -91,30 +105,31 @@ class WaybackModule(OsintModule):
             unique_urls = set()
             all_timestamps = []
 
-            for row in rows:
-                entry = dict(zip(headers, row))
+            with span("process", rows=len(rows)):
+                for row in rows:
+                    entry = dict(zip(headers, row))
 
-                timestamp_raw = entry.get("timestamp", "")
-                original_url = entry.get("original", "")
-                status_code = entry.get("statuscode", "")
-                mimetype = entry.get("mimetype", "")
-                length = entry.get("length", "")
+                    timestamp_raw = entry.get("timestamp", "")
+                    original_url = entry.get("original", "")
+                    status_code = entry.get("statuscode", "")
+                    mimetype = entry.get("mimetype", "")
+                    length = entry.get("length", "")
 
-                formatted_date = self._format_timestamp(timestamp_raw)
-                archive_url = f"https://web.archive.org/web/{timestamp_raw}/{original_url}"
+                    formatted_date = self._format_timestamp(timestamp_raw)
+                    archive_url = f"https://web.archive.org/web/{timestamp_raw}/{original_url}"
 
-                unique_urls.add(original_url)
-                all_timestamps.append(timestamp_raw)
+                    unique_urls.add(original_url)
+                    all_timestamps.append(timestamp_raw)
 
-                snapshots.append({
-                    "timestamp": timestamp_raw,
-                    "date": formatted_date,
-                    "original_url": original_url,
-                    "status_code": status_code,
-                    "mimetype": mimetype,
-                    "length": length,
-                    "archive_url": archive_url,
-                })
+                    snapshots.append({
+                        "timestamp": timestamp_raw,
+                        "date": formatted_date,
+                        "original_url": original_url,
+                        "status_code": status_code,
+                        "mimetype": mimetype,
+                        "length": length,
+                        "archive_url": archive_url,
+                    })
 
             if self.handle_cancellation(cancel_event):
                 return {"cancelled": True}
@@ -122,10 +137,11 @@ class WaybackModule(OsintModule):
             # --- Stage 4: Compute summary ---
             self.emit_progress(socketio, namespace, 80, "Computing summary...", room=room)
 
-            sorted_timestamps = sorted(all_timestamps)
-            first_snapshot = self._format_timestamp(sorted_timestamps[0]) if sorted_timestamps else "N/A"
-            last_snapshot = self._format_timestamp(sorted_timestamps[-1]) if sorted_timestamps else "N/A"
-            sorted_unique_urls = sorted(unique_urls)
+            with span("summary"):
+                sorted_timestamps = sorted(all_timestamps)
+                first_snapshot = self._format_timestamp(sorted_timestamps[0]) if sorted_timestamps else "N/A"
+                last_snapshot = self._format_timestamp(sorted_timestamps[-1]) if sorted_timestamps else "N/A"
+                sorted_unique_urls = sorted(unique_urls)
 
             result = {
                 "result": {
@@ -150,12 +166,12 @@ class WaybackModule(OsintModule):
 
             return result
 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             error_msg = "Wayback Machine CDX API request timed out. The service may be slow — please try again later."
             self.logger.error(error_msg)
             self.emit_error(socketio, namespace, error_msg, room=room)
             return {"error": error_msg}
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             error_msg = f"Error querying Wayback Machine: {str(e)}"
             self.logger.error(error_msg)
             self.emit_error(socketio, namespace, error_msg, room=room)
@@ -1,7 +1,8 @@
 import logging
 from datetime import datetime
-import requests
 from core.base_module import OsintModule
+from core.http_client import http_client
+from core.rate_limit import DEFAULT_RETRY
 
 class DiscordModule(OsintModule):
     """Module for Discord user ID lookups"""
@@ -30,12 +31,12 @@ class DiscordModule(OsintModule):
             if self.handle_cancellation(cancel_event):
                 return {'cancelled': True}
                 
-            response = requests.get(
-                f'https://discordlookup.mesalytic.moe/v1/user/{user_id}'
+            response = await http_client.get(
+                f'https://discordlookup.mesalytic.moe/v1/user/{user_id}', timeout=15, retry=DEFAULT_RETRY
             )
             
-            if response.status_code != 200:
-                error_msg = f"Error: HTTP {response.status_code}"
+            if response.status != 200:
+                error_msg = f"Error: HTTP {response.status}"
                 self.emit_error(socketio, namespace, error_msg, room=room)
                 return {'error': error_msg}
 
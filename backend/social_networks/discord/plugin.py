@@ -0,0 +1,9 @@
+"""Searches served by the Discord module (see core/registry.py)."""
+
+from core.registry import registry
+
+registry.register(
+    "discord",
+    "search",
+    target="social_networks.discord.discord_module:discord_module.run",
+)
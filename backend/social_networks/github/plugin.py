@@ -0,0 +1,10 @@
+"""Searches served by the GitHub (osgint) module (see core/registry.py)."""
+
+from core.registry import registry
+
+registry.register(
+    "github",
+    "search",
+    target="social_networks.github.osgint_module:github_module.run",
+    consumes="username",
+)
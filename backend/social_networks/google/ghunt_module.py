@@ -8,6 +8,9 @@ import tempfile
 
 class GoogleModule(OsintModule):
     """Module for Google account lookups using GHunt"""
+
+    cache_ttl = 3600
+    disk_cache_ttl = 86400
     
     def __init__(self):
         super().__init__("google")
@@ -0,0 +1,10 @@
+"""Searches served by the Google (GHunt) module (see core/registry.py)."""
+
+from core.registry import registry
+
+registry.register(
+    "google",
+    "search",
+    target="social_networks.google.ghunt_module:google_module.run",
+    consumes="email",
+)
@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 from w3lib.html import remove_tags
@@ -6,8 +5,9 @@ import asyncio
 import logging
 import concurrent.futures
 import traceback
-import aiohttp
 from core.base_module import OsintModule
+from core.http_client import http_client
+from core.rate_limit import DEFAULT_RETRY
 
 class MastodonModule(OsintModule):
     """Module for Mastodon user and instance lookups"""
@@ -63,7 +63,13 @@ class MastodonModule(OsintModule):
                 self.logger.info(f"Performing username search for: {query}")
                 
                 api_task = asyncio.create_task(self.username_search_api(query, cancel_event))
-                instances_task = asyncio.create_task(self.username_search(query, cancel_event))
+                instances_task = asyncio.create_task(self.username_search(
+                    query,
+                    cancel_event,
+                    on_progress=lambda done, total: self.emit_progress(
+                        socketio, namespace, done * 100 // total, f"Checked {done} of {total} instances", room=room,
+                    ),
+                ))
                 
                 done, pending = await asyncio.wait(
                     [api_task, instances_task],
@@ -131,10 +137,8 @@ class MastodonModule(OsintModule):
                 return {"cancelled": True}
                 
             self.logger.info(f"Making request to: {inst_url}")
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(inst_url, headers=headers) as response:
-                    inst_data = await response.json()
+            response = await http_client.get(inst_url, headers=headers, timeout=10, retry=DEFAULT_RETRY)
+            inst_data = response.json()
             self.logger.info("Instance data retrieved successfully")
             
             # Check for cancellation after getting data
@@ -192,10 +196,8 @@ class MastodonModule(OsintModule):
                 
             url = f"https://mastodon.social/api/v2/search?q={username}"
             self.logger.info(f"Making request to: {url}")
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    data = await response.json()
+            response = await http_client.get(url, timeout=10, retry=DEFAULT_RETRY)
+            data = response.json()
             self.logger.info("API data retrieved successfully")
             
             # Check for cancellation after getting data
@@ -262,8 +264,14 @@ class MastodonModule(OsintModule):
             self.logger.error(f"Error formatting account details: {e}")
             return {"error": f"Error formatting account details: {e}"}
 
-    async def username_search(self, username, cancel_event=None):
-        """Search for a username across Mastodon instances"""
+    async def username_search(self, username, cancel_event=None, on_progress=None):
+        """Search for a username across Mastodon instances
+
+        Args:
+            username: Username to look for
+            cancel_event: An optional threading.Event for cancellation
+            on_progress: Optional callback, called as on_progress(checked, total)
+        """
         self.logger.info(f"Searching for username across instances: {username}")
         headers = {
             "Accept": "text/html, application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -279,12 +287,13 @@ class MastodonModule(OsintModule):
                 return {"cancelled": True}
                 
             self.logger.info("Fetching list of Mastodon instances...")
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get("https://raw.githubusercontent.com/C3n7ral051nt4g3ncy/Masto/master/fediverse_instances.json") as response:
-                    text_content = await response.text()
-                    sites_data = json.loads(text_content)
-                    sites = sites_data["sites"]
+            response = await http_client.get(
+                "https://raw.githubusercontent.com/C3n7ral051nt4g3ncy/Masto/master/fediverse_instances.json",
+                timeout=10,
+                retry=DEFAULT_RETRY,
+            )
+            sites_data = json.loads(response.text())
+            sites = sites_data["sites"]
             
             self.logger.info(f"Retrieved {len(sites)} instances to check")
             
@@ -307,17 +316,13 @@ class MastodonModule(OsintModule):
                             return None
                             
                         self.logger.debug(f"Checking instance: {uri_check}")
-                        timeout = aiohttp.ClientTimeout(total=5)
-                        async with aiohttp.ClientSession(timeout=timeout) as session:
-                            async with session.get(uri_check, headers=headers) as res:
-                                if res.status == 200:
-                                    text = await res.text()
-                                    if site["e_string"] in text:
-                                        self.logger.info(f"Found match on instance: {site['name']}")
-                                        return {
-                                            "name": site['name'],
-                                            "profile_url": uri_check
-                                        }
+                        res = await http_client.get(uri_check, headers=headers, timeout=5)
+                        if res.status == 200 and site["e_string"] in res.text():
+                            self.logger.info(f"Found match on instance: {site['name']}")
+                            return {
+                                "name": site['name'],
+                                "profile_url": uri_check
+                            }
                 except asyncio.TimeoutError:
                     self.logger.debug(f"Timeout checking {uri_check}")
                 except asyncio.CancelledError:
@@ -334,6 +339,7 @@ class MastodonModule(OsintModule):
                 task = asyncio.create_task(check_instance(site))
                 tasks.append(task)
             
+            checked = 0
             for future in asyncio.as_completed(tasks):
                 if self.handle_cancellation(cancel_event):
                     for task in tasks:
@@ -343,6 +349,9 @@ class MastodonModule(OsintModule):
                 
                 try:
                     result = await future
+                    checked += 1
+                    if on_progress is not None:
+                        on_progress(checked, len(tasks))
                     if result:
                         matched_sites.append(result)
                         
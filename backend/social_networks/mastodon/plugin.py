@@ -0,0 +1,19 @@
+"""Searches served by the Mastodon module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_username
+
+registry.register(
+    "mastodon",
+    "searchUsername",
+    validator=is_valid_username,
+    target="social_networks.mastodon.mastodon_module:mastodon_module.run",
+    consumes="username",
+    search_type="username",
+)
+registry.register(
+    "mastodon",
+    "searchInstance",
+    target="social_networks.mastodon.mastodon_module:mastodon_module.run",
+    search_type="instance",
+)
@@ -0,0 +1,12 @@
+"""Searches served by the Reddit module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_username
+
+registry.register(
+    "reddit",
+    "search",
+    validator=is_valid_username,
+    target="social_networks.reddit.reddit_module:reddit_module.run",
+    consumes="username",
+)
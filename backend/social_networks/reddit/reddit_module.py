@@ -4,6 +4,7 @@ import asyncio
 import os
 from asyncprawcore.exceptions import NotFound
 from core.base_module import OsintModule
+from core.http_client import http_client
 
 class RedditModule(OsintModule):
     """Module for Reddit user lookups using asyncpraw"""
@@ -43,10 +44,13 @@ class RedditModule(OsintModule):
             if self.handle_cancellation(cancel_event):
                 return {'error': 'Search cancelled'}
                 
+            # Reuse the pooled session. Never call reddit.close(): asyncprawcore
+            # would close the shared session along with it.
             reddit = asyncpraw.Reddit(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
-                user_agent=self.user_agent
+                user_agent=self.user_agent,
+                requestor_kwargs={'session': await http_client.session()}
             )
             
             user = await reddit.redditor(username)
@@ -99,7 +103,7 @@ class RedditModule(OsintModule):
             # Define async functions to fetch submissions and comments concurrently
             async def fetch_submissions():
                 submissions = []
-                self.emit_progress(socketio, namespace, "Fetching submissions...")
+                self.emit_progress(socketio, namespace, 0, "Fetching submissions...", room=room)
                 
                 count = 0
                 async for submission in user.submissions.new(limit=submission_limit):
@@ -120,14 +124,16 @@ class RedditModule(OsintModule):
                     submissions.append(submission_data)
                     
                     count += 1
-                    if count % 2 == 0:  # Update progress every 2 submissions
-                        self.emit_progress(socketio, namespace, f"Fetched {count}/{submission_limit} submissions...")
+                    self.emit_progress(
+                        socketio, namespace, count * 100 // max(submission_limit, 1),
+                        f"Fetched {count}/{submission_limit} submissions...", room=room,
+                    )
                 
                 return submissions
 
             async def fetch_comments():
                 comments = []
-                self.emit_progress(socketio, namespace, "Fetching comments...")
+                self.emit_progress(socketio, namespace, 0, "Fetching comments...", room=room)
                 
                 count = 0
                 async for comment in user.comments.new(limit=comment_limit):
@@ -147,8 +153,10 @@ class RedditModule(OsintModule):
                     comments.append(comment_data)
                     
                     count += 1
-                    if count % 2 == 0:  # Update progress every 2 comments
-                        self.emit_progress(socketio, namespace, f"Fetched {count}/{comment_limit} comments...")
+                    self.emit_progress(
+                        socketio, namespace, count * 100 // max(comment_limit, 1),
+                        f"Fetched {count}/{comment_limit} comments...", room=room,
+                    )
                 
                 return comments
                 
@@ -171,7 +179,7 @@ class RedditModule(OsintModule):
             user_info['result']['comments'] = comments
             self.emit_result(socketio, namespace, {'comments': comments}, room=room)
             
-            self.emit_progress(socketio, namespace, "Completed Reddit data collection.")
+            self.emit_progress(socketio, namespace, 100, "Completed Reddit data collection.", room=room)
             
             return user_info
 
@@ -196,13 +204,6 @@ class RedditModule(OsintModule):
         except Exception:
             pass
         return "Unknown Title"
-    
-    def emit_progress(self, socketio, namespace, message):
-        """Emit progress updates via WebSocket"""
-        try:
-            socketio.emit('progress', {'message': message}, namespace=namespace)
-        except Exception as e:
-            self.logger.error(f"Error emitting progress: {str(e)}")
 
 
 # Create a singleton instance for import
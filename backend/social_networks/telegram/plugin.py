@@ -0,0 +1,12 @@
+"""Searches served by the Telegram module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_username
+
+registry.register(
+    "telegram",
+    "search",
+    validator=is_valid_username,
+    target="social_networks.telegram.telegram_module:telegram_module.run",
+    consumes="username",
+)
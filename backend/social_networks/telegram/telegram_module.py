@@ -3,9 +3,10 @@ import re
 import asyncio
 import logging
 import traceback
-import aiohttp
 from bs4 import BeautifulSoup
 from core.base_module import OsintModule
+from core.http_client import http_client
+from core.rate_limit import DEFAULT_RETRY
 
 
 class TelegramModule(OsintModule):
@@ -57,10 +58,8 @@ class TelegramModule(OsintModule):
         params = {"chat_id": f"@{username}"}
 
         try:
-            timeout = aiohttp.ClientTimeout(total=15)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, params=params) as resp:
-                    data = await resp.json()
+            resp = await http_client.get(url, params=params, timeout=15, retry=DEFAULT_RETRY)
+            data = resp.json()
 
             if not data.get("ok"):
                 self.logger.info(
@@ -88,9 +87,8 @@ class TelegramModule(OsintModule):
             if chat.get("type") in ("supergroup", "channel", "group"):
                 count_url = f"https://api.telegram.org/bot{self.bot_token}/getChatMemberCount"
                 try:
-                    async with aiohttp.ClientSession(timeout=timeout) as session:
-                        async with session.get(count_url, params=params) as resp2:
-                            count_data = await resp2.json()
+                    resp2 = await http_client.get(count_url, params=params, timeout=15, retry=DEFAULT_RETRY)
+                    count_data = resp2.json()
                     if count_data.get("ok"):
                         result["member_count"] = count_data["result"]
                 except Exception:
@@ -103,9 +101,8 @@ class TelegramModule(OsintModule):
                 if file_id:
                     file_url = f"https://api.telegram.org/bot{self.bot_token}/getFile"
                     try:
-                        async with aiohttp.ClientSession(timeout=timeout) as session:
-                            async with session.get(file_url, params={"file_id": file_id}) as resp3:
-                                file_data = await resp3.json()
+                        resp3 = await http_client.get(file_url, params={"file_id": file_id}, timeout=15, retry=DEFAULT_RETRY)
+                        file_data = resp3.json()
                         if file_data.get("ok"):
                             file_path = file_data["result"]["file_path"]
                             result["photo_url"] = (
@@ -140,13 +137,11 @@ class TelegramModule(OsintModule):
         }
 
         try:
-            timeout = aiohttp.ClientTimeout(total=15)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status != 200:
-                        self.logger.info(f"t.me returned status {resp.status} for @{username}")
-                        return None
-                    html = await resp.text()
+            resp = await http_client.get(url, headers=headers, timeout=15)
+            if resp.status != 200:
+                self.logger.info(f"t.me returned status {resp.status} for @{username}")
+                return None
+            html = resp.text()
 
             soup = BeautifulSoup(html, "html.parser")
 
@@ -0,0 +1,20 @@
+"""Searches served by the TikTok module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_url, is_valid_username
+
+registry.register(
+    "tiktok",
+    "searchVideo",
+    validator=is_valid_url,
+    target="social_networks.tiktok.tiktok_module:tiktok_module.run",
+    search_type="video",
+)
+registry.register(
+    "tiktok",
+    "searchProfile",
+    validator=is_valid_username,
+    target="social_networks.tiktok.tiktok_module:tiktok_module.run",
+    consumes="username",
+    search_type="profile",
+)
@@ -2,9 +2,9 @@ from datetime import datetime
 import re
 import logging
 import asyncio
-import requests
 import json
 from core.base_module import OsintModule
+from core.http_client import http_client
 
 class TikTokModule(OsintModule):
     """Module for TikTok video timestamp extraction and profile lookup"""
@@ -116,18 +116,19 @@ class TikTokModule(OsintModule):
             self.logger.info(f"Requesting profile data for username: {username}")
             
             # Make request to nopean.click API
-            response = requests.post(
+            response = await http_client.post(
                 'https://nopean.click',
                 json={'username': username},
-                headers={'Content-Type': 'application/json', 'Origin': 'https://omar-thing.nekoweb.org'}
+                headers={'Content-Type': 'application/json', 'Origin': 'https://omar-thing.nekoweb.org'},
+                timeout=15
             )
             
             # Check if the search was cancelled
             if self.handle_cancellation(cancel_event):
                 return {'cancelled': True}
                 
-            if response.status_code != 200:
-                error_msg = f"Error: HTTP {response.status_code} when retrieving TikTok profile"
+            if response.status != 200:
+                error_msg = f"Error: HTTP {response.status} when retrieving TikTok profile"
                 self.logger.error(error_msg)
                 self.emit_error(socketio, namespace, error_msg, room=room)
                 return {'error': error_msg}
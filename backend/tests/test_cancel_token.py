@@ -0,0 +1,30 @@
+import app  # noqa: F401  (monkey-patches, as in production)
+from eventlet import patcher
+
+from core.base_module import CancelToken
+
+_threading = patcher.original("threading")
+_time = patcher.original("time")
+
+
+def test_callbacks_can_be_added_from_a_native_thread_while_the_hub_holds_the_lock():
+    token = CancelToken()
+    fired, errors = [], []
+
+    def register():
+        try:
+            token.add_callback(lambda: fired.append(True))
+        except Exception as exc:
+            errors.append(exc)
+
+    # The asyncio loop thread registers while the hub is inside set().
+    with token._callbacks_lock:
+        thread = _threading.Thread(target=register, daemon=True)
+        thread.start()
+        _time.sleep(0.1)
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert errors == []
+    token.set()
+    assert fired == [True]
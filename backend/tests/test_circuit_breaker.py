@@ -0,0 +1,33 @@
+import time
+
+from core.circuit_breaker import OPEN, CircuitBreakers
+
+
+async def _healthy() -> bool:
+    return True
+
+
+def test_idle_closed_breakers_are_dropped(monkeypatch):
+    breakers = CircuitBreakers(window=60.0)
+    now = time.monotonic()
+    for i in range(20):
+        breakers.get(f"host{i}.example", _healthy)
+    breakers.get("open.example", _healthy).state = OPEN
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    breakers.get("new.example", _healthy)
+
+    assert sorted(breakers._breakers) == ["new.example", "open.example"]
+
+
+def test_breakers_in_use_are_kept(monkeypatch):
+    breakers = CircuitBreakers(window=60.0)
+    now = time.monotonic()
+    breaker = breakers.get("busy.example", _healthy)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 50)
+    breaker.before_call()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    breakers.get("new.example", _healthy)
+
+    assert breakers.get("busy.example", _healthy) is breaker
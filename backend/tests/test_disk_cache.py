@@ -0,0 +1,52 @@
+import os
+import random
+import sqlite3
+
+from core.disk_cache import DiskCache
+
+
+def _cache(tmp_path, **limits):
+    cache = DiskCache(os.path.join(tmp_path, "cache.db"), **limits)
+    cache._conn = cache._connect()
+    return cache
+
+
+def _stored(cache):
+    return cache._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+
+def test_size_limit_is_enforced_on_every_write(tmp_path):
+    cache = _cache(tmp_path, max_bytes=64 * 1024, max_entries=1000)
+    rng = random.Random(1)
+    for i in range(50):
+        # Random text barely compresses, so each value takes ~8 KB.
+        cache._set(f"k{i}", "".join(rng.choice("abcdefghij0123456789") for _ in range(16000)), 3600, "crtsh")
+        count, total = _stored(cache)
+        assert total <= cache.max_bytes
+        assert cache._totals() == (count, total)
+    assert cache.stats()["evicted"] > 0
+    # The most recent write is never the one evicted.
+    assert cache._get("k49") is not None
+
+
+def test_entry_limit_and_overwrites_keep_totals_exact(tmp_path):
+    cache = _cache(tmp_path, max_entries=10)
+    for i in range(30):
+        cache._set(f"k{i % 15}", {"value": "x" * i}, 3600, "dns")
+        assert cache._totals() == _stored(cache)
+        assert _stored(cache)[0] <= 10
+
+
+def test_totals_are_counted_for_a_store_created_before_them(tmp_path):
+    path = os.path.join(tmp_path, "cache.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE entries (key TEXT PRIMARY KEY, module TEXT NOT NULL, expires_at REAL NOT NULL,"
+        " accessed_at REAL NOT NULL, size INTEGER NOT NULL, value BLOB NOT NULL);"
+        "INSERT INTO entries VALUES ('a', 'dns', 0, 0, 10, x'00'), ('b', 'dns', 0, 0, 20, x'00');"
+    )
+    conn.close()
+
+    cache = DiskCache(path)
+    cache._conn = cache._connect()
+    assert cache._totals() == (2, 30)
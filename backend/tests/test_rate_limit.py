@@ -0,0 +1,40 @@
+import app  # noqa: F401  (monkey-patches, as in production)
+from eventlet import patcher
+
+from core.rate_limit import HostRateLimiter
+
+_threading = patcher.original("threading")
+_time = patcher.original("time")
+
+
+def test_bucket_lock_is_shared_between_the_hub_and_a_native_thread():
+    limiter = HostRateLimiter(rates={"crt.sh": 1.0})
+    bucket = limiter.bucket("crt.sh")
+    errors = []
+
+    def recover():
+        try:
+            bucket.recover()
+        except Exception as exc:
+            errors.append(exc)
+
+    with bucket._lock:
+        thread = _threading.Thread(target=recover, daemon=True)
+        thread.start()
+        _time.sleep(0.1)
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert errors == []
+
+
+def test_buckets_are_capped_and_paused_hosts_are_kept():
+    limiter = HostRateLimiter(max_hosts=10)
+    limiter.bucket("paused.example").pause(60)
+    for i in range(50):
+        limiter.bucket(f"host{i}.example")
+
+    assert len(limiter._buckets) <= 10
+    assert "paused.example" in limiter._buckets
+    assert "host49.example" in limiter._buckets
+    assert "host0.example" not in limiter._buckets
@@ -0,0 +1,28 @@
+import app  # noqa: F401  (monkey-patches, as in production)
+from eventlet import patcher
+
+from core.result_cache import ResultCache
+
+_threading = patcher.original("threading")
+_time = patcher.original("time")
+
+
+def test_stats_on_the_hub_and_lookups_on_a_native_thread_share_the_lock():
+    cache = ResultCache(maxsize=8)
+    results, errors = [], []
+
+    def read():
+        try:
+            results.append(cache.stats())
+        except Exception as exc:
+            errors.append(exc)
+
+    with cache._lock:
+        thread = _threading.Thread(target=read, daemon=True)
+        thread.start()
+        _time.sleep(0.1)
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert errors == []
+    assert len(results) == 1
@@ -0,0 +1,67 @@
+import eventlet
+import pytest
+from eventlet.event import Event
+
+import app
+from core import socket_events as se
+from core.base_module import CancelToken
+
+
+@pytest.mark.parametrize(
+    "runner, module",
+    [(app._email_runner, "email"), (app._phone_runner, "phone")],
+)
+def test_runner_emits_result_and_finishes(monkeypatch, runner, module):
+    emitted = []
+    finished = Event()
+    monkeypatch.setattr(app._bridge, "emit", lambda event, data, **kwargs: emitted.append((event, data, kwargs)))
+
+    runner("value", {}, CancelToken(), "room", finished.send)
+    with eventlet.Timeout(5):
+        finished.wait()
+
+    assert len(emitted) == 1
+    event, data, kwargs = emitted[0]
+    assert event == se.SERVER_EVENTS["result"]
+    assert "error" not in data
+    assert data["result"]["module"] == module
+    assert kwargs == {"namespace": se.ns(module), "room": "room"}
+
+
+@pytest.mark.parametrize("cancel_before_spawn", [True, False])
+def test_spawn_sync_cancelled_before_start_still_finishes(cancel_before_spawn):
+    calls = []
+    finished = []
+
+    def search(value, cancel_event, room):
+        calls.append(value)
+
+    cancel_event = CancelToken()
+    if cancel_before_spawn:
+        cancel_event.set()
+
+    app._spawn_sync(
+        search, "value", namespace="/dns", cancel_event=cancel_event, room="room",
+        on_done=lambda: finished.append(True),
+    )
+    # Set before the greenthread gets its first switch.
+    cancel_event.set()
+    eventlet.sleep(0.1)
+
+    assert calls == []
+    assert finished == [True]
+
+
+def test_search_cancelled_while_queued_is_closed(monkeypatch):
+    monkeypatch.setattr(app._scheduler, "max_jobs", 0)
+    live = len(app.tracer._live)
+    client = app.io.test_client(app.app, namespace="/ip")
+
+    client.emit("search_ip", {"query": "8.8.8.8"}, namespace="/ip")
+    assert app._scheduler.queued == 1
+    client.emit("cancel_search_ip", namespace="/ip")
+
+    assert app._scheduler.queued == 0
+    assert len(app.tracer._live) == live
+    assert len(app._active_tasks) == 0
+    client.disconnect(namespace="/ip")
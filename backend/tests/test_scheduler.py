@@ -0,0 +1,53 @@
+from core.base_module import CancelToken
+from core.scheduler import Job, JobScheduler
+
+
+def _scheduler(max_jobs=1):
+    return JobScheduler(lambda *args: None, max_jobs=max_jobs, namespace_limits={})
+
+
+def test_cancelled_queued_job_is_dropped():
+    scheduler = _scheduler()
+    held, dropped = [], []
+    scheduler.submit(Job("/ip", "a", held.append))
+    scheduler.submit(Job("/ip", "b", lambda done: None, on_drop=lambda: dropped.append("b")))
+
+    assert scheduler.cancel("/ip", "b")
+    assert dropped == ["b"]
+    assert scheduler.queued == 0
+
+
+def test_job_whose_event_was_set_while_queued_is_dropped_on_dispatch():
+    scheduler = _scheduler()
+    held, dropped, started = [], [], []
+    cancel_event = CancelToken()
+    scheduler.submit(Job("/ip", "a", held.append))
+    scheduler.submit(Job("/ip", "b", started.append, cancel_event=cancel_event, on_drop=lambda: dropped.append("b")))
+
+    cancel_event.set()
+    held[0]()
+
+    assert dropped == ["b"]
+    assert started == []
+    assert scheduler.in_flight == 0
+
+
+def test_jobs_finishing_inside_start_release_their_slots():
+    scheduler = _scheduler()
+    held, started = [], []
+
+    def start(name):
+        def run(done):
+            started.append(name)
+            done()
+        return run
+
+    scheduler.submit(Job("/ip", "a", held.append))
+    for name in "bcde":
+        scheduler.submit(Job("/ip", name, start(name)))
+    scheduler.cancel("/ip", "d")
+    held[0]()
+
+    assert started == ["b", "c", "e"]
+    assert scheduler.in_flight == 0
+    assert scheduler.queued == 0
@@ -0,0 +1,36 @@
+import pytest
+
+import app
+from core import tracing
+from core.tracing import Tracer
+
+
+def test_bot_tokens_and_query_strings_are_redacted():
+    assert tracing.redact("/bot123:SECRET/getChat") == "/bot***/getChat"
+    assert tracing.redact("/file/bot123:SECRET/photos/1.jpg") == "/file/bot***/photos/1.jpg"
+    assert tracing.redact("HTTP 401 for https://x.test/bot1:SECRET/getFile?file_id=9") == (
+        "HTTP 401 for https://x.test/bot***/getFile"
+    )
+
+
+def test_span_errors_are_redacted():
+    trace = Tracer().start_trace("job")
+    with tracing.activate(trace.root), pytest.raises(RuntimeError):
+        with tracing.span("GET api.telegram.org"):
+            raise RuntimeError("HTTP 502 for https://api.telegram.org/bot1:SECRET/getChat?chat_id=@target")
+
+    (span,) = [s for s in trace.to_dict()["spans"] if s["name"] == "GET api.telegram.org"]
+    assert span["status"] == tracing.STATUS_ERROR
+    assert "SECRET" not in span["message"]
+    assert "@target" not in span["message"]
+
+
+def test_traces_require_the_admin_token(monkeypatch):
+    monkeypatch.setattr(app.profiler, "admin_token", "s3cret")
+    client = app.app.test_client()
+    admin = {"Authorization": "Bearer s3cret"}
+
+    assert client.get("/api/traces").status_code == 404
+    assert client.get("/api/traces/abc", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    assert client.get("/api/traces", headers=admin).status_code == 200
+    assert client.get("/api/traces/abc", headers=admin).json == {"error": "Unknown trace"}
@@ -0,0 +1,12 @@
+"""Searches served by the WhatsMyName module (see core/registry.py)."""
+
+from core.registry import registry
+from core.validators import is_valid_username
+
+registry.register(
+    "username",
+    "search",
+    validator=is_valid_username,
+    target="username.whatsmyname.whatsmyname_module:whatsmyname_module.run",
+    consumes="username",
+)
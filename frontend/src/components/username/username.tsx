@@ -76,9 +76,7 @@ export default function UsernameSearch() {
       console.log("Connected to WebSocket")
     })
 
-    newSocket.on("search_result", (data) => {
-      console.log("Received search_result:", data)
-
+    const handleResult = (data: any) => {
       // Handle start message
       if (data.status === "start") {
         setTotalSites(data.data.total_sites)
@@ -107,6 +105,17 @@ export default function UsernameSearch() {
         setIsLoading(false)
         setProgressMessage("Search was cancelled")
       }
+    }
+
+    newSocket.on("search_result", (data) => {
+      console.log("Received search_result:", data)
+      handleResult(data)
+    })
+
+    // The server groups hits into batch frames; handle each item in order
+    newSocket.on("search_result_batch", (batch) => {
+      console.log("Received search_result_batch:", batch.items.length)
+      batch.items.forEach(handleResult)
     })
 
     newSocket.on("search_progress", (data) => {